@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from "next/server"
 import { getDatabase } from "@/lib/db"
+import { mlClient, type SimilarCourse } from "@/lib/ml-client"
 import fs from "fs"
 import path from "path"
 
@@ -372,6 +373,16 @@ export async function GET(
       `)
       .get(course.item_id || course.course_id || courseId) as any
 
+    // Similar courses from the ML API's precomputed neighbors (optional: the
+    // page renders without them if the ML API errors or takes over a second)
+    let similarCourses: SimilarCourse[] = []
+    try {
+      const similar = await mlClient.getSimilarItems(course.course_id || course.item_id || courseId, 6)
+      similarCourses = similar.items
+    } catch (e) {
+      console.error("Error fetching similar courses:", e)
+    }
+
     return NextResponse.json({
       course: {
         item_id: course.item_id || course.course_id || courseId,
@@ -394,6 +405,7 @@ export async function GET(
         max_rating: stats?.max_rating || 5.0,
         min_rating: stats?.min_rating || 1.0,
       },
+      similar_courses: similarCourses,
     })
   } catch (error: any) {
     console.error("Error fetching course:", error)
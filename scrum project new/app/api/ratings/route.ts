@@ -1,5 +1,6 @@
 import { type NextRequest, NextResponse } from "next/server"
 import { saveRating, getUserRatings } from "@/lib/db"
+import { mlClient } from "@/lib/ml-client"
 
 export async function POST(request: NextRequest) {
   try {
@@ -15,6 +16,16 @@ export async function POST(request: NextRequest) {
     }
 
     saveRating({ user_id, item_id, rating })
+
+    // Let the ML service fold the rating into recommendations right away;
+    // the rating is saved either way (also when the ML call times out) and
+    // picked up at the next training run
+    try {
+      await mlClient.ingestRatings([{ user_id: String(user_id), item_id: String(item_id), rating: Number(rating) }])
+    } catch (error) {
+      console.error("Error forwarding rating to ML service:", error)
+    }
+
     return NextResponse.json({ success: true })
   } catch (error) {
     console.error("Error saving rating:", error)
@@ -7,7 +7,7 @@ const ML_API_URL = process.env.ML_API_URL || "http://localhost:5000"
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
-    const { user_id, top_n = 10 } = body
+    const { user_id, top_n = 10, diversity } = body
 
     if (!user_id) {
       return NextResponse.json({ error: "user_id is required" }, { status: 400 })
@@ -41,6 +41,8 @@ export async function POST(request: NextRequest) {
         year: user.year || 2,
         gpa: user.gpa || 3.0,
         top_n: top_n,
+        // Optional MMR re-ranking (0 = most relevant only, 1 = most varied)
+        ...(diversity !== undefined && { diversity }),
       }),
     })
 
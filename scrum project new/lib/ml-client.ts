@@ -26,6 +26,59 @@ export interface PopularItemsResponse {
   count: number
 }
 
+// Catalog fields of a course, as returned by the similar-course and search endpoints
+export interface CourseRecord {
+  item_id: string
+  course_id: string
+  title: string
+  description: string
+  category: string
+  difficulty: string
+  rating: number
+  source: string
+  url: string
+  num_ratings: number
+  avg_rating: number
+}
+
+export interface SimilarCourse extends CourseRecord {
+  similarity: number
+}
+
+export interface SimilarItemsResponse {
+  course_id: string
+  items: SimilarCourse[]
+  count: number
+}
+
+export interface SearchResult extends CourseRecord {
+  score: number
+}
+
+export interface SearchResponse {
+  query: string
+  results: SearchResult[]
+  count: number
+}
+
+export interface AutocompleteResponse {
+  query: string
+  suggestions: { course_id: string; title: string }[]
+  count: number
+}
+
+export interface RatingInput {
+  user_id: string
+  item_id: string
+  rating: number
+}
+
+export interface IngestResponse {
+  accepted: number
+  deferred: number
+  pending: number
+}
+
 export class MLClient {
   private baseUrl: string
 
@@ -62,6 +115,57 @@ export class MLClient {
     return response.json()
   }
 
+  // Gives up after timeoutMs: similar courses are an optional block on the course page
+  async getSimilarItems(courseId: string, topN = 10, timeoutMs = 1000): Promise<SimilarItemsResponse> {
+    const response = await fetch(`${this.baseUrl}/items/${encodeURIComponent(courseId)}/similar?top_n=${topN}`, {
+      signal: AbortSignal.timeout(timeoutMs),
+    })
+
+    if (!response.ok) {
+      throw new Error(`ML API error: ${response.statusText}`)
+    }
+
+    return response.json()
+  }
+
+  async searchCourses(query: string, topN = 10): Promise<SearchResponse> {
+    const response = await fetch(`${this.baseUrl}/search?q=${encodeURIComponent(query)}&top_n=${topN}`)
+
+    if (!response.ok) {
+      throw new Error(`ML API error: ${response.statusText}`)
+    }
+
+    return response.json()
+  }
+
+  async autocomplete(prefix: string, limit = 8): Promise<AutocompleteResponse> {
+    const response = await fetch(`${this.baseUrl}/search/autocomplete?q=${encodeURIComponent(prefix)}&limit=${limit}`)
+
+    if (!response.ok) {
+      throw new Error(`ML API error: ${response.statusText}`)
+    }
+
+    return response.json()
+  }
+
+  // Gives up after timeoutMs so a stalled ML service never holds up a rating write
+  async ingestRatings(ratings: RatingInput[], timeoutMs = 1000): Promise<IngestResponse> {
+    const response = await fetch(`${this.baseUrl}/ratings`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ ratings }),
+      signal: AbortSignal.timeout(timeoutMs),
+    })
+
+    if (!response.ok) {
+      throw new Error(`ML API error: ${response.statusText}`)
+    }
+
+    return response.json()
+  }
+
   async checkHealth(): Promise<boolean> {
     try {
       const response = await fetch(`${this.baseUrl}/health`)
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Benchmark the recommenders on synthetic data
+
+Measures fit time, artifact load time and size, memory, and p50/p95/p99 latency
+and throughput for AdvancedRecommender.recommend, get_popular_courses and
+HybridRecommender.predict. One-shot timings are the best of --repeat runs and
+latencies the best of --repeat rounds. Results are written to JSON; with
+--baseline the run is compared against a stored result and regressions are
+flagged.
+
+    python benchmarks/run_benchmarks.py --sizes 1000,10000,100000
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+import logging
+
+import numpy as np
+
+BENCHMARK_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from advanced_recommender import AdvancedRecommender
+from recommender_model import HybridRecommender
+from feature_engineer import FeatureEngineer
+from synthetic import generate_catalog, generate_profiles, generate_itm_rec
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+
+# Metric name suffix -> whether larger values are better
+METRIC_DIRECTIONS = {"_qps": True, "_ms": False, "_s": False, "_mb": False}
+
+# Smallest absolute change that counts as a regression, per unit, whatever the
+# relative change: a millisecond per call, a quarter second for one-shot timings
+# (run-to-run drift of a sub-second fit), a megabyte. Throughput is judged by its
+# time per call in ms
+METRIC_FLOORS = {"_ms": 1.0, "_s": 0.25, "_mb": 1.0}
+
+# Reported but never compared: RSS growth over one call depends on allocator and
+# GC state, and data generation is not part of the recommenders
+UNCOMPARED_SUFFIXES = ("_rss_mb", "generate_s")
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def dir_size_mb(path: Path) -> float:
+    """Size of a file or directory tree in MB"""
+    if path.is_file():
+        return path.stat().st_size / (1024 * 1024)
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / (1024 * 1024)
+
+
+def timed(fn: Callable, *args, **kwargs):
+    """(result, seconds, RSS growth in MB) of one call"""
+    gc.collect()
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    return result, elapsed, rss_mb() - rss_before
+
+
+def best_of(repeat: int, fn: Callable, *args, **kwargs):
+    """
+    (result, fastest seconds, RSS growth in MB) of `repeat` calls; the result and
+    RSS growth are those of the first call
+    """
+    result, best, rss_growth = timed(fn, *args, **kwargs)
+    for _ in range(repeat - 1):
+        _, elapsed, _ = timed(fn, *args, **kwargs)
+        best = min(best, elapsed)
+    return result, best, rss_growth
+
+
+def measure_latency(fn: Callable, calls: List[tuple], warmup: int = 10, rounds: int = 1) -> Dict:
+    """
+    Latency percentiles and throughput of fn over a list of argument tuples;
+    with several rounds each figure is the best one of any round
+
+    The garbage collector is paused while timing (as timeit does), so a
+    collection does not land in the tail percentiles of one run and not another.
+    """
+    for args in calls[:warmup]:
+        fn(*args)
+
+    measured = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            latencies = np.empty(len(calls))
+            started = time.perf_counter()
+            for i, args in enumerate(calls):
+                t = time.perf_counter()
+                fn(*args)
+                latencies[i] = time.perf_counter() - t
+            total = time.perf_counter() - started
+
+            latencies *= 1000
+            measured.append({
+                "mean_ms": float(latencies.mean()),
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+                "p99_ms": float(np.percentile(latencies, 99)),
+                "throughput_qps": len(calls) / total,
+            })
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    result = {"calls": len(calls), "rounds": rounds}
+    for name in measured[0]:
+        values = [round_result[name] for round_result in measured]
+        best = max(values) if name.endswith("_qps") else min(values)
+        result[name] = round(best, 2 if name.endswith("_qps") else 4)
+    return result
+
+
+def bench_professional(n_courses: int, n_queries: int, top_n: int, workdir: Path, fit_jobs: int = 1,
+                       repeat: int = 3) -> Dict:
+    """Fit, save/load and query AdvancedRecommender on a synthetic catalog"""
+    logger.info(f"Professional recommender: {n_courses:,} courses")
+
+    courses, generate_s, _ = timed(generate_catalog, n_courses)
+    profiles = generate_profiles(n_queries).to_dict("records")
+
+    def fit():
+        fitted = AdvancedRecommender()
+        fitted.fit(courses, n_jobs=fit_jobs or None)
+        return fitted
+
+    def load(method: str, path: Path):
+        loaded = AdvancedRecommender()
+        getattr(loaded, method)(str(path))
+        return loaded
+
+    model, fit_s, fit_mb = best_of(repeat, fit)
+
+    artifact = workdir / f"professional_{n_courses}.pkl"
+    runtime_artifact = workdir / f"professional_{n_courses}_runtime"
+    _, save_s, _ = best_of(repeat, model.save, str(artifact))
+    model.export_runtime(str(runtime_artifact))
+    del model
+    gc.collect()
+
+    model, load_s, load_mb = best_of(repeat, load, "load", artifact)
+    _, runtime_load_s, _ = best_of(repeat, load, "load_runtime", runtime_artifact)
+
+    categories = [None, "Data", "Business", "Engineering", "Science"]
+    result = {
+        "courses": n_courses,
+        "features": int(model.course_vectors.shape[1]),
+        "fit_jobs": fit_jobs,
+        "generate_s": round(generate_s, 4),
+        "fit_s": round(fit_s, 4),
+        "save_s": round(save_s, 4),
+        "load_s": round(load_s, 4),
+        "runtime_load_s": round(runtime_load_s, 4),
+        "artifact_mb": round(dir_size_mb(artifact), 3),
+        "runtime_artifact_mb": round(dir_size_mb(runtime_artifact), 3),
+        "fit_rss_mb": round(fit_mb, 2),
+        "load_rss_mb": round(load_mb, 2),
+        "recommend": measure_latency(model.recommend, [(profile, top_n) for profile in profiles], rounds=repeat),
+        "popular": measure_latency(
+            model.get_popular_courses,
+            [(categories[i % len(categories)], top_n) for i in range(n_queries)],
+            rounds=repeat,
+        ),
+    }
+    logger.info(
+        f"   fit {fit_s:.2f}s, load {load_s:.3f}s, "
+        f"recommend p95 {result['recommend']['p95_ms']:.2f}ms, "
+        f"popular p95 {result['popular']['p95_ms']:.2f}ms"
+    )
+    return result
+
+
+def bench_hybrid(n_users: int, n_items: int, ratings_per_user: int, n_queries: int, top_n: int, workdir: Path,
+                 repeat: int = 3) -> Dict:
+    """Fit, save/load and query HybridRecommender on synthetic ITM-Rec ratings"""
+    logger.info(f"Hybrid recommender: {n_users:,} users x {n_items:,} items")
+
+    users, items, ratings = generate_itm_rec(n_users, n_items, ratings_per_user)
+    engineer = FeatureEngineer()
+    user_features = engineer.create_user_features(users, ratings)
+    item_features = engineer.create_item_features(items, ratings)
+
+    def fit():
+        fitted = HybridRecommender()
+        fitted.fit(ratings, user_features, item_features)
+        return fitted
+
+    model, fit_s, fit_mb = best_of(repeat, fit)
+
+    artifact = workdir / f"hybrid_{n_users}x{n_items}"
+    _, save_s, _ = best_of(repeat, model.save, str(artifact))
+    del model
+    gc.collect()
+
+    model, load_s, load_mb = best_of(repeat, HybridRecommender.load, str(artifact))
+    _, mmap_load_s, _ = best_of(repeat, HybridRecommender.load, str(artifact), mmap_mode="r")
+
+    rng = np.random.default_rng(0)
+    user_ids = model.user_ids[rng.integers(0, len(model.user_ids), size=n_queries)]
+    result = {
+        "users": n_users,
+        "items": n_items,
+        "ratings": len(ratings),
+        "fit_s": round(fit_s, 4),
+        "save_s": round(save_s, 4),
+        "load_s": round(load_s, 4),
+        "mmap_load_s": round(mmap_load_s, 4),
+        "artifact_mb": round(dir_size_mb(artifact), 3),
+        "fit_rss_mb": round(fit_mb, 2),
+        "load_rss_mb": round(load_mb, 2),
+        "predict": measure_latency(model.predict, [(str(user_id), top_n) for user_id in user_ids], rounds=repeat),
+        "predict_context": measure_latency(
+            model.predict,
+            [(str(user_id), top_n, 0.7, {"class": "DB"}) for user_id in user_ids],
+            rounds=repeat,
+        ),
+    }
+    logger.info(f"   fit {fit_s:.2f}s, load {load_s:.3f}s, predict p95 {result['predict']['p95_ms']:.2f}ms")
+    return result
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Nested results -> {"professional.1000.recommend.p95_ms": value}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def significant_change(name: str, value: float, previous: float) -> bool:
+    """Whether a metric moved by at least its unit's absolute floor (METRIC_FLOORS)"""
+    if name.endswith("_qps"):
+        if value <= 0 or previous <= 0:
+            return True
+        return abs(1000 / value - 1000 / previous) >= METRIC_FLOORS["_ms"]
+    floor = next((floor for suffix, floor in METRIC_FLOORS.items() if name.endswith(suffix)), 0.0)
+    return abs(value - previous) >= floor
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """
+    Metrics that got worse than the baseline by more than `tolerance` (relative)
+    and by at least their unit's absolute floor
+
+    Only timing, memory, size and throughput metrics are compared; counts,
+    configuration values and UNCOMPARED_SUFFIXES are ignored.
+    """
+    current_flat = flatten(current["results"])
+    baseline_flat = flatten(baseline["results"])
+
+    regressions = []
+    for name, value in sorted(current_flat.items()):
+        higher_is_better = next(
+            (better for suffix, better in METRIC_DIRECTIONS.items() if name.endswith(suffix)), None
+        )
+        previous = baseline_flat.get(name)
+        if higher_is_better is None or not previous or name.endswith(UNCOMPARED_SUFFIXES):
+            continue
+        if not significant_change(name, value, previous):
+            continue
+
+        change = (value - previous) / abs(previous)
+        if (change < -tolerance) if higher_is_better else (change > tolerance):
+            regressions.append({
+                "metric": name,
+                "baseline": previous,
+                "current": value,
+                "change": round(change, 4),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the course recommenders on synthetic data")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated catalog sizes (e.g. 1000,10000,100000,1000000)")
+    parser.add_argument("--queries", type=int, default=500, help="Requests per latency measurement")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--fit-jobs", type=int, default=1, help="TF-IDF fitting processes (0 = all cores)")
+    parser.add_argument("--hybrid", default="2000x500", help="Hybrid model size(s) as USERSxITEMS, comma-separated; empty to skip")
+    parser.add_argument("--ratings-per-user", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per one-shot timing and rounds per latency "
+                                                                  "measurement; the best is kept")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--baseline", help="Compare against this result file and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before flagging (default 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also store this run as {DEFAULT_BASELINE.name}")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    hybrid_sizes = [tuple(int(n) for n in spec.split("x")) for spec in args.hybrid.split(",") if spec]
+
+    results = {"professional": {}, "hybrid": {}}
+    with tempfile.TemporaryDirectory(prefix="recommender-bench-") as tmp:
+        workdir = Path(tmp)
+        for n_courses in sizes:
+            results["professional"][str(n_courses)] = bench_professional(
+                n_courses, args.queries, args.top_n, workdir, args.fit_jobs, max(1, args.repeat)
+            )
+        for n_users, n_items in hybrid_sizes:
+            results["hybrid"][f"{n_users}x{n_items}"] = bench_hybrid(
+                n_users, n_items, args.ratings_per_user, args.queries, args.top_n, workdir, max(1, args.repeat)
+            )
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "config": vars(args),
+        "results": results,
+    }
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results saved to {output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Baseline saved to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            logger.warning(f"{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                logger.warning(
+                    f"   {regression['metric']}: {regression['baseline']} -> "
+                    f"{regression['current']} ({regression['change']:+.1%})"
+                )
+            sys.exit(1)
+        logger.info(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Synthetic Data - Scalable course catalogs, student profiles and ITM-Rec style ratings for benchmarks
+"""
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from advanced_recommender import AdvancedRecommender
+
+# Same catalog categories as ProfessionalDataLoader._determine_category
+CATEGORIES = [
+    "Computer Science",
+    "Data Science",
+    "Business",
+    "Engineering",
+    "Health & Medicine",
+    "Science",
+    "Psychology",
+    "Arts & Design",
+    "Education",
+    "General",
+]
+
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+
+FILLER_WORDS = (
+    "course introduction advanced fundamentals practical project great useful "
+    "learn students lectures assignments instructor recommend clear examples "
+    "theory applications skills career beginner hands-on quiz week module"
+).split()
+
+INTERESTS = ["", "", "AI, research", "startups", "healthcare", "design", "finance", "teaching", "robotics", "climate"]
+
+
+def _topic_vocabulary():
+    """Majors and their keyword pools, taken from the recommender's major mapping"""
+    major_keywords = AdvancedRecommender().major_keywords
+    majors = list(major_keywords)
+    words = [np.array(major_keywords[major].split() + FILLER_WORDS, dtype=object) for major in majors]
+    return majors, words
+
+
+def _join_words(rng: np.random.Generator, pools: list, topics: np.ndarray, n_words: int) -> pd.Series:
+    """One string of n_words words per row, drawn from the row's topic pool"""
+    text = pd.Series(np.empty(len(topics), dtype=object))
+    for topic, pool in enumerate(pools):
+        rows = np.flatnonzero(topics == topic)
+        if len(rows) == 0:
+            continue
+        picks = pool[rng.integers(0, len(pool), size=(len(rows), n_words))]
+        joined = pd.Series(picks[:, 0], index=rows)
+        for i in range(1, n_words):
+            joined = joined + " " + picks[:, i]
+        text.iloc[rows] = joined.values
+    return text
+
+
+def generate_catalog(n_courses: int, seed: int = 42, description_words: int = 30) -> pd.DataFrame:
+    """
+    Course catalog with the columns of results/course_catalog.csv
+
+    Each course is about one major's topic, so profile queries match a realistic
+    share of the catalog.
+    """
+    rng = np.random.default_rng(seed)
+    majors, pools = _topic_vocabulary()
+    topics = rng.integers(0, len(majors), size=n_courses)
+
+    course_ids = pd.Series(np.arange(n_courses).astype(str), dtype=object)
+    titles = _join_words(rng, pools, topics, 3).str.title()
+
+    return pd.DataFrame({
+        "course_id": "course-" + course_ids,
+        "title": titles,
+        "description": _join_words(rng, pools, topics, description_words),
+        "category": np.array(CATEGORIES, dtype=object)[topics % len(CATEGORIES)],
+        "difficulty": np.array(DIFFICULTIES, dtype=object)[rng.integers(0, 3, size=n_courses)],
+        "rating": np.round(np.clip(rng.normal(4.4, 0.4, size=n_courses), 1.0, 5.0), 2),
+        "num_ratings": rng.zipf(1.6, size=n_courses).clip(1, 100000),
+        "source": "Coursera",
+        "url": "https://www.coursera.org/learn/" + course_ids,
+    })
+
+
+def generate_profiles(n_users: int, seed: int = 42) -> pd.DataFrame:
+    """Student profiles shaped like ProfessionalDataLoader.create_user_profiles, generated in bulk"""
+    rng = np.random.default_rng(seed)
+    majors, _ = _topic_vocabulary()
+    ids = pd.Series(np.arange(n_users).astype(str), dtype=object)
+
+    return pd.DataFrame({
+        "user_id": "user_" + ids,
+        "name": "Student " + ids,
+        "email": "student" + ids + "@university.edu",
+        "major": np.array(majors, dtype=object)[rng.integers(0, len(majors), size=n_users)],
+        "year": rng.integers(1, 5, size=n_users),
+        "gpa": np.round(rng.uniform(2.5, 4.0, size=n_users), 2),
+        "interests": np.array(INTERESTS, dtype=object)[rng.integers(0, len(INTERESTS), size=n_users)],
+    })
+
+
+def generate_itm_rec(n_users: int, n_items: int, ratings_per_user: int = 20, seed: int = 42):
+    """
+    ITM-Rec style users, items and ratings (after DataLoader/DataCleaner renaming)
+
+    Returns:
+        (users, items, ratings)
+    """
+    rng = np.random.default_rng(seed)
+    per_user = min(ratings_per_user, n_items)
+
+    users = pd.DataFrame({"user_id": np.arange(1000, 1000 + n_users).astype(str)})
+    items = pd.DataFrame({
+        "item_id": np.arange(1, n_items + 1).astype(str),
+        "title": [f"Topic {i}" for i in range(1, n_items + 1)],
+    })
+
+    # Distinct items per user: the per_user smallest of random keys, a block of users at a time
+    block = max(1, 10_000_000 // n_items)
+    item_rows = np.concatenate([
+        np.argpartition(rng.random((min(block, n_users - start), n_items)), per_user - 1, axis=1)[:, :per_user]
+        for start in range(0, n_users, block)
+    ])
+    user_rows = np.repeat(np.arange(n_users), per_user)
+    n_ratings = len(user_rows)
+
+    ratings = pd.DataFrame({
+        "user_id": users["user_id"].values[user_rows],
+        "item_id": items["item_id"].values[item_rows.ravel()],
+        "rating": rng.integers(1, 6, size=n_ratings),
+        "app": rng.integers(1, 6, size=n_ratings),
+        "data": rng.integers(1, 6, size=n_ratings),
+        "ease": rng.integers(1, 6, size=n_ratings),
+        "class": np.array(["DA", "DB", "ML"], dtype=object)[rng.integers(0, 3, size=n_ratings)],
+        "semester": np.array(["Fall", "Spring"], dtype=object)[rng.integers(0, 2, size=n_ratings)],
+        "lockdown": np.array(["PRE", "DUR", "POST"], dtype=object)[rng.integers(0, 3, size=n_ratings)],
+    })
+    return users, items, ratings
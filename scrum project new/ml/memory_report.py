@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Report what the trained models cost in memory, component by component
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+import logging
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from memory_usage import memory_report, process_rss_bytes
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROFESSIONAL_RUNTIME_PATH = Path("results/professional_runtime")
+PROFESSIONAL_PICKLE_PATH = Path("results/professional_recommender.pkl")
+HYBRID_MODEL_PATH = Path("models/recommender_model")
+
+
+def load_professional(path: Path):
+    from advanced_recommender import AdvancedRecommender
+
+    model = AdvancedRecommender()
+    if path.is_dir():
+        model.load_runtime(str(path))
+    else:
+        model.load(str(path))
+    return model
+
+
+def load_hybrid(path: Path, mmap: bool):
+    from recommender_model import HybridRecommender
+
+    return HybridRecommender.load(str(path), mmap_mode="r" if mmap else None)
+
+
+def mb(n_bytes: int) -> str:
+    return f"{n_bytes / 1024 / 1024:10.3f} MB"
+
+
+def print_report(name: str, path: Path, report: dict, top_columns: int):
+    total = report["total"]
+    size = total["heap_bytes"] + total["mapped_bytes"]
+    print(f"\n{name} ({path}): {mb(total['heap_bytes']).strip()} heap, {mb(total['mapped_bytes']).strip()} mapped")
+    for component, sizes in report["components"].items():
+        component_size = sizes["heap_bytes"] + sizes["mapped_bytes"]
+        if component_size == 0:
+            continue
+        mapped = " (mapped)" if sizes["mapped_bytes"] and not sizes["heap_bytes"] else ""
+        print(f"  {component:<28}{mb(component_size)}  {component_size / max(size, 1):6.1%}{mapped}")
+        columns = sorted(sizes.get("columns", {}).items(), key=lambda item: -item[1])
+        for column, column_size in columns[:top_columns]:
+            print(f"    .{column:<26}{mb(column_size)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deep memory footprint of the trained models, by component")
+    parser.add_argument("--professional", help="Runtime export directory or pickle "
+                                               f"(default: {PROFESSIONAL_RUNTIME_PATH}, else {PROFESSIONAL_PICKLE_PATH})")
+    parser.add_argument("--hybrid", default=str(HYBRID_MODEL_PATH), help="Hybrid model directory")
+    parser.add_argument("--mmap", action="store_true", help="Memory-map the hybrid model, as predict_api.py does")
+    parser.add_argument("--columns", type=int, default=5, help="DataFrame columns listed per component")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    professional_path = Path(args.professional) if args.professional else (
+        PROFESSIONAL_RUNTIME_PATH if PROFESSIONAL_RUNTIME_PATH.is_dir() else PROFESSIONAL_PICKLE_PATH
+    )
+    hybrid_path = Path(args.hybrid)
+
+    reports = {}
+    if professional_path.exists():
+        reports["professional"] = (professional_path, memory_report(load_professional(professional_path)))
+    else:
+        logger.warning(f"Professional model not found at {professional_path}")
+    if hybrid_path.exists():
+        reports["hybrid"] = (hybrid_path, memory_report(load_hybrid(hybrid_path, args.mmap)))
+    else:
+        logger.warning(f"Hybrid model not found at {hybrid_path}")
+    if not reports:
+        sys.exit(1)
+
+    rss = process_rss_bytes()
+    if args.json:
+        print(json.dumps({
+            "rss_bytes": rss,
+            "models": {name: {"path": str(path), **report} for name, (path, report) in reports.items()},
+        }, indent=2))
+        return
+
+    for name, (path, report) in reports.items():
+        print_report(name, path, report, args.columns)
+    print(f"\nProcess RSS: {mb(rss).strip()}")
+
+
+if __name__ == "__main__":
+    main()
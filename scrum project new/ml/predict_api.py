@@ -3,9 +3,18 @@
 Flask API for serving professional course recommendations
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, send_file
 from flask_cors import CORS
+from itertools import islice
+import base64
+import functools
+import hmac
+import json
+import math
+import os
 import sys
+import threading
+import time
 from pathlib import Path
 import logging
 
@@ -13,6 +22,13 @@ import logging
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from advanced_recommender import AdvancedRecommender
+from group_recommender import GroupRecommender
+from micro_batcher import MicroBatcher
+from response_cache import ResponseCache
+from request_profiler import RequestProfiler
+from admission import AdmissionController, AdmissionRejected
+from model_registry import ModelRegistry, UnknownModel
+from rating_ingestor import RatingIngestor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,19 +38,144 @@ CORS(app)
 
 # Load model
 MODEL_PATH = Path("results/professional_recommender.pkl")
+# Inference-only export (see AdvancedRecommender.export_runtime), preferred when present
+RUNTIME_MODEL_PATH = Path("results/professional_runtime")
 model = None
+model_version = None
+
+# ITM-Rec hybrid model (optional, used for user and group recommendations)
+HYBRID_MODEL_PATH = Path("models/recommender_model")
+hybrid_model = None
+group_recommender = None
+
+# Model registry: the two artifacts above are registered as the pinned defaults
+# professional@current and hybrid@current; MODEL_REGISTRY points to a JSON file
+# listing more models ({"models": [{"name", "version", "family", "path"}]}),
+# e.g. a canary, loaded on first use. Requests pick one with a `model`
+# parameter ("name" or "name@version"). Unpinned models are evicted least
+# recently used first while the loaded ones exceed MODEL_MEMORY_BUDGET_MB (0 = no limit).
+MODEL_REGISTRY_CONFIG = os.environ.get("MODEL_REGISTRY", "")
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# Online ratings (POST /ratings) are merged into the hybrid model every
+# RATING_COMPACT_INTERVAL seconds, or once RATING_DELTA_MAX are pending
+RATING_COMPACT_INTERVAL = float(os.environ.get("RATING_COMPACT_INTERVAL", "2"))
+RATING_DELTA_MAX = int(os.environ.get("RATING_DELTA_MAX", "10000"))
+
+# Micro-batching of concurrent /recommend calls (MICRO_BATCHING=1 to enable)
+MICRO_BATCHING = os.environ.get("MICRO_BATCHING", "0") == "1"
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "2"))
+batcher = None
+
+# Encode responses with orjson when it is installed (FAST_JSON=0 to disable)
+FAST_JSON = os.environ.get("FAST_JSON", "1") == "1"
+
+# Response cache for /recommend, keyed by model version + normalized profile
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_ENTRIES", "4096")),
+    max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL", "300")),
+)
+
+# Admission control for the scoring endpoints (MAX_IN_FLIGHT=0 to disable).
+# Clients may pass their remaining time budget as X-Deadline-Ms.
+MAX_IN_FLIGHT = int(os.environ.get("MAX_IN_FLIGHT", "4"))
+MAX_QUEUE = int(os.environ.get("MAX_QUEUE", "16"))
+DEFAULT_DEADLINE_MS = float(os.environ.get("DEFAULT_DEADLINE_MS", "2000"))
+admission = AdmissionController(MAX_IN_FLIGHT, MAX_QUEUE) if MAX_IN_FLIGHT > 0 else None
+
+# Largest list returned in one (non-streamed) response or autocomplete; larger top_n is truncated
+MAX_TOP_N = int(os.environ.get("MAX_TOP_N", "100"))
+# Page size of a streamed /recommend walk without top_n
+STREAM_PAGE_SIZE = int(os.environ.get("STREAM_PAGE_SIZE", "10"))
+
+# Readiness: /ready passes once the loaded models have been warmed up (WARMUP=0 skips the queries)
+WARMUP = os.environ.get("WARMUP", "1") == "1"
+ready = threading.Event()
+warmup_stats = {}
+
+# Shared secret for admin-only features (X-Admin-Token header)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Request profiling: on demand (X-Profile: 1 plus the admin token) and/or for a
+# random PROFILE_SAMPLE_RATE share of requests. Views are only wrapped when
+# one of the two is configured.
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "cprofile")
+PROFILE_MAX = int(os.environ.get("PROFILE_MAX", "50"))
+profiler = None
+
+
+def artifact_version(path: Path) -> str:
+    """Version tag of a model artifact from its modification time and size"""
+    stat = path.stat()
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def load_professional(path: str):
+    """Registry loader: AdvancedRecommender from a runtime export directory or a pickle"""
+    path = Path(path)
+    loaded = AdvancedRecommender()
+    loaded.fast_json = FAST_JSON and loaded.fast_json
+    if path.is_dir():
+        loaded.load_runtime(str(path))
+        return loaded, artifact_version(path / "manifest.json")
+    loaded.load(str(path))
+    return loaded, artifact_version(path)
+
+
+def load_hybrid(path: str):
+    """Registry loader: memory-mapped HybridRecommender (near-instant startup, pages shared across workers)"""
+    from recommender_model import HybridRecommender
+
+    path = Path(path)
+    loaded = HybridRecommender.load(str(path), mmap_mode="r")
+    return loaded, artifact_version(path / "manifest.json" if path.is_dir() else path)
+
+
+registry = ModelRegistry(
+    {"professional": load_professional, "hybrid": load_hybrid},
+    memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+)
+
+
+def load_registry_config(path: str = MODEL_REGISTRY_CONFIG) -> int:
+    """Register the extra models listed in the MODEL_REGISTRY file (loaded on first use)"""
+    if not path:
+        return 0
+    try:
+        with open(path) as f:
+            entries = json.load(f).get("models", [])
+        for entry in entries:
+            registry.register(
+                str(entry["name"]), str(entry["version"]), entry["family"], entry["path"],
+                pinned=bool(entry.get("pinned", False)),
+            )
+        logger.info(f"Registered {len(entries)} models from {path}")
+        return len(entries)
+    except Exception as e:
+        logger.error(f"Error reading model registry {path}: {e}")
+        return 0
 
 
 def load_model():
     """Load the trained professional model"""
-    global model
+    global model, model_version
     try:
-        if MODEL_PATH.exists():
-            model = AdvancedRecommender()
-            model.load(str(MODEL_PATH))
+        if RUNTIME_MODEL_PATH.is_dir() or MODEL_PATH.exists():
+            # Build the new model completely before requests can see it
+            path = RUNTIME_MODEL_PATH if RUNTIME_MODEL_PATH.is_dir() else MODEL_PATH
+            current = registry.default("professional")
+            if current is None or current.path != str(path):
+                registry.register("professional", "current", "professional", str(path), default=True, pinned=True)
+            entry = registry.load("professional@current")
+            model, model_version = entry.model, entry.artifact_version
             logger.info("✅ Professional model loaded successfully")
-            logger.info(f"   Total courses: {len(model.courses_df)}")
-            logger.info(f"   Categories: {model.courses_df['category'].nunique()}")
+            logger.info(f"   Total courses: {model.n_courses}")
+            logger.info(f"   Categories: {len(model.categories)}")
             return True
         else:
             logger.error(f"Model not found at {MODEL_PATH}")
@@ -47,18 +188,367 @@ def load_model():
         return False
 
 
+def load_hybrid_model():
+    """Load the ITM-Rec hybrid model used for user and group recommendations"""
+    global hybrid_model, group_recommender
+    try:
+        if HYBRID_MODEL_PATH.exists():
+            if registry.default("hybrid") is None:
+                registry.register("hybrid", "current", "hybrid", str(HYBRID_MODEL_PATH), default=True, pinned=True)
+            entry = registry.load("hybrid@current")
+            hybrid_model = entry.model
+            group_recommender = entry.attach("groups", lambda: GroupRecommender(entry.model))
+            logger.info("✅ Hybrid model loaded successfully")
+            logger.info(f"   Groups: {len(group_recommender.group_members)}")
+            return True
+        else:
+            logger.warning(f"Hybrid model not found at {HYBRID_MODEL_PATH}")
+            logger.warning("User and group recommendations disabled. Run: python train_model.py")
+            return False
+    except Exception as e:
+        logger.error(f"Error loading hybrid model: {e}")
+        return False
+
+
+def score_batch(requests):
+    """Score a batch of (user_profile, top_n, diversity) requests in one model call"""
+    profiles = [user_profile for user_profile, _, _ in requests]
+    top_ns = [top_n for _, top_n, _ in requests]
+    diversities = [diversity for _, _, diversity in requests]
+    return model.recommend_batch_json(profiles, top_ns, diversities)
+
+
+def start_batcher():
+    """Start the asyncio micro-batching front end for /recommend"""
+    global batcher
+    batcher = MicroBatcher(
+        score_batch,
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_ms=BATCH_WINDOW_MS,
+        workers=BATCH_WORKERS,
+    ).start()
+
+
+def requested_model(family: str, data: dict = None):
+    """
+    Registry entry named by the request's `model` parameter (JSON body, else
+    query string), loaded if needed; the family default when none is given,
+    and None if the family has no model registered
+    """
+    spec = (data or {}).get("model") or request.args.get("model")
+    if not spec and registry.default(family) is None:
+        return None
+    entry = registry.get(spec, family)
+    g.model_key = entry.key
+    return entry
+
+
+def unknown_model(e: UnknownModel):
+    return jsonify({"error": e.args[0]}), 404
+
+
+@app.after_request
+def model_header(response):
+    """Tell the client which model answered"""
+    if "model_key" in g:
+        response.headers["X-Model"] = g.model_key
+    return response
+
+
+def profile_cache_fields(user_profile: dict) -> dict:
+    """Normalized profile fields used in /recommend cache keys"""
+    return dict(
+        major=user_profile["major"].strip(),
+        interests=" ".join(str(user_profile["interests"]).lower().split()),
+        year=user_profile["year"],
+        gpa=user_profile["gpa"],
+    )
+
+
+def warm_up():
+    """
+    Warm the loaded models up, then mark the worker ready
+
+    Runs representative queries for every major, faults in the model arrays,
+    stores each major's default-profile /recommend response in the response
+    cache and aggregates every known group's default profile.
+    """
+    global warmup_stats
+    ready.clear()
+    started = time.perf_counter()
+    stats = {}
+    try:
+        if WARMUP and model is not None:
+            stats["professional"] = model.warm_up()
+
+            profiles = [{"major": major, "interests": "", "year": 2, "gpa": 3.0} for major in model.major_keywords]
+            top_n = cap_top_n(10)
+            version = registry.default("professional").tag
+            for profile, cached in zip(profiles, model.recommend_batch_json(profiles, [top_n] * len(profiles))):
+                cache_key = ResponseCache.make_key(version, top_n=top_n, diversity=0.0, **profile_cache_fields(profile))
+                response_cache.put(cache_key, cached, size=len(cached[0]) + len(cache_key))
+            stats["cached_responses"] = len(profiles)
+
+        if WARMUP and hybrid_model is not None:
+            stats["hybrid"] = hybrid_model.warm_up()
+            if group_recommender is not None:
+                group_recommender.aggregate(list(group_recommender.group_members))
+                stats["groups"] = len(group_recommender.group_members)
+    except Exception as e:
+        # A failed warm-up only costs latency; the models themselves loaded fine
+        logger.error(f"Warm-up failed: {e}")
+        stats["error"] = str(e)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    warmup_stats = stats
+    if model is not None:
+        ready.set()
+        logger.info(f"✅ Warm-up complete in {stats['seconds']:.2f}s, ready for traffic")
+
+
+def is_admin() -> bool:
+    """Whether the request carries the configured admin token"""
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def install_profiler() -> bool:
+    """Wrap the non-admin views with the request profiler, if profiling is configured"""
+    global profiler
+    if not ADMIN_TOKEN and PROFILE_SAMPLE_RATE <= 0:
+        return False
+
+    profiler = RequestProfiler(PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE, mode=PROFILE_MODE, max_profiles=PROFILE_MAX)
+    admin_endpoints = {rule.endpoint for rule in app.url_map.iter_rules() if rule.rule.startswith("/admin")}
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint != "static" and endpoint not in admin_endpoints:
+            app.view_functions[endpoint] = profiled_view(endpoint, view)
+
+    logger.info(f"Request profiling enabled (sample_rate={PROFILE_SAMPLE_RATE}, mode={PROFILE_MODE}, dir={PROFILE_DIR})")
+    return True
+
+
+def profiled_view(endpoint: str, view):
+    """View wrapper that runs selected requests under the profiler"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        forced = request.headers.get("X-Profile") == "1" and is_admin()
+        if not profiler.should_profile(forced):
+            return view(*args, **kwargs)
+
+        tags = {
+            "endpoint": endpoint,
+            "method": request.method,
+            "path": request.path,
+            "args": request.args.to_dict(),
+            "view_args": kwargs,
+            "body": request.get_json(silent=True),
+            "sampled": not forced,
+        }
+        mode = request.headers.get("X-Profile-Mode") if forced else None
+        if mode not in RequestProfiler.MODES:
+            mode = None
+        result, name = profiler.run(lambda: view(*args, **kwargs), tags, mode=mode)
+
+        response = app.make_response(result)
+        response.headers["X-Profile-Id"] = name
+        return response
+
+    return wrapper
+
+
+def cap_top_n(top_n: int, name: str = "top_n") -> int:
+    """Clamp a requested list length to MAX_TOP_N; ValueError unless it is at least 1"""
+    if top_n < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    return min(top_n, MAX_TOP_N) if MAX_TOP_N > 0 else top_n
+
+
+def request_deadline() -> float:
+    """Seconds the client is willing to wait (X-Deadline-Ms header, else the default)"""
+    try:
+        deadline_ms = float(request.headers.get("X-Deadline-Ms", DEFAULT_DEADLINE_MS))
+    except ValueError:
+        deadline_ms = DEFAULT_DEADLINE_MS
+    return max(deadline_ms, 0.0) / 1000.0
+
+
+def remaining_deadline() -> float:
+    """Seconds left of the request's deadline, counted from when its view was entered"""
+    if "deadline_at" not in g:
+        return request_deadline()
+    return max(g.deadline_at - time.monotonic(), 0.0)
+
+
+def unavailable(reason: str, retry_after: float = 1.0, error: str = "Server overloaded, retry later") -> Response:
+    """503 with the reason and a Retry-After hint"""
+    response = jsonify({"error": error, "reason": reason})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def admission_controlled(view):
+    """
+    Run the view only if it can start within the request's deadline, else 503
+
+    The slot is held while the view runs; streamed bodies are produced after
+    the view returns and do not count against the in-flight limit.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.deadline_at = time.monotonic() + request_deadline()
+        if admission is None:
+            return view(*args, **kwargs)
+
+        try:
+            admission.acquire(remaining_deadline())
+        except AdmissionRejected as e:
+            return unavailable(e.reason, e.retry_after)
+
+        started = time.perf_counter()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            admission.release(time.perf_counter() - started)
+
+    return wrapper
+
+
+def json_response(body: bytes, status: int = 200, etag: str = None) -> Response:
+    """Response with a pre-serialized JSON body and optional ETag"""
+    response = Response(body, status=status, mimetype="application/json")
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def ndjson_response(lines) -> Response:
+    """Streamed newline-delimited JSON response from an iterable of encoded objects"""
+    def generate():
+        try:
+            for line in lines:
+                yield line + b"\n"
+        except Exception as e:
+            # Headers are already sent; the missing trailer line tells the client
+            logger.error(f"Error while streaming response: {e}")
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+def wants_stream(flag=None) -> bool:
+    """Whether the client asked for NDJSON (stream flag or Accept header)"""
+    if flag is None:
+        flag = request.args.get("stream")
+    if str(flag).lower() in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best == "application/x-ndjson"
+
+
+def encode_cursor(version: str, query: str, **position) -> str:
+    """Opaque pagination cursor bound to the model version and the query"""
+    state = {"v": version, "q": query, **position}
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token: str, version: str, query: str) -> dict:
+    """Position stored in a cursor; ValueError if it is malformed or stale"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(state, dict) or state.get("q") != query:
+        raise ValueError("Cursor does not belong to this query")
+    if state.get("v") != version:
+        raise ValueError("Cursor expired: the model was reloaded or changed")
+    return state
+
+
+def paged_lines(entries, limit, encode, make_cursor, **trailer):
+    """
+    Encoded entries followed by a trailer object with count and next_cursor
+
+    next_cursor is only set when the page was cut short by the limit;
+    make_cursor builds it from the last entry delivered.
+    """
+    last, count = None, 0
+    for entry in islice(entries, limit):
+        last, count = entry, count + 1
+        yield encode(entry)
+    next_cursor = make_cursor(last) if last is not None and count == limit else None
+    yield json.dumps({**trailer, "count": count, "next_cursor": next_cursor}).encode("utf-8")
+
+
+def walk_lines(pages, encode, make_cursor, **trailer):
+    """
+    paged_lines for walks delivered in whole pages of (entries, position)
+
+    next_cursor is built from the position the last page ended at, which is
+    None once the walk is exhausted.
+    """
+    position, count = None, 0
+    for entries, position in pages:
+        for entry in entries:
+            count += 1
+            yield encode(entry)
+    next_cursor = make_cursor(position) if position is not None else None
+    yield json.dumps({**trailer, "count": count, "next_cursor": next_cursor}).encode("utf-8")
+
+
+def page_response(lines, stream: bool, field: str) -> Response:
+    """NDJSON stream of paged_lines, or one JSON object with the entries under `field`"""
+    if stream:
+        return ndjson_response(lines)
+
+    *entries, trailer = lines
+    trailer = json.loads(trailer)
+    count, next_cursor = trailer.pop("count"), trailer.pop("next_cursor")
+    head = json.dumps(trailer).encode("utf-8")[1:-1]
+    return json_response(b"".join([
+        b"{", head, b"," if head else b"",
+        json.dumps(field).encode("utf-8"), b":[", b",".join(entries), b"]",
+        b',"count":', str(count).encode("ascii"),
+        b',"next_cursor":', json.dumps(next_cursor).encode("utf-8"), b"}",
+    ]))
+
+
 @app.route("/health", methods=["GET"])
 def health():
-    """Health check endpoint"""
+    """Health check endpoint, with process RSS and the memory of each loaded model"""
+    models_loaded = []
+    if model is not None:
+        models_loaded.append("professional")
+    if hybrid_model is not None:
+        models_loaded.append("hybrid")
+
     return jsonify({
         "status": "healthy",
         "model_loaded": model is not None,
-        "models_loaded": ["professional"] if model is not None else [],
-        "total_courses": len(model.courses_df) if model else 0
+        "models_loaded": models_loaded,
+        "total_courses": model.n_courses if model else 0,
+        "ready": ready.is_set(),
+        "model_version": model_version,
+        "memory": registry.memory_stats(),
+    })
+
+
+@app.route("/ready", methods=["GET"])
+def readiness():
+    """Readiness probe: 503 until the models are loaded and warmed up"""
+    if not ready.is_set():
+        status = "warming_up" if model is not None else "model_not_loaded"
+        return jsonify({"ready": False, "status": status}), 503
+
+    return jsonify({
+        "ready": True,
+        "model_version": model_version,
+        "warm_up": warmup_stats,
     })
 
 
 @app.route("/recommend", methods=["POST"])
+@admission_controlled
 def recommend():
     """Get personalized recommendations for a user"""
     try:
@@ -72,50 +562,465 @@ def recommend():
             "gpa": float(data.get("gpa", 3.0))
         }
         
-        top_n = data.get("top_n", 10)
+        top_n = cap_top_n(int(data.get("top_n", 10)))
+        user_id = data.get("user_id", "unknown")
+        # MMR re-ranking: 0 = pure relevance, 1 = pure novelty
+        diversity = float(data.get("diversity", 0.0))
 
         if not user_profile["major"]:
             return jsonify({"error": "Major is required"}), 400
 
-        if model is None:
+        if not 0.0 <= diversity <= 1.0:
+            return jsonify({"error": "diversity must be between 0 and 1"}), 400
+
+        entry = requested_model("professional", data)
+        if entry is None:
             return jsonify({"error": "Model not loaded"}), 500
+        current = entry.model
+
+        profile_key = profile_cache_fields(user_profile)
+
+        # Paged / streamed mode: walk the ranking lazily from the cursor
+        if data.get("cursor") or wants_stream(data.get("stream")):
+            if diversity > 0:
+                return jsonify({"error": "diversity is not supported with cursor or stream paging"}), 400
+            return recommend_page(entry.tag, current, user_profile, profile_key, user_id, data)
+
+        # Same model version + normalized profile => same recommendations
+        cache_key = ResponseCache.make_key(entry.tag, top_n=top_n, diversity=diversity, **profile_key)
+        etag = ResponseCache.make_etag(cache_key, json.dumps(user_id))
+        if request.if_none_match.contains(etag):
+            return json_response(b"", status=304, etag=etag)
+
+        cached = response_cache.get(cache_key)
+        if cached is None:
+            # Get recommendations using user profile, already serialized
+            # The batcher scores with the default model only
+            if batcher is not None and current is model:
+                try:
+                    cached = batcher.submit_sync((user_profile, top_n, diversity), timeout=remaining_deadline())
+                except TimeoutError:
+                    return unavailable("deadline", error="Recommendation timed out, retry later")
+            else:
+                cached = current.recommend_json(user_profile, top_n=top_n, diversity=diversity)
+
+            response_cache.put(cache_key, cached, size=len(cached[0]) + len(cache_key))
+
+        recommendations_json, count = cached
+        body = b"".join([
+            b'{"user_id":', json.dumps(user_id).encode("utf-8"),
+            b',"recommendations":', recommendations_json,
+            b',"count":', str(count).encode("ascii"), b"}",
+        ])
+        return json_response(body, etag=etag)
+
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error generating recommendations: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+def recommend_page(version: str, current: AdvancedRecommender, user_profile: dict, profile_key: dict,
+                   user_id, data: dict) -> Response:
+    """
+    One page of /recommend, resumable through next_cursor
+
+    A page of top_n courses is exactly the normal response for that top_n, and
+    next_cursor continues the same walk (see iter_recommendations). Without
+    top_n a streamed response runs through the whole walk in pages of
+    STREAM_PAGE_SIZE; a plain JSON page defaults to 10 items and is capped at
+    MAX_TOP_N.
+    """
+    stream = wants_stream(data.get("stream"))
+    top_n = int(data.get("top_n", 0))
+    if not stream:
+        top_n = cap_top_n(top_n or 10)
+    query = ResponseCache.make_etag(json.dumps(profile_key, sort_keys=True))
+
+    after = 0
+    if data.get("cursor"):
+        state = decode_cursor(data["cursor"], version, query)
+        after = state.get("o")
+        if not isinstance(after, int) or after < 0:
+            raise ValueError("Invalid cursor")
+
+    pages = current.iter_recommendations(user_profile, top_n or STREAM_PAGE_SIZE, after=after)
+    lines = walk_lines(
+        islice(pages, 1) if top_n else pages,
+        current.encode_recommendation,
+        lambda position: encode_cursor(version, query, o=position),
+        user_id=user_id,
+    )
+    return page_response(lines, stream, "recommendations")
 
-        # Get recommendations using user profile
-        recommendations = model.recommend(user_profile, top_n=top_n)
+
+@app.route("/recommend/user/<user_id>", methods=["GET"])
+@admission_controlled
+def recommend_user(user_id):
+    """Get materialized hybrid recommendations for an ITM-Rec user"""
+    try:
+        top_n = cap_top_n(request.args.get("top_n", 10, type=int))
+
+        entry = requested_model("hybrid")
+        if entry is None:
+            return jsonify({"error": "Hybrid model not loaded"}), 500
+        current = entry.model
+
+        recommendations = current.recommend_user(user_id, top_n=top_n)
 
         return jsonify({
-            "user_id": data.get("user_id", "unknown"),
+            "user_id": user_id,
+            "known_user": current.user_index(user_id) >= 0,
             "recommendations": recommendations,
             "count": len(recommendations)
         })
 
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        logger.error(f"Error generating recommendations: {e}")
+        logger.error(f"Error generating user recommendations: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/recommend/group", methods=["POST"])
+@admission_controlled
+def recommend_group():
+    """
+    Get recommendations for project groups
+
+    Body: group_id (optionally with members to update the group, admin only),
+    group_ids for many groups in one call, or members alone for an ad-hoc group
+    that is scored without being registered; plus strategy
+    (average | least_misery | most_pleasure), top_n and an optional context.
+    """
+    try:
+        data = request.json or {}
+        strategy = data.get("strategy", "average")
+        top_n = cap_top_n(int(data.get("top_n", 10)))
+        context = data.get("context")
+
+        entry = requested_model("hybrid", data)
+        if entry is None:
+            return jsonify({"error": "Group model not loaded"}), 500
+        groups_model = entry.attach("groups", lambda: GroupRecommender(entry.model))
+
+        if strategy not in GroupRecommender.STRATEGIES:
+            return jsonify({"error": f"Strategy must be one of {list(GroupRecommender.STRATEGIES)}"}), 400
+
+        adhoc = {}
+        if data.get("group_ids"):
+            group_ids = [str(group_id) for group_id in data["group_ids"]]
+        elif data.get("group_id") is not None:
+            group_ids = [str(data["group_id"])]
+            if data.get("members"):
+                # Rewrites the group for every later request
+                if not is_admin():
+                    return jsonify({"error": "Admin token required to change a group's members"}), 403
+                groups_model.set_members(group_ids[0], data["members"])
+        elif data.get("members"):
+            # Scored for this request only, never registered
+            group_id, members = GroupRecommender.adhoc_group(data["members"])
+            group_ids, adhoc = [group_id], {group_id: members}
+        else:
+            return jsonify({"error": "group_id, group_ids or members is required"}), 400
+
+        unknown = [
+            group_id for group_id in group_ids
+            if group_id not in adhoc and group_id not in groups_model.group_members
+        ]
+        if unknown:
+            return jsonify({"error": f"Unknown groups: {unknown}"}), 404
+
+        results = groups_model.recommend(group_ids, strategy=strategy, top_n=top_n, context=context, adhoc=adhoc)
+
+        groups = [
+            {
+                "group_id": group_id,
+                "members": groups_model.members(group_id, adhoc),
+                "recommendations": results[group_id],
+                "count": len(results[group_id]),
+            }
+            for group_id in group_ids
+        ]
+
+        if not data.get("group_ids"):
+            return jsonify({"strategy": strategy, **groups[0]})
+
+        return jsonify({
+            "strategy": strategy,
+            "groups": groups,
+            "count": len(groups)
+        })
+
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error generating group recommendations: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/ratings", methods=["POST"])
+@admission_controlled
+def ingest_ratings():
+    """
+    Ingest new ratings into the hybrid model without retraining
+
+    Body: one rating (user_id, item_id, rating, optional app/data/ease) or
+    {"ratings": [...]}. Item statistics change at once; user recommendations
+    follow after the next background compaction.
+    """
+    try:
+        data = request.json or {}
+        ratings = data["ratings"] if "ratings" in data else [data]
+        if not isinstance(ratings, list):
+            return jsonify({"error": "ratings must be a list"}), 400
+
+        entry = requested_model("hybrid", data)
+        if entry is None:
+            return jsonify({"error": "Hybrid model not loaded"}), 500
+
+        # Compactions drop the cached profiles of the affected users' groups
+        groups_model = entry.attach("groups", lambda: GroupRecommender(entry.model))
+        ingestor = entry.attach("ingestor", lambda: RatingIngestor(
+            entry.model, compact_interval=RATING_COMPACT_INTERVAL, max_delta=RATING_DELTA_MAX,
+            on_compact=groups_model.invalidate_users,
+        ).start())
+        return jsonify(ingestor.add(ratings)), 202
+
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error ingesting ratings: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Serving metrics"""
+    hybrid = registry.default("hybrid")
+    ingestor = hybrid.attachment("ingestor") if hybrid is not None else None
+    return jsonify({
+        "micro_batching": batcher.stats() if batcher is not None else {"enabled": False},
+        "response_cache": response_cache.stats(),
+        "admission": admission.stats() if admission is not None else {"enabled": False},
+        "models": registry.stats(),
+        "ratings": ingestor.stats() if ingestor is not None else {"enabled": False},
+    })
+
+
+@app.route("/models", methods=["GET"])
+def list_models():
+    """Registered models, which are loaded, and their memory"""
+    return jsonify(registry.stats())
+
+
+@app.route("/admin/reload", methods=["POST"])
+def reload_models():
+    """
+    Reload model artifacts from disk (admin token required); cache entries of
+    the old version stop matching and other registered models are evicted and
+    reload on next use. The new models warm up in the background: 202, and
+    /ready fails until the warm-up is done.
+    """
+    if not is_admin():
+        return jsonify({"error": "Admin token required"}), 403
+
+    loaded = load_model()
+    load_hybrid_model()
+    if not loaded:
+        return jsonify({"error": "Model not loaded"}), 500
+    evicted = registry.evict_unpinned()
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    return jsonify({"status": "reloaded", "model_version": model_version, "evicted": evicted, "warming_up": True}), 202
+
+
+@app.route("/admin/profiles", methods=["GET"])
+def list_profiles():
+    """Stored request profiles, newest first (admin token required)"""
+    if not is_admin():
+        return jsonify({"error": "Admin token required"}), 403
+    if profiler is None:
+        return jsonify({"error": "Profiling is disabled"}), 404
+
+    profiles = profiler.list_profiles()
+    return jsonify({
+        "profiles": profiles,
+        "count": len(profiles),
+        "sample_rate": profiler.sample_rate,
+        "mode": profiler.mode,
+    })
+
+
+@app.route("/admin/profiles/<name>", methods=["GET"])
+def get_profile(name):
+    """Download a stored profile (.prof for pstats/snakeviz, .folded for flamegraphs)"""
+    if not is_admin():
+        return jsonify({"error": "Admin token required"}), 403
+    if profiler is None:
+        return jsonify({"error": "Profiling is disabled"}), 404
+
+    try:
+        path = profiler.profile_path(name)
+    except FileNotFoundError:
+        return jsonify({"error": f"Unknown profile '{name}'"}), 404
+    return send_file(path.resolve(), as_attachment=True, download_name=path.name)
+
+
 @app.route("/items/popular", methods=["GET"])
+@admission_controlled
 def popular_items():
-    """Get most popular items"""
+    """
+    Get most popular items
+
+    Pass cursor (from next_cursor) to fetch the next page, and stream=1 or
+    Accept: application/x-ndjson for newline-delimited JSON.
+    """
     try:
-        top_n = request.args.get("top_n", 20, type=int)
+        top_n = cap_top_n(request.args.get("top_n", 20, type=int))
         category = request.args.get("category", None)
+        cursor = request.args.get("cursor")
+        stream = wants_stream()
+
+        entry = requested_model("professional")
+        if entry is None:
+            return jsonify({"error": "Model not loaded"}), 500
+        current = entry.model
+
+        if not cursor and not stream:
+            # Get popular items
+            popular = current.get_popular_courses(category, top_n)
+
+            return jsonify({
+                "items": popular,
+                "count": len(popular)
+            })
+
+        # Paged / streamed mode: resume from the cursor's position in the ranking
+        query = category or ""
+        start = decode_cursor(cursor, entry.tag, query).get("p") if cursor else 0
+        if not isinstance(start, int) or not 0 <= start <= current.n_courses:
+            raise ValueError("Invalid cursor")
+        limit = request.args.get("top_n", type=int) or (None if stream else 20)
+        if not stream:
+            limit = cap_top_n(limit)
+
+        lines = paged_lines(
+            current.iter_popular(category, start),
+            limit,
+            current.encode_popular,
+            lambda last: encode_cursor(entry.tag, query, p=current.popular_position(last) + 1),
+        )
+        return page_response(lines, stream, "items")
+
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error getting popular items: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/items/<course_id>/similar", methods=["GET"])
+@admission_controlled
+def similar_items(course_id):
+    """Courses most similar to a course (precomputed content neighbors)"""
+    try:
+        top_n = cap_top_n(request.args.get("top_n", 10, type=int))
+
+        entry = requested_model("professional")
+        if entry is None:
+            return jsonify({"error": "Model not loaded"}), 500
+
+        try:
+            items_json, count = entry.model.similar_courses_json(course_id, top_n)
+        except KeyError:
+            return jsonify({"error": f"Unknown course '{course_id}'"}), 404
+
+        return json_response(b"".join([
+            b'{"course_id":', json.dumps(course_id).encode("utf-8"),
+            b',"items":', items_json,
+            b',"count":', str(count).encode("ascii"), b"}",
+        ]))
+
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error getting similar items: {e}")
+        return jsonify({"error": str(e)}), 500
 
-        if model is None:
+
+@app.route("/search", methods=["GET"])
+@admission_controlled
+def search_courses():
+    """Full-text catalog search (BM25 over course titles and descriptions)"""
+    try:
+        query = request.args.get("q", "").strip()
+        top_n = cap_top_n(request.args.get("top_n", 10, type=int))
+
+        if not query:
+            return jsonify({"error": "Query parameter 'q' is required"}), 400
+
+        entry = requested_model("professional")
+        if entry is None:
             return jsonify({"error": "Model not loaded"}), 500
 
-        # Get popular items
-        popular = model.get_popular_courses(category, top_n)
+        results_json, count = entry.model.search_json(query, top_n)
+        return json_response(b"".join([
+            b'{"query":', json.dumps(query).encode("utf-8"),
+            b',"results":', results_json,
+            b',"count":', str(count).encode("ascii"), b"}",
+        ]))
+
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error searching courses: {e}")
+        return jsonify({"error": str(e)}), 500
 
+
+@app.route("/search/autocomplete", methods=["GET"])
+@admission_controlled
+def autocomplete_courses():
+    """Most popular courses whose title starts with the typed prefix"""
+    try:
+        prefix = request.args.get("q", "")
+        limit = cap_top_n(request.args.get("limit", 8, type=int), "limit")
+
+        entry = requested_model("professional")
+        if entry is None:
+            return jsonify({"error": "Model not loaded"}), 500
+
+        suggestions = entry.model.autocomplete(prefix, limit)
         return jsonify({
-            "items": popular,
-            "count": len(popular)
+            "query": prefix,
+            "suggestions": suggestions,
+            "count": len(suggestions)
         })
 
+    except UnknownModel as e:
+        return unknown_model(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        logger.error(f"Error getting popular items: {e}")
+        logger.error(f"Error completing '{prefix}': {e}")
         return jsonify({"error": str(e)}), 500
 
 
@@ -125,9 +1030,16 @@ if __name__ == "__main__":
     print("=" * 60)
     
     if load_model():
+        load_hybrid_model()
+        load_registry_config()
+        if MICRO_BATCHING:
+            start_batcher()
+        install_profiler()
+        # Serve /health right away; /ready passes once warm-up is done
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
         print(f"\n✅ Ready to serve recommendations!")
-        print(f"   Total courses: {len(model.courses_df)}")
-        print(f"   Categories: {model.courses_df['category'].nunique()}")
+        print(f"   Total courses: {model.n_courses}")
+        print(f"   Categories: {len(model.categories)}")
         print(f"\n🚀 Starting server on http://localhost:5000")
         print("=" * 60)
         app.run(host="0.0.0.0", port=5000, debug=False)
@@ -0,0 +1,134 @@
+"""
+Admission Control - Bounded concurrency, short queue and deadline-based load shedding
+"""
+from collections import deque
+from typing import Dict
+import math
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Request shed before doing any work"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits concurrent requests to max_in_flight, with a FIFO queue of at most
+    max_queue waiters behind them.
+
+    A request is rejected up front when the queue is full or when the estimated
+    wait (queue position / max_in_flight * EWMA of service time) already exceeds
+    its deadline, and it gives up if its deadline passes while queued. Requests
+    that are admitted therefore start within their deadline instead of every
+    request timing out under overload.
+    """
+
+    def __init__(self, max_in_flight: int = 4, max_queue: int = 16, ewma_alpha: float = 0.2):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.ewma_alpha = ewma_alpha
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque()  # threading.Event per queued request, oldest first
+        self._service_time = 0.0  # EWMA, seconds
+
+        # Metrics
+        self._admitted = 0
+        self._rejected = {"queue_full": 0, "deadline": 0, "timeout": 0}
+        self._recent_waits = deque(maxlen=1000)
+
+    def _estimated_wait(self, position: int) -> float:
+        """Expected time until the request at queue position `position` (1-based) starts"""
+        return math.ceil(position / self.max_in_flight) * self._service_time
+
+    def acquire(self, deadline: float) -> float:
+        """
+        Take an execution slot, waiting at most `deadline` seconds
+
+        Returns:
+            Seconds spent queued
+        Raises:
+            AdmissionRejected if the request should be shed
+        """
+        started = time.perf_counter()
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                self._admitted += 1
+                self._recent_waits.append(0.0)
+                return 0.0
+
+            position = len(self._waiters) + 1
+            estimate = self._estimated_wait(position)
+            if position > self.max_queue:
+                self._rejected["queue_full"] += 1
+                raise AdmissionRejected("queue_full", estimate)
+            if estimate > deadline:
+                self._rejected["deadline"] += 1
+                raise AdmissionRejected("deadline", estimate)
+
+            event = threading.Event()
+            self._waiters.append(event)
+
+        if not event.wait(deadline):
+            with self._lock:
+                # The slot may have been handed over right as the wait timed out
+                if not event.is_set():
+                    self._waiters.remove(event)
+                    self._rejected["timeout"] += 1
+                    raise AdmissionRejected("timeout", self._estimated_wait(len(self._waiters) + 1))
+
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._admitted += 1
+            self._recent_waits.append(waited)
+        return waited
+
+    def release(self, service_time: float):
+        """Give the slot back (to the oldest waiter, if any) and record the service time"""
+        with self._lock:
+            if self._service_time == 0.0:
+                self._service_time = service_time
+            else:
+                self._service_time += self.ewma_alpha * (service_time - self._service_time)
+
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict:
+        """Slot usage, rejection counters and recent queue waits"""
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            in_flight = self._in_flight
+            queued = len(self._waiters)
+            service_time = self._service_time
+            admitted = self._admitted
+            rejected = dict(self._rejected)
+
+        def percentile(q):
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 3) if waits else 0.0
+
+        return {
+            "enabled": True,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queued": queued,
+            "admitted": admitted,
+            "rejected": rejected,
+            "service_time_ms": round(service_time * 1000, 3),
+            "queue_wait_p50_ms": percentile(0.50),
+            "queue_wait_p99_ms": percentile(0.99),
+        }
@@ -1,17 +1,44 @@
 """
 Advanced Recommendation Model - Content-based with major-specific matching
+
+pandas and scikit-learn are only imported for training, pickled models and
+courses_df; a model loaded with load_runtime() serves with NumPy/SciPy alone.
 """
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import Dict, List
+from scipy.sparse import csr_matrix
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+import json
 import pickle
+import re
+import shutil
+import time
 import logging
 
+from tfidf_runtime import TfidfRuntime
+from memory_usage import compact_frame, touch_pages
+from similarity import all_pairs_similarity
+from catalog_search import CatalogSearchIndex
+from diversity import mmr_select
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import orjson  # optional, faster JSON encoding of response fragments
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def encode_json(obj, fast: bool = True) -> bytes:
+    """Serialize obj to compact JSON bytes, with orjson when available and requested"""
+    if fast and orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
 class AdvancedRecommender:
     """
     Professional hybrid recommendation system:
@@ -20,16 +47,64 @@ class AdvancedRecommender:
     - Quality-based: Boost highly-rated courses
     """
 
+    # Version of the export_runtime() directory layout
+    RUNTIME_FORMAT_VERSION = 1
+
+    # Catalog columns used for serving, with defaults for missing ones
+    CATALOG_COLUMNS = {
+        "course_id": "",
+        "title": "",
+        "description": "",
+        "category": "General",
+        "difficulty": "Intermediate",
+        "source": "Coursera",
+        "url": "#",
+        "rating": 4.0,
+        "num_ratings": 0,
+    }
+
+    # Most similar courses precomputed per course (see _build_neighbors)
+    SIMILAR_COURSES = 20
+
+    # With diversity > 0, MMR re-ranks a pool of top_n * DIVERSITY_POOL candidates
+    DIVERSITY_POOL = 5
+
+    # Save profiles: "lean" leaves out fit-only state and compacts the catalog (see save)
+    PROFILES = ("full", "lean")
+
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(
+        self.vectorizer_params = dict(
             max_features=2000,
             stop_words="english",
             ngram_range=(1, 3),
             min_df=2,
         )
-        self.courses_df = None
+        self.vectorizer = None  # TfidfVectorizer, created by fit()
+        self.tfidf = None  # TfidfRuntime used for queries
+        self._courses_df = None
         self.course_vectors = None
 
+        # Serving index built from the catalog (see _build_serving_index)
+        self.fast_json = orjson is not None
+        self._course_vectors_t = None
+        self._columns = {}
+        self._ratings = None
+        self._difficulty = None
+        self._category_codes = None
+        self._categories = []
+        self._popular_order = None
+        self._popular_rank = None
+        self._fragments = []
+        self._course_index = {}
+
+        # (courses, SIMILAR_COURSES) neighbor rows and cosine scores, best first;
+        # rows with fewer similar courses are padded with index -1
+        self.neighbor_indices = None
+        self.neighbor_scores = None
+
+        # BM25 inverted index and title autocomplete (see catalog_search)
+        self.search_index = None
+
         # Major to keyword mapping - CRITICAL for accurate recommendations
         self.major_keywords = {
             # Computer Science & IT
@@ -127,44 +202,330 @@ class AdvancedRecommender:
             "Other": "general education learning academic",
         }
 
-    def fit(self, courses_df: pd.DataFrame):
-        """Train the recommendation model"""
-        self.courses_df = courses_df.copy()
+    @property
+    def courses_df(self) -> "pd.DataFrame":
+        """Course catalog; built from the serving columns on first use after load_runtime()"""
+        if self._courses_df is None and self._columns:
+            import pandas as pd
+            self._courses_df = pd.DataFrame(self._columns)
+        return self._courses_df
+
+    @courses_df.setter
+    def courses_df(self, courses_df: "pd.DataFrame"):
+        self._courses_df = courses_df
+
+    @property
+    def n_courses(self) -> int:
+        return 0 if self.course_vectors is None else self.course_vectors.shape[0]
+
+    @property
+    def categories(self) -> List[str]:
+        """Distinct course categories, in catalog order"""
+        return list(self._categories)
 
-        # Create rich text representations
-        self.courses_df["full_text"] = (
-            self.courses_df["title"].fillna("")
+    @staticmethod
+    def _full_text(courses_df: "pd.DataFrame") -> "pd.Series":
+        """Rich text representation of each course"""
+        return (
+            courses_df["title"].fillna("")
             + " "
-            + self.courses_df["description"].fillna("")
+            + courses_df["description"].fillna("")
             + " "
-            + self.courses_df["category"].fillna("")
+            + courses_df["category"].fillna("")
         )
 
-        # Vectorize courses
-        self.course_vectors = self.vectorizer.fit_transform(
-            self.courses_df["full_text"]
-        )
+    def fit(self, courses_df: "pd.DataFrame", n_jobs: int = 1, chunk_size: int = 10000):
+        """
+        Train the recommendation model
+
+        With n_jobs != 1 the TF-IDF model is fitted by ParallelTfidfFitter:
+        course text is built chunk_size courses at a time and counted and
+        transformed in worker processes (n_jobs=None for all cores), giving the
+        same vocabulary, idf and course vectors as the single-process vectorizer.
+        """
+        self.courses_df = courses_df.copy()
+        self.neighbor_indices = self.neighbor_scores = None
+        self.search_index = None
+
+        if n_jobs == 1:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            self.vectorizer = TfidfVectorizer(**self.vectorizer_params)
+
+            # Vectorize rich text representations (only needed here, not kept in courses_df)
+            self.course_vectors = self.vectorizer.fit_transform(self._full_text(self.courses_df))
+
+            # Terms cut by min_df / max_features, kept by scikit-learn for introspection
+            # only (documented as safe to drop); often larger than the vocabulary itself
+            if hasattr(self.vectorizer, "stop_words_"):
+                self.vectorizer.stop_words_ = None
+        else:
+            from parallel_tfidf import ParallelTfidfFitter
+
+            def text_chunks():
+                for start in range(0, len(self.courses_df), chunk_size):
+                    yield self._full_text(self.courses_df.iloc[start: start + chunk_size]).tolist()
+
+            fitter = ParallelTfidfFitter(n_jobs=n_jobs, **self.vectorizer_params)
+            self.course_vectors = fitter.fit_transform(text_chunks)
+            self.vectorizer = None
+            self.tfidf = fitter.runtime
+
+        self._build_serving_index()
 
         logger.info("✅ Advanced model trained")
         logger.info(f"   - {len(self.courses_df)} courses indexed")
         logger.info(f"   - {self.course_vectors.shape[1]} features extracted")
 
-    def recommend(self, user_profile: Dict, top_n: int = 10) -> List[Dict]:
+    def _build_serving_index(self):
+        """
+        Precompute per-course serving data from the catalog
+
+        Ranking reads ratings and difficulty from plain arrays, and the static
+        part of every course's output is encoded to JSON bytes once, so responses
+        are assembled by splicing fragments with the per-request scores. The
+        columns come from courses_df, or were already set by load_runtime().
+        """
+        n_courses = self.n_courses
+
+        if self._courses_df is not None:
+            self._columns = {
+                name: self._courses_df[name].to_numpy(dtype=object)
+                if name in self._courses_df.columns else np.full(n_courses, default, dtype=object)
+                for name, default in self.CATALOG_COLUMNS.items()
+            }
+        if self.vectorizer is not None:
+            self.tfidf = TfidfRuntime.from_vectorizer(self.vectorizer)
+
+        # Course vectors are l2-normalized, so cosine similarity is a sparse dot product
+        self._course_vectors_t = csr_matrix(self.course_vectors.T)
+
+        self._ratings = np.asarray(self._columns["rating"], dtype=np.float64)
+        self._difficulty = self._columns["difficulty"]
+
+        # Category codes for filtering (-1 for missing categories), and the popularity
+        # ranking (rating, then number of reviews, both descending; ties by catalog order)
+        category_codes = {}
+        self._category_codes = np.array([
+            category_codes.setdefault(category, len(category_codes)) if isinstance(category, str) else -1
+            for category in self._columns["category"]
+        ], dtype=np.int64)
+        self._categories = list(category_codes)
+        num_ratings = np.asarray(self._columns["num_ratings"], dtype=np.float64)
+        self._popular_order = np.lexsort((-num_ratings, -self._ratings))
+        self._popular_rank = np.empty(n_courses, dtype=np.int64)
+        self._popular_rank[self._popular_order] = np.arange(n_courses)
+
+        self._fragments = [
+            encode_json(self._course_record(idx), self.fast_json)[1:-1]
+            for idx in range(n_courses)
+        ]
+
+        # course_id -> row for similar-course lookups; neighbors and the search
+        # index are built here when the model was just fitted or was saved without them
+        self._course_index = {}
+        for idx, course_id in enumerate(self._columns["course_id"]):
+            self._course_index.setdefault(str(course_id), idx)
+        if self.neighbor_indices is None or len(self.neighbor_indices) != n_courses:
+            self._build_neighbors()
+        if self.search_index is None or self.search_index.n_courses != n_courses:
+            self.search_index = CatalogSearchIndex.build(
+                self._columns["title"], self._columns["description"],
+                self.tfidf.vocabulary, self.tfidf.analyze, self._popular_rank,
+            )
+
+    def _build_neighbors(self, n_jobs: int = None):
+        """Top SIMILAR_COURSES neighbors of every course, from a blockwise kNN pass over course_vectors"""
+        n_courses, k = self.n_courses, self.SIMILAR_COURSES
+        similarity = all_pairs_similarity(self.course_vectors, top_k=k, exclude_self=True, n_jobs=n_jobs)
+
+        # Best first within each row, ties by catalog order
+        counts = np.diff(similarity.indptr)
+        rows = np.repeat(np.arange(n_courses), counts)
+        order = np.lexsort((similarity.indices, -similarity.data, rows))
+        positions = np.arange(len(order)) - np.repeat(similarity.indptr[:-1], counts)
+
+        self.neighbor_indices = np.full((n_courses, k), -1, dtype=np.int32)
+        self.neighbor_scores = np.zeros((n_courses, k), dtype=np.float32)
+        self.neighbor_indices[rows, positions] = similarity.indices[order]
+        self.neighbor_scores[rows, positions] = similarity.data[order]
+
+    def _course_record(self, idx: int) -> Dict:
+        """Static output fields of one course"""
+        columns = self._columns
+        course_id = str(columns["course_id"][idx])
+        rating = float(self._ratings[idx])
+        return {
+            "item_id": course_id,
+            "course_id": course_id,
+            "title": str(columns["title"][idx]),
+            "description": str(columns["description"][idx])[:250] + "...",
+            "category": str(columns["category"][idx]),
+            "difficulty": str(self._difficulty[idx]),
+            "rating": rating,
+            "source": str(columns["source"][idx]),
+            "url": str(columns["url"][idx]),
+            "num_ratings": int(columns["num_ratings"][idx]),
+            "avg_rating": rating,
+        }
+
+    def recommend(self, user_profile: Dict, top_n: int = 10, diversity: float = 0.0) -> List[Dict]:
         """
         Generate personalized recommendations for a user
 
         Args:
             user_profile: {major, interests, year, gpa}
             top_n: Number of recommendations
+            diversity: MMR trade-off between relevance (0) and novelty (1)
 
         Returns:
             List of course recommendations with scores
         """
-        major = user_profile.get("major", "")
-        interests = user_profile.get("interests", "")
+        return self.recommend_batch([user_profile], [top_n], [diversity])[0]
+
+    def recommend_batch(self, user_profiles: List[Dict], top_ns: List[int],
+                        diversities: List[float] = None) -> List[List[Dict]]:
+        """Generate recommendations for several users at once"""
+        return [
+            [
+                {
+                    **self._course_record(idx),
+                    "predicted_rating": round(predicted_rating, 2),
+                    "confidence": round(confidence, 2),
+                    "match_score": round(similarity, 2),
+                }
+                for idx, similarity, confidence, predicted_rating in ranked
+            ]
+            for ranked in self._rank_batch(user_profiles, top_ns, diversities)
+        ]
+
+    def recommend_json(self, user_profile: Dict, top_n: int = 10, diversity: float = 0.0) -> Tuple[bytes, int]:
+        """Recommendations as a serialized JSON array plus the number of items"""
+        return self.recommend_batch_json([user_profile], [top_n], [diversity])[0]
+
+    def recommend_batch_json(self, user_profiles: List[Dict], top_ns: List[int],
+                             diversities: List[float] = None) -> List[Tuple[bytes, int]]:
+        """
+        Serialized recommendations for several users at once
+
+        Each item is the course's pre-encoded fragment followed by its scores, so
+        no per-course dict is built and only the three scores are encoded.
+        """
+        results = []
+        for ranked in self._rank_batch(user_profiles, top_ns, diversities):
+            items = [self.encode_recommendation(candidate) for candidate in ranked]
+            results.append((b"[" + b",".join(items) + b"]", len(items)))
+        return results
+
+    def encode_recommendation(self, candidate: Tuple[int, float, float, float]) -> bytes:
+        """JSON object for one (index, similarity, confidence, predicted rating) candidate"""
+        idx, similarity, confidence, predicted_rating = candidate
+        return b"".join([
+            b"{", self._fragments[idx],
+            b',"predicted_rating":', encode_json(round(predicted_rating, 2), self.fast_json),
+            b',"confidence":', encode_json(round(confidence, 2), self.fast_json),
+            b',"match_score":', encode_json(round(similarity, 2), self.fast_json),
+            b"}",
+        ])
+
+    def iter_recommendations(self, user_profile: Dict, page_size: int = 10,
+                             after: int = 0) -> Iterator[Tuple[List[Tuple[int, float, float, float]], Optional[int]]]:
+        """
+        Lazily walk the ranking for a user profile, one page at a time
+
+        Every page is ranked the way recommend() ranks: the courses that pass the
+        year/difficulty filter among the next 3 x page_size by similarity, at most
+        page_size of them, ordered by displayed confidence. The first page is
+        therefore recommend(user_profile, page_size). Each page comes with the
+        position in the similarity order where it ended, None after the last
+        page; passing that position as `after` resumes the walk with the next page.
+
+        Yields:
+            ([(course index, similarity, confidence, predicted rating), ...], position)
+        """
+        similarities = self._similarities([user_profile])[0]
+        return self._iter_pages(similarities, user_profile, page_size, after)
+
+    def _iter_pages(self, similarities: np.ndarray, user_profile: Dict, page_size: int,
+                    after: int = 0) -> Iterator[Tuple[List[Tuple[int, float, float, float]], Optional[int]]]:
+        """Pages of one similarity row (see iter_recommendations)"""
+        if page_size < 1:
+            return
         year = int(user_profile.get("year", 2))
         gpa = float(user_profile.get("gpa", 3.0))
 
+        # Similarity order; argsort is deterministic, so a position in it stays
+        # valid for the same model and profile
+        order = similarities.argsort()[::-1]
+        position = after
+        while position < len(order):
+            # Get top candidates (3x for filtering)
+            window = order[position : position + page_size * 3]
+
+            ranked = []
+            end = position + len(window)
+            for offset, idx in enumerate(window):
+                similarity = float(similarities[idx])
+
+                # Filter by difficulty based on year
+                difficulty = self._difficulty[idx]
+                if year <= 1 and difficulty == "Advanced":
+                    continue  # Skip advanced for freshmen
+                if year >= 4 and difficulty == "Beginner" and gpa > 3.5:
+                    continue  # Skip beginner for high-performing seniors
+
+                # Calculate confidence score (similarity + quality)
+                quality_score = self._ratings[idx] / 5.0
+                confidence = float((similarity * 0.7) + (quality_score * 0.3))
+
+                # Predict user rating
+                predicted_rating = 3.0 + (confidence * 2.0)
+                predicted_rating = min(predicted_rating, 5.0)
+
+                ranked.append((int(idx), similarity, confidence, predicted_rating))
+
+                if len(ranked) >= page_size:
+                    end = position + offset + 1
+                    break
+
+            # Sort by (displayed) confidence
+            ranked.sort(key=lambda candidate: round(candidate[2], 2), reverse=True)
+
+            position = end
+            yield ranked, position if position < len(order) else None
+
+    def _similarities(self, user_profiles: List[Dict]) -> np.ndarray:
+        """(profiles, courses) similarity matrix"""
+        queries = [self._build_query(user_profile) for user_profile in user_profiles]
+
+        # Vectorize user profiles
+        user_vectors = self.tfidf.transform(queries)
+
+        # Compute similarities
+        return (user_vectors @ self._course_vectors_t).toarray()
+
+    def _rank_batch(self, user_profiles: List[Dict], top_ns: List[int],
+                    diversities: List[float] = None) -> List[List[Tuple[int, float, float, float]]]:
+        """
+        Rank courses for several users at once
+
+        All profiles are vectorized with one transform call and scored against the
+        catalog with one similarity computation; only the per-user filtering runs
+        row by row.
+        """
+        similarities = self._similarities(user_profiles)
+        diversities = diversities or [0.0] * len(user_profiles)
+
+        return [
+            self._rank(similarities[i], user_profile, top_n, diversity)
+            for i, (user_profile, top_n, diversity) in enumerate(zip(user_profiles, top_ns, diversities))
+        ]
+
+    def _build_query(self, user_profile: Dict) -> str:
+        """Build the text query for a user profile"""
+        major = user_profile.get("major", "")
+        interests = user_profile.get("interests", "")
+
         # Build user query with major-specific keywords
         # Use mapping if available, otherwise use major name + common keywords
         major_keywords = self.major_keywords.get(major, major.lower())
@@ -173,93 +534,162 @@ class AdvancedRecommender:
             # Extract key terms from major name (e.g., "Computer Science" -> "computer science programming")
             major_keywords = major.lower()
         
-        user_query = f"{major} {major_keywords} {interests}".lower()
+        return f"{major} {major_keywords} {interests}".lower()
+
+    def _rank(self, similarities: np.ndarray, user_profile: Dict, top_n: int,
+              diversity: float = 0.0) -> List[Tuple[int, float, float, float]]:
+        """
+        Turn one user's similarity row into filtered, scored candidates
 
-        # Vectorize user profile
-        user_vector = self.vectorizer.transform([user_query])
+        With diversity > 0 a larger pool of candidates is scored and MMR picks
+        top_n of them (see _diversify).
 
-        # Compute similarities
-        similarities = cosine_similarity(user_vector, self.course_vectors)[0]
+        Returns:
+            (course index, similarity, confidence, predicted rating) tuples,
+            best first
+        """
+        pool_size = top_n * self.DIVERSITY_POOL if diversity > 0 else top_n
+        ranked, _ = next(self._iter_pages(similarities, user_profile, pool_size), ([], None))
 
-        # Get top candidates (3x for filtering)
-        top_indices = similarities.argsort()[-top_n * 3 :][::-1]
+        if diversity > 0:
+            return self._diversify(ranked, top_n, diversity)
 
-        recommendations = []
-        for idx in top_indices:
-            course = self.courses_df.iloc[idx]
-            similarity = similarities[idx]
+        return ranked
 
-            # Filter by difficulty based on year
-            difficulty = course.get("difficulty", "Intermediate")
-            if year <= 1 and difficulty == "Advanced":
-                continue  # Skip advanced for freshmen
-            if year >= 4 and difficulty == "Beginner" and gpa > 3.5:
-                continue  # Skip beginner for high-performing seniors
+    def _diversify(self, pool: List[Tuple[int, float, float, float]], top_n: int,
+                   diversity: float) -> List[Tuple[int, float, float, float]]:
+        """
+        MMR re-rank of scored candidates: confidence is the relevance and the
+        course TF-IDF vectors measure redundancy. Results stay in selection order.
+        """
+        if not 0.0 <= diversity <= 1.0:
+            raise ValueError("diversity must be between 0 and 1")
+        indices = np.array([candidate[0] for candidate in pool], dtype=np.int64)
+        relevance = np.array([candidate[2] for candidate in pool])
+        picks = mmr_select(self.course_vectors[indices], relevance, top_n, diversity)
+        return [pool[pick] for pick in picks]
 
-            # Calculate confidence score (similarity + quality)
-            quality_score = course.get("rating", 4.0) / 5.0
-            confidence = (similarity * 0.7) + (quality_score * 0.3)
+    def similar_course_indices(self, course_id: str, top_n: int = 10) -> List[Tuple[int, float]]:
+        """
+        (course index, similarity) of the courses most similar to course_id,
+        best first and at most SIMILAR_COURSES; KeyError for unknown ids
+        """
+        idx = self._course_index[str(course_id)]
+        neighbors = self.neighbor_indices[idx, :top_n]
+        scores = self.neighbor_scores[idx, :top_n]
+        return [(int(neighbor), float(score)) for neighbor, score in zip(neighbors, scores) if neighbor >= 0]
 
-            # Predict user rating
-            predicted_rating = 3.0 + (confidence * 2.0)
-            predicted_rating = min(predicted_rating, 5.0)
+    def similar_courses(self, course_id: str, top_n: int = 10) -> List[Dict]:
+        """Courses most similar to course_id"""
+        return [
+            {**self._course_record(idx), "similarity": round(score, 4)}
+            for idx, score in self.similar_course_indices(course_id, top_n)
+        ]
 
-            recommendations.append(
-                {
-                    "item_id": str(course["course_id"]),
-                    "course_id": str(course["course_id"]),
-                    "title": str(course["title"]),
-                    "description": str(course.get("description", ""))[:250] + "...",
-                    "category": str(course.get("category", "General")),
-                    "difficulty": str(difficulty),
-                    "rating": float(course.get("rating", 4.0)),
-                    "predicted_rating": round(predicted_rating, 2),
-                    "confidence": round(confidence, 2),
-                    "match_score": round(similarity, 2),
-                    "source": str(course.get("source", "Coursera")),
-                    "url": str(course.get("url", "#")),
-                    "num_ratings": int(course.get("num_ratings", 0)),
-                    "avg_rating": float(course.get("rating", 4.0)),
-                }
-            )
+    def similar_courses_json(self, course_id: str, top_n: int = 10) -> Tuple[bytes, int]:
+        """Similar courses as a serialized JSON array plus the number of items"""
+        items = [
+            b"".join([b"{", self._fragments[idx], b',"similarity":', encode_json(round(score, 4), self.fast_json), b"}"])
+            for idx, score in self.similar_course_indices(course_id, top_n)
+        ]
+        return b"[" + b",".join(items) + b"]", len(items)
 
-            if len(recommendations) >= top_n:
-                break
+    def search(self, query: str, top_n: int = 10) -> List[Tuple[int, float]]:
+        """(course index, BM25 score) of the courses best matching a free-text query"""
+        vocabulary = self.tfidf.vocabulary
+        term_ids = [vocabulary[term] for term in self.tfidf.analyze(query) if term in vocabulary]
+        return self.search_index.search(term_ids, top_n)
 
-        # Sort by confidence
-        recommendations.sort(key=lambda x: x["confidence"], reverse=True)
+    def search_json(self, query: str, top_n: int = 10) -> Tuple[bytes, int]:
+        """Search results as a serialized JSON array plus the number of items"""
+        items = [
+            b"".join([b"{", self._fragments[idx], b',"score":', encode_json(round(score, 4), self.fast_json), b"}"])
+            for idx, score in self.search(query, top_n)
+        ]
+        return b"[" + b",".join(items) + b"]", len(items)
 
-        return recommendations
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Most popular courses whose title starts with prefix"""
+        columns = self._columns
+        return [
+            {"course_id": str(columns["course_id"][idx]), "title": str(columns["title"][idx])}
+            for idx in self.search_index.autocomplete(prefix, limit)
+        ]
 
     def get_popular_courses(self, category: str = None, top_n: int = 10) -> List[Dict]:
         """Get popular courses, optionally filtered by category"""
-        df = self.courses_df.copy()
+        return [self._popular_record(idx) for _, idx in zip(range(top_n), self.iter_popular(category))]
 
+    def iter_popular(self, category: str = None, start: int = 0) -> Iterator[int]:
+        """
+        Walk the precomputed popularity ranking, optionally filtered by category
+
+        `start` is a position in the unfiltered ranking (see popular_position),
+        so a page can resume where the previous one stopped without re-sorting.
+        """
+        order = self._popular_order[start:]
         if category:
-            df = df[
-                df["category"].str.contains(category, case=False, na=False)
-            ]
+            # Same semantics as str.contains(category, case=False): regex search
+            pattern = re.compile(category, re.IGNORECASE)
+            matching = [code for code, name in enumerate(self._categories) if pattern.search(name)]
+            order = order[np.isin(self._category_codes[order], matching)]
+        for idx in order:
+            yield int(idx)
 
-        # Sort by rating and number of reviews
-        df = df.sort_values(
-            ["rating", "num_ratings"], ascending=[False, False]
-        ).head(top_n)
+    def popular_position(self, idx: int) -> int:
+        """Position of a course in the unfiltered popularity ranking"""
+        return int(self._popular_rank[idx])
 
-        return df[
-            ["course_id", "title", "rating", "category", "source", "num_ratings"]
-        ].to_dict("records")
+    def _popular_record(self, idx: int) -> Dict:
+        """Output fields of a course in popularity listings"""
+        columns = self._columns
+        return {
+            "course_id": columns["course_id"][idx],
+            "title": columns["title"][idx],
+            "rating": columns["rating"][idx],
+            "category": columns["category"][idx],
+            "source": columns["source"][idx],
+            "num_ratings": columns["num_ratings"][idx],
+        }
+
+    def encode_popular(self, idx: int) -> bytes:
+        """JSON object for a course in popularity listings"""
+        return encode_json(self._popular_record(idx), self.fast_json)
 
-    def save(self, filepath: str):
-        """Save trained model"""
+    def save(self, filepath: str, profile: str = "full"):
+        """
+        Save trained model
+
+        profile="lean" leaves out fit-only state: the scikit-learn vectorizer is
+        replaced by its TfidfRuntime export and courses_df keeps only the serving
+        columns, compacted (numeric columns downcast where exact, repeated strings
+        such as category, difficulty and source stored once).
+        """
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {self.PROFILES}")
+        lean = profile == "lean"
+
+        courses_df = self.courses_df
+        if lean:
+            courses_df = compact_frame(courses_df[[name for name in self.CATALOG_COLUMNS if name in courses_df.columns]])
         model_data = {
-            "vectorizer": self.vectorizer,
-            "courses_df": self.courses_df,
+            "vectorizer": None if lean else self.vectorizer,
+            "courses_df": courses_df,
             "course_vectors": self.course_vectors,
             "major_keywords": self.major_keywords,
+            "neighbors": {"indices": self.neighbor_indices, "scores": self.neighbor_scores},
+            "search": {"settings": self.search_index.settings(), "arrays": self.search_index.arrays()},
         }
+        if model_data["vectorizer"] is None:
+            # Fitted without scikit-learn (see ParallelTfidfFitter) or lean profile.
+            # The vocabulary is pickled as objects: a fixed-width string array
+            # would pad every term to the longest n-gram
+            arrays = self.tfidf.arrays()
+            arrays["vocabulary"] = arrays["vocabulary"].astype(object)
+            model_data["tfidf"] = {"settings": self.tfidf.settings(), "arrays": arrays}
         with open(filepath, "wb") as f:
             pickle.dump(model_data, f)
-        logger.info(f"✅ Model saved to {filepath}")
+        logger.info(f"✅ Model saved to {filepath} ({profile} profile)")
 
     def load(self, filepath: str):
         """Load trained model"""
@@ -270,4 +700,178 @@ class AdvancedRecommender:
         self.courses_df = model_data["courses_df"]
         self.course_vectors = model_data["course_vectors"]
         self.major_keywords = model_data.get("major_keywords", {})
+        if "tfidf" in model_data:
+            self.tfidf = TfidfRuntime.from_export(model_data["tfidf"]["settings"], model_data["tfidf"]["arrays"])
+        neighbors = model_data.get("neighbors", {})
+        self.neighbor_indices = neighbors.get("indices")
+        self.neighbor_scores = neighbors.get("scores")
+        search = model_data.get("search")
+        self.search_index = CatalogSearchIndex.from_arrays(search["settings"], search["arrays"]) if search else None
+        self._build_serving_index()
         logger.info(f"✅ Model loaded from {filepath}")
+
+    def warm_up(self, top_n: int = 10) -> Dict:
+        """
+        Exercise the serving path before the first request
+
+        Faults in every page of the model arrays, then runs one batched query
+        per major in major_keywords (for several study years) and one popular
+        listing per category.
+        """
+        started = time.perf_counter()
+
+        arrays = [
+            self.course_vectors, self._course_vectors_t, self._ratings,
+            self._category_codes, self._popular_order, self._popular_rank,
+            self.neighbor_indices, self.neighbor_scores,
+            *self.search_index.arrays().values(),
+        ]
+        if self.tfidf is not None and self.tfidf.idf is not None:
+            arrays.append(self.tfidf.idf)
+        touched = sum(touch_pages(array) for array in arrays)
+
+        profiles = [
+            {"major": major, "interests": "", "year": year, "gpa": 3.0}
+            for major in self.major_keywords
+            for year in (1, 2, 4)
+        ]
+        self.recommend_batch_json(profiles, [top_n] * len(profiles))
+        for category in [None] + self._categories:
+            self.get_popular_courses(category, top_n)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Warm-up: {len(profiles)} queries, {len(self._categories) + 1} popular listings in {elapsed:.2f}s")
+        return {
+            "queries": len(profiles),
+            "popular_listings": len(self._categories) + 1,
+            "bytes_touched": touched,
+            "seconds": round(elapsed, 3),
+        }
+
+    def export_runtime(self, dirpath: str, profile: str = "full"):
+        """
+        Export an inference-only copy of the model for load_runtime()
+
+        The directory holds .npy arrays (vocabulary, idf, course vectors, similar
+        course neighbors, search index and the catalog columns used for serving)
+        plus manifest.json with the tokenizer and search settings and major
+        keywords; none of it needs pandas or scikit-learn to read.
+
+        profile="lean" downcasts the numeric catalog columns where exact and
+        stores repeated strings (category, difficulty, source) as codes into
+        their distinct values, which load_runtime() shares between courses.
+        """
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {self.PROFILES}")
+
+        arrays = {f"tfidf.{name}": array for name, array in self.tfidf.arrays().items()}
+        vectors = csr_matrix(self.course_vectors)
+        arrays["course_vectors.data"] = vectors.data
+        arrays["course_vectors.indices"] = vectors.indices
+        arrays["course_vectors.indptr"] = vectors.indptr
+        arrays["neighbors.indices"] = self.neighbor_indices
+        arrays["neighbors.scores"] = self.neighbor_scores
+        for name, array in self.search_index.arrays().items():
+            arrays[f"search.{name}"] = array
+        for name, values in self._columns.items():
+            if name in ("rating", "num_ratings"):
+                # Keeps int counts as int64 and anything else as float64
+                column = np.asarray(values.tolist())
+                arrays[f"catalog.{name}"] = self._downcast(column) if profile == "lean" else column
+                continue
+
+            column = np.asarray([str(value) for value in values], dtype=str)
+            if profile == "lean":
+                levels, codes = np.unique(column, return_inverse=True)
+                if len(levels) * 2 <= len(column):
+                    arrays[f"catalog.{name}.levels"] = levels
+                    arrays[f"catalog.{name}.codes"] = self._downcast(codes.astype(np.int64))
+                    continue
+            arrays[f"catalog.{name}"] = column
+
+        path = Path(dirpath)
+        tmp_path = path.with_name(path.name + ".tmp")
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        tmp_path.mkdir(parents=True)
+
+        manifest = {
+            "format_version": self.RUNTIME_FORMAT_VERSION,
+            "tfidf": self.tfidf.settings(),
+            "course_vectors_shape": list(vectors.shape),
+            "major_keywords": self.major_keywords,
+            "search": self.search_index.settings(),
+            "profile": profile,
+            "arrays": {},
+        }
+        for name, array in arrays.items():
+            np.save(tmp_path / f"{name}.npy", array, allow_pickle=False)
+            manifest["arrays"][name] = {"shape": list(array.shape), "dtype": array.dtype.str}
+
+        with open(tmp_path / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        if path.is_dir():
+            shutil.rmtree(path)
+        tmp_path.rename(path)
+        logger.info(f"✅ Runtime model exported to {dirpath} ({profile} profile)")
+
+    @staticmethod
+    def _downcast(column: np.ndarray) -> np.ndarray:
+        """Smallest integer or float dtype holding every value of a numeric column exactly"""
+        if column.dtype.kind in "iu":
+            for dtype in (np.int8, np.int16, np.int32):
+                if len(column) == 0 or (np.iinfo(dtype).min <= column.min() and column.max() <= np.iinfo(dtype).max):
+                    return column.astype(dtype)
+        elif column.dtype.kind == "f":
+            narrow = column.astype(np.float32)
+            if np.array_equal(narrow.astype(column.dtype), column, equal_nan=True):
+                return narrow
+        return column
+
+    def load_runtime(self, dirpath: str):
+        """Load a model written by export_runtime() (no pandas / scikit-learn imports)"""
+        path = Path(dirpath)
+        with open(path / "manifest.json") as f:
+            manifest = json.load(f)
+
+        version = manifest.get("format_version")
+        if version != self.RUNTIME_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported runtime format version {version} "
+                f"(expected {self.RUNTIME_FORMAT_VERSION})"
+            )
+
+        arrays = {}
+        for name, spec in manifest["arrays"].items():
+            array = np.load(path / f"{name}.npy", allow_pickle=False)
+            if list(array.shape) != spec["shape"] or array.dtype.str != spec["dtype"]:
+                raise ValueError(
+                    f"Array '{name}' is {array.dtype.str}{list(array.shape)}, "
+                    f"manifest expects {spec['dtype']}{spec['shape']}"
+                )
+            arrays[name] = array
+
+        self.tfidf = TfidfRuntime.from_export(manifest["tfidf"], {
+            name[len("tfidf."):]: array for name, array in arrays.items() if name.startswith("tfidf.")
+        })
+        self.vectorizer = None
+        self.course_vectors = csr_matrix(
+            (arrays["course_vectors.data"], arrays["course_vectors.indices"], arrays["course_vectors.indptr"]),
+            shape=tuple(manifest["course_vectors_shape"]),
+        )
+        # Object arrays of plain Python values, as read from courses_df; columns
+        # stored as codes (lean profile) share one string object per distinct value
+        self._courses_df = None
+        self._columns = {
+            name: arrays[f"catalog.{name}"].astype(object) if f"catalog.{name}" in arrays
+            else arrays[f"catalog.{name}.levels"].astype(object)[arrays[f"catalog.{name}.codes"]]
+            for name in self.CATALOG_COLUMNS
+        }
+        self.major_keywords = manifest["major_keywords"]
+        self.neighbor_indices = arrays.get("neighbors.indices")
+        self.neighbor_scores = arrays.get("neighbors.scores")
+        search_arrays = {name[len("search."):]: array for name, array in arrays.items() if name.startswith("search.")}
+        self.search_index = CatalogSearchIndex.from_arrays(manifest["search"], search_arrays) if "search" in manifest else None
+        self._build_serving_index()
+        logger.info(f"✅ Runtime model loaded from {dirpath}")
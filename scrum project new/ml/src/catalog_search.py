@@ -0,0 +1,262 @@
+"""
+Catalog Search - Inverted index with BM25 ranking and title prefix autocomplete
+"""
+from typing import Callable, Dict, List, Tuple
+import re
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_title(title: str) -> str:
+    """Lowercased title with runs of whitespace collapsed to one space"""
+    return re.sub(r"\s+", " ", str(title).lower()).strip()
+
+
+class CatalogSearchIndex:
+    """
+    Read-only search structures over the course catalog:
+    - an inverted index (term -> courses) over the title and description terms
+      that are in the fitted TF-IDF vocabulary, holding precomputed BM25 weights;
+      a query only touches the postings of its own terms
+    - the normalized titles sorted in one UTF-8 blob for prefix autocomplete: the
+      titles starting with a prefix are a contiguous range found by binary
+      search. Every prefix matching more than scan_limit titles has its best
+      top_k courses (by popularity rank) precomputed, and smaller ranges are
+      ranked on the fly, so a lookup never touches more than scan_limit titles
+      whatever the size of the catalog.
+
+    Everything is kept in flat NumPy arrays (settings() / arrays()), so the index
+    is stored in the model artifact and loaded without rebuilding.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_boost: int = 2, top_k: int = 10, scan_limit: int = 256):
+        self.k1 = k1
+        self.b = b
+        self.title_boost = title_boost
+        self.top_k = top_k
+        self.scan_limit = scan_limit
+
+        # Inverted index: postings of term t are docs/weights[indptr[t]:indptr[t + 1]]
+        self.postings_indptr = None
+        self.postings_docs = None
+        self.postings_weights = None
+
+        # Sorted titles (blob + offsets) with their course and popularity rank
+        self.title_offsets = None
+        self.title_courses = None
+        self.title_ranks = None
+        self._titles = b""
+
+        # Precomputed completions of the prefixes with more than scan_limit titles
+        self.prefix_offsets = None
+        self.prefix_top = None
+        self._prefixes = b""
+
+    @property
+    def n_courses(self) -> int:
+        return 0 if self.title_courses is None else len(self.title_courses)
+
+    @classmethod
+    def build(cls, titles: List[str], descriptions: List[str], vocabulary: Dict[str, int],
+              analyze: Callable[[str], List[str]], popularity_rank: np.ndarray, **params) -> "CatalogSearchIndex":
+        """
+        Index a catalog
+
+        Args:
+            titles, descriptions: Course texts, in course index order
+            vocabulary: Term -> column of the fitted TF-IDF model
+            analyze: The TF-IDF analyzer (text -> terms)
+            popularity_rank: Rank of each course in the popularity ranking (0 = best)
+        """
+        index = cls(**params)
+        index._build_postings(titles, descriptions, vocabulary, analyze)
+        index._build_prefixes(titles, np.asarray(popularity_rank, dtype=np.int32))
+        logger.info(
+            f"Search index: {len(index.postings_docs)} postings over {len(index.postings_indptr) - 1} terms, "
+            f"{len(index.prefix_offsets) - 1} precomputed prefixes for {index.n_courses} titles"
+        )
+        return index
+
+    def _build_postings(self, titles: List[str], descriptions: List[str], vocabulary: Dict[str, int], analyze: Callable):
+        n_courses, n_terms = len(titles), len(vocabulary)
+        terms, docs, counts = [], [], []
+        lengths = np.zeros(n_courses)
+        for doc, (title, description) in enumerate(zip(titles, descriptions)):
+            tf = {}
+            for text, weight in ((title, self.title_boost), (description, 1)):
+                for term in analyze(str(text)):
+                    column = vocabulary.get(term)
+                    if column is not None:
+                        tf[column] = tf.get(column, 0) + weight
+            terms.extend(tf)
+            docs.extend([doc] * len(tf))
+            counts.extend(tf.values())
+            lengths[doc] = sum(tf.values())
+
+        terms = np.asarray(terms, dtype=np.int64)
+        docs = np.asarray(docs, dtype=np.int32)
+        tf = np.asarray(counts, dtype=np.float64)
+
+        # BM25 with the usual +1 inside the log so that idf stays positive
+        df = np.bincount(terms, minlength=n_terms)
+        idf = np.log(1.0 + (n_courses - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() if n_courses and lengths.mean() > 0 else 1.0
+        norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / avg_length)
+        weights = idf[terms] * tf * (self.k1 + 1.0) / (tf + norm)
+
+        order = np.lexsort((docs, terms))
+        self.postings_indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(df, out=self.postings_indptr[1:])
+        self.postings_docs = docs[order]
+        self.postings_weights = weights[order].astype(np.float32)
+
+    def _build_prefixes(self, titles: List[str], popularity_rank: np.ndarray):
+        keys = [normalize_title(title).encode("utf-8") for title in titles]
+        order = sorted(range(len(keys)), key=lambda i: (keys[i], popularity_rank[i]))
+        keys = [keys[i] for i in order]
+
+        self.title_courses = np.asarray(order, dtype=np.int32)
+        self.title_ranks = popularity_rank[self.title_courses]
+        self._titles = b"".join(keys)
+        key_lengths = np.array([len(key) for key in keys], dtype=np.int64)
+        self.title_offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(key_lengths, out=self.title_offsets[1:])
+
+        # Common prefix length of each sorted title with the one before it
+        lcp = np.zeros(len(keys), dtype=np.int64)
+        for i in range(1, len(keys)):
+            previous, current = keys[i - 1], keys[i]
+            limit = min(len(previous), len(current))
+            n = 0
+            while n < limit and previous[n] == current[n]:
+                n += 1
+            lcp[i] = n
+
+        # At depth d the titles sharing a d-byte prefix are runs that start where
+        # lcp < d; deeper prefixes only split runs, so stop once none is too long
+        prefixes, tops = [], []
+        depth = 1
+        while True:
+            members = np.flatnonzero(key_lengths >= depth)
+            if not len(members):
+                break
+            starts = np.flatnonzero(lcp[members] < depth)
+            ends = np.append(starts[1:], len(members)) - 1
+            sizes = ends - starts + 1
+            big = np.flatnonzero(sizes > self.scan_limit)
+            if not len(big):
+                break
+            for group in big:
+                lo, hi = members[starts[group]], members[ends[group]] + 1
+                prefixes.append(keys[lo][:depth])
+                tops.append(self._best(lo, hi, self.top_k))
+            depth += 1
+
+        order = sorted(range(len(prefixes)), key=prefixes.__getitem__)
+        self._prefixes = b"".join(prefixes[i] for i in order)
+        self.prefix_offsets = np.zeros(len(prefixes) + 1, dtype=np.int64)
+        np.cumsum([len(prefixes[i]) for i in order], out=self.prefix_offsets[1:])
+        self.prefix_top = np.full((len(prefixes), self.top_k), -1, dtype=np.int32)
+        for row, i in enumerate(order):
+            self.prefix_top[row, : len(tops[i])] = tops[i]
+
+    def _best(self, lo: int, hi: int, limit: int) -> np.ndarray:
+        """Courses of the sorted title range [lo, hi) with the best popularity ranks"""
+        ranks = self.title_ranks[lo:hi]
+        k = min(limit, hi - lo)
+        if k <= 0:
+            return np.empty(0, dtype=np.int32)
+        top = np.argpartition(ranks, k - 1)[:k] if k < len(ranks) else np.arange(len(ranks))
+        top = top[np.argsort(ranks[top], kind="stable")]
+        return self.title_courses[lo + top]
+
+    @staticmethod
+    def _lower_bound(blob: bytes, offsets: np.ndarray, key: bytes) -> int:
+        """First position whose entry is >= key in a sorted blob"""
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if blob[offsets[mid]: offsets[mid + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def search(self, term_ids: List[int], top_n: int = 10) -> List[Tuple[int, float]]:
+        """(course index, BM25 score) of the best matches for the query terms, best first"""
+        term_ids = sorted(set(term_ids))
+        spans = [(self.postings_indptr[term], self.postings_indptr[term + 1]) for term in term_ids]
+        spans = [(start, end) for start, end in spans if end > start]
+        if not spans or top_n <= 0:
+            return []
+
+        docs = np.concatenate([self.postings_docs[start:end] for start, end in spans])
+        weights = np.concatenate([self.postings_weights[start:end] for start, end in spans]).astype(np.float64)
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse.ravel(), weights=weights)
+
+        k = min(top_n, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[int]:
+        """Indexes of the most popular courses whose normalized title starts with prefix"""
+        # Keep one trailing space: "data " should not complete to "database"
+        key = re.sub(r"\s+", " ", str(prefix).lower()).lstrip().encode("utf-8")
+        limit = min(limit, self.top_k)
+        if not key or limit <= 0:
+            return []
+
+        row = self._lower_bound(self._prefixes, self.prefix_offsets, key)
+        if row < len(self.prefix_top) and self._prefixes[self.prefix_offsets[row]: self.prefix_offsets[row + 1]] == key:
+            top = self.prefix_top[row, :limit]
+            return [int(course) for course in top if course >= 0]
+
+        # UTF-8 never contains 0xff, so key + 0xff sorts after every title starting with key
+        lo = self._lower_bound(self._titles, self.title_offsets, key)
+        hi = self._lower_bound(self._titles, self.title_offsets, key + b"\xff")
+        return [int(course) for course in self._best(lo, min(hi, lo + self.scan_limit), limit)]
+
+    def settings(self) -> Dict:
+        """JSON-serializable parameters"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "title_boost": self.title_boost,
+            "top_k": self.top_k,
+            "scan_limit": self.scan_limit,
+        }
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Index data as flat arrays"""
+        return {
+            "postings_indptr": self.postings_indptr,
+            "postings_docs": self.postings_docs,
+            "postings_weights": self.postings_weights,
+            "titles": np.frombuffer(self._titles, dtype=np.uint8),
+            "title_offsets": self.title_offsets,
+            "title_courses": self.title_courses,
+            "title_ranks": self.title_ranks,
+            "prefixes": np.frombuffer(self._prefixes, dtype=np.uint8),
+            "prefix_offsets": self.prefix_offsets,
+            "prefix_top": self.prefix_top,
+        }
+
+    @classmethod
+    def from_arrays(cls, settings: Dict, arrays: Dict[str, np.ndarray]) -> "CatalogSearchIndex":
+        """Rebuild from settings() and arrays()"""
+        index = cls(**settings)
+        index.postings_indptr = arrays["postings_indptr"]
+        index.postings_docs = arrays["postings_docs"]
+        index.postings_weights = arrays["postings_weights"]
+        index._titles = np.asarray(arrays["titles"], dtype=np.uint8).tobytes()
+        index.title_offsets = arrays["title_offsets"]
+        index.title_courses = arrays["title_courses"]
+        index.title_ranks = arrays["title_ranks"]
+        index._prefixes = np.asarray(arrays["prefixes"], dtype=np.uint8).tobytes()
+        index.prefix_offsets = arrays["prefix_offsets"]
+        index.prefix_top = arrays["prefix_top"]
+        return index
@@ -49,6 +49,16 @@ class DataCleaner:
             # Clip outliers (assuming 1-5 scale)
             ratings_clean["rating"] = ratings_clean["rating"].clip(1, 5)
 
+        # Multi-criteria ratings share the 1-5 scale; 0 marks a missing criterion
+        for col in ["app", "data", "ease"]:
+            if col in ratings_clean.columns:
+                ratings_clean[col] = pd.to_numeric(ratings_clean[col], errors="coerce").fillna(0).clip(0, 5)
+
+        # Context values are categorical labels
+        for col in ["class", "semester", "lockdown"]:
+            if col in ratings_clean.columns:
+                ratings_clean[col] = ratings_clean[col].fillna("Unknown").astype(str).str.strip()
+
         # Remove orphaned records (users/items not in master tables)
         ratings_clean = ratings_clean[ratings_clean["user_id"].isin(users_clean["user_id"])]
         ratings_clean = ratings_clean[ratings_clean["item_id"].isin(items_clean["item_id"])]
@@ -11,6 +11,16 @@ logger = logging.getLogger(__name__)
 class DataLoader:
     """Load and validate all datasets"""
 
+    # ITM-Rec multi-criteria and context headers -> normalized names
+    CONTEXT_COLUMN_MAP = {
+        "App": "app",
+        "Data": "data",
+        "Ease": "ease",
+        "Class": "class",
+        "Semester": "semester",
+        "Lockdown": "lockdown",
+    }
+
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
 
@@ -46,12 +56,47 @@ class DataLoader:
             if "Rating" in ratings.columns:
                 ratings = ratings.rename(columns={"Rating": "rating"})
 
+            # Multi-criteria ratings and context: App/Data/Ease, Class/Semester/Lockdown
+            ratings = ratings.rename(columns=self.CONTEXT_COLUMN_MAP)
+
             logger.info(f"Loaded ITM-Rec: {len(users)} users, {len(items)} items, {len(ratings)} ratings")
             return users, items, ratings
         except Exception as e:
             logger.error(f"Error loading ITM-Rec: {e}")
             raise
 
+    def load_itm_rec_groups(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Load ITM-Rec group data (group members, group sizes, group ratings)"""
+        logger.info("Loading ITM-Rec group data...")
+
+        groups_path = self.data_dir / "itm-rec" / "group.csv"
+        sizes_path = self.data_dir / "itm-rec" / "group_size.csv"
+        group_ratings_path = self.data_dir / "itm-rec" / "group_ratings.csv"
+
+        try:
+            groups = pd.read_csv(groups_path)
+            group_sizes = pd.read_csv(sizes_path)
+            group_ratings = pd.read_csv(group_ratings_path)
+
+            column_map = {"GroupID": "group_id", "UserID": "user_id", "Item": "item_id", "Rating": "rating", "Size": "size"}
+            groups = groups.rename(columns=column_map)
+            group_sizes = group_sizes.rename(columns=column_map)
+            group_ratings = group_ratings.rename(columns={**column_map, **self.CONTEXT_COLUMN_MAP})
+
+            for df in (groups, group_sizes, group_ratings):
+                for col in ["group_id", "user_id", "item_id"]:
+                    if col in df.columns:
+                        df[col] = df[col].astype(str)
+
+            logger.info(
+                f"Loaded ITM-Rec groups: {groups['group_id'].nunique()} groups, "
+                f"{len(groups)} memberships, {len(group_ratings)} group ratings"
+            )
+            return groups, group_sizes, group_ratings
+        except Exception as e:
+            logger.error(f"Error loading ITM-Rec groups: {e}")
+            raise
+
     def load_coursera_reviews(self) -> pd.DataFrame:
         """Load Coursera reviews dataset"""
         logger.info("Loading Coursera reviews...")
@@ -0,0 +1,64 @@
+"""
+Diversity - Maximal marginal relevance (MMR) re-ranking of a candidate pool
+"""
+from typing import List
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+
+def mmr_select(vectors, relevance: np.ndarray, k: int, diversity: float) -> List[int]:
+    """
+    Greedy MMR: repeatedly pick the candidate maximizing
+
+        (1 - diversity) * relevance - diversity * (max similarity to the picks so far)
+
+    The max-similarity vector over the pool is updated in place after each pick
+    with one sparse row product (the pick against the pool), so selecting k
+    items costs O(k * pool) instead of comparing every candidate with every
+    earlier pick at each step.
+
+    Args:
+        vectors: L2-normalized candidate vectors, one row per pool entry (sparse or dense)
+        relevance: Relevance score of each candidate
+        k: Number of items to select
+        diversity: 0 = relevance order only, 1 = pure novelty
+
+    Returns:
+        Pool positions in selection order
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    if diversity <= 0.0:
+        return np.argsort(-relevance, kind="stable")[:k].tolist()
+
+    vectors = csr_matrix(vectors) if issparse(vectors) else csr_matrix(np.asarray(vectors, dtype=np.float64))
+    # Term -> pool postings, so a pick only touches the candidates sharing a term with it
+    postings = csr_matrix(vectors.T)
+
+    base = (1.0 - diversity) * relevance
+    max_similarity = np.zeros(n)
+    scores = base.copy()
+    picks = []
+    for _ in range(k):
+        pick = int(np.argmax(scores))
+        picks.append(pick)
+
+        # Sparse row product pick x pool, done on the CSR arrays directly
+        row = slice(vectors.indptr[pick], vectors.indptr[pick + 1])
+        terms, weights = vectors.indices[row], vectors.data[row]
+        starts, ends = postings.indptr[terms], postings.indptr[terms + 1]
+        lengths = ends - starts
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        similarity = np.bincount(
+            postings.indices[positions],
+            weights=postings.data[positions] * np.repeat(weights, lengths),
+            minlength=n,
+        )
+        np.maximum(max_similarity, similarity, out=max_similarity)
+        np.multiply(max_similarity, -diversity, out=scores)
+        scores += base
+        scores[picks] = -np.inf
+    return picks
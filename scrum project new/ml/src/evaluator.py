@@ -1,43 +1,154 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, mean_absolute_error
-from typing import Dict
+from typing import Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-process state set by the cross-validation pool initializer
+_cv_state = None
+
+
+def _init_cv_worker(ratings: pd.DataFrame, folds: np.ndarray, user_features: pd.DataFrame,
+                    item_features: pd.DataFrame, alpha: float, fit_jobs: int):
+    global _cv_state
+    _cv_state = {
+        "ratings": ratings,
+        "folds": folds,
+        "user_features": user_features,
+        "item_features": item_features,
+        "alpha": alpha,
+        "fit_jobs": fit_jobs,
+    }
+
+
+def _run_fold(fold: int) -> Dict:
+    """Train on every other fold and evaluate on this one"""
+    from recommender_model import HybridRecommender
+
+    started = time.perf_counter()
+    ratings, folds = _cv_state["ratings"], _cv_state["folds"]
+    test = folds == fold
+    model = HybridRecommender()
+    model.fit(ratings[~test], _cv_state["user_features"], _cv_state["item_features"], n_jobs=_cv_state["fit_jobs"])
+    metrics = ModelEvaluator.evaluate_model_batch(model, ratings[test], alpha=_cv_state["alpha"])
+    return {"fold": fold, **metrics, "seconds": round(time.perf_counter() - started, 2)}
+
 
 class ModelEvaluator:
     """Evaluate recommendation model performance"""
 
     @staticmethod
-    def train_test_split_ratings(ratings: pd.DataFrame, test_size: float = 0.2) -> tuple:
-        """Split ratings into train and test sets"""
-        logger.info(f"Splitting data: {1-test_size:.0%} train, {test_size:.0%} test")
+    def user_ranks(ratings: pd.DataFrame, random_state: int = 42) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Random rank of each rating within its user's ratings
+
+        A user with n ratings gets the ranks of RandomState(random_state).permutation(n),
+        the shuffle train_test_split applies to each user's frame, so every user
+        is ranked with one sort instead of one filter per user.
+
+        Returns:
+            (user code by first appearance, rank, user's rating count) per rating
+        """
+        codes, _ = pd.factorize(ratings["user_id"])
+        order = np.argsort(codes, kind="stable")
+        sizes = np.bincount(codes)
+        row_sizes = sizes[codes]
 
-        # Ensure each user has at least one rating in train set
-        train_list = []
-        test_list = []
+        # Position of each rating within its user's ratings, in frame order
+        starts = np.cumsum(sizes) - sizes
+        position = np.empty(len(codes), dtype=np.int64)
+        position[order] = np.arange(len(codes)) - starts[codes[order]]
 
-        for user_id in ratings["user_id"].unique():
-            user_ratings = ratings[ratings["user_id"] == user_id]
+        # Inverse permutation of every distinct group size, concatenated
+        distinct = np.unique(sizes)
+        offsets = np.cumsum(distinct) - distinct
+        inverses = np.concatenate([np.argsort(np.random.RandomState(random_state).permutation(n)) for n in distinct])
+        rank = inverses[offsets[np.searchsorted(distinct, row_sizes)] + position]
+        return codes, rank, row_sizes
 
-            if len(user_ratings) == 1:
-                train_list.append(user_ratings)
-            else:
-                user_train, user_test = train_test_split(
-                    user_ratings, test_size=test_size, random_state=42
-                )
-                train_list.append(user_train)
-                test_list.append(user_test)
+    @staticmethod
+    def train_test_split_ratings(ratings: pd.DataFrame, test_size: float = 0.2, random_state: int = 42) -> tuple:
+        """
+        Split ratings into train and test sets per user
+
+        Same split as train_test_split on each user's ratings: ceil(test_size * n)
+        of a user's n ratings go to test, and users with a single rating stay in
+        train. Rows are ordered by user (first appearance), then shuffle order.
+        """
+        logger.info(f"Splitting data: {1-test_size:.0%} train, {test_size:.0%} test")
 
-        train_df = pd.concat(train_list, ignore_index=True)
-        test_df = pd.concat(test_list, ignore_index=True) if test_list else pd.DataFrame()
+        codes, rank, sizes = ModelEvaluator.user_ranks(ratings, random_state)
+        n_test = np.where(sizes > 1, np.ceil(test_size * sizes), 0)
+        test = rank < n_test
+
+        order = np.lexsort((rank, codes))
+        train_df = ratings.iloc[order[~test[order]]].reset_index(drop=True)
+        test_df = ratings.iloc[order[test[order]]].reset_index(drop=True) if test.any() else pd.DataFrame()
 
         logger.info(f"Train set: {len(train_df)} ratings, Test set: {len(test_df)} ratings")
         return train_df, test_df
 
+    @staticmethod
+    def fold_assignments(ratings: pd.DataFrame, n_folds: int = 5, random_state: int = 42) -> np.ndarray:
+        """
+        Test fold of each rating for per-user k-fold cross-validation
+
+        Each user's ratings are dealt round-robin over the folds in shuffled
+        order, starting at a random fold per user so that small users do not all
+        land in the first folds. A user therefore always keeps a rating in train;
+        single-rating users get -1 (train only).
+        """
+        if n_folds < 2:
+            raise ValueError("Cross-validation needs at least 2 folds")
+        codes, rank, sizes = ModelEvaluator.user_ranks(ratings, random_state)
+        first_fold = np.random.RandomState(random_state).randint(n_folds, size=codes.max(initial=-1) + 1)
+        return np.where(sizes > 1, (rank + first_fold[codes]) % n_folds, -1)
+
+    @staticmethod
+    def cross_validate(ratings: pd.DataFrame, user_features: pd.DataFrame, item_features: pd.DataFrame,
+                       n_folds: int = 5, n_jobs: int = None, alpha: float = 0.7, random_state: int = 42) -> Dict:
+        """
+        Per-user k-fold cross-validation of the hybrid recommender
+
+        Folds are trained and evaluated in parallel worker processes (the data is
+        sent to each worker once); the cores left over are given to each fold's
+        similarity threads.
+
+        Returns:
+            Mean and standard deviation of each metric plus the per-fold metrics
+        """
+        folds = ModelEvaluator.fold_assignments(ratings, n_folds, random_state)
+        cores = os.cpu_count() or 1
+        n_workers = min(n_folds, n_jobs or cores)
+        fit_jobs = max(1, cores // n_workers)
+        logger.info(f"Cross-validating over {n_folds} folds ({n_workers} workers)...")
+
+        started = time.perf_counter()
+        initargs = (ratings, folds, user_features, item_features, alpha, fit_jobs)
+        if n_workers == 1:
+            _init_cv_worker(*initargs)
+            results = [_run_fold(fold) for fold in range(n_folds)]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_cv_worker, initargs=initargs) as executor:
+                results = list(executor.map(_run_fold, range(n_folds)))
+
+        summary = {"n_folds": n_folds, "folds": results, "seconds": round(time.perf_counter() - started, 2)}
+        for metric in ("rmse", "mae", "coverage"):
+            values = np.array([result[metric] for result in results])
+            summary[metric] = float(values.mean())
+            summary[f"{metric}_std"] = float(values.std())
+
+        logger.info(
+            f"Cross-validation: RMSE={summary['rmse']:.3f} (+/- {summary['rmse_std']:.3f}), "
+            f"MAE={summary['mae']:.3f}, Coverage={summary['coverage']:.2%} in {summary['seconds']:.1f}s"
+        )
+        return summary
+
     @staticmethod
     def evaluate_model(model, test_ratings: pd.DataFrame, user_features: pd.DataFrame) -> Dict[str, float]:
         """Evaluate model on test set"""
@@ -93,6 +204,63 @@ class ModelEvaluator:
         logger.info(f"Evaluation metrics: RMSE={rmse:.3f}, MAE={mae:.3f}, Coverage={coverage:.2%}")
         return metrics
 
+    @staticmethod
+    def evaluate_model_batch(model, test_ratings: pd.DataFrame, alpha: float = 0.7, top_n: int = 100,
+                             batch_size: int = 256) -> Dict[str, float]:
+        """
+        Same metrics as evaluate_model for a HybridRecommender, with the test
+        users scored in batches through score_users instead of one predict call
+        per test rating
+
+        A rating counts as predicted when its item is in the user's top_n, as in
+        evaluate_model; unknown users are served the popularity list.
+        """
+        if len(test_ratings) == 0:
+            return {"rmse": 0.0, "mae": 0.0, "coverage": 0.0, "num_predictions": 0}
+
+        users = model.user_indices(np.asarray(test_ratings["user_id"], dtype=str))
+        items = model.item_indices(np.asarray(test_ratings["item_id"], dtype=str))
+        actuals = test_ratings["rating"].to_numpy(dtype=np.float64)
+        predictions = np.full(len(test_ratings), np.nan)
+
+        # Unknown users: popularity list with the items' average ratings
+        popular = np.zeros(model.user_item_matrix.shape[1], dtype=bool)
+        popular[model.popular_items[:top_n]] = True
+        cold = np.flatnonzero((users < 0) & (items >= 0))
+        cold = cold[popular[items[cold]]]
+        predictions[cold] = model.item_table["avg_rating"][items[cold]]
+
+        known = np.flatnonzero((users >= 0) & (items >= 0))
+        rows, inverse = np.unique(users[known], return_inverse=True)
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            scores = model.score_users(batch, alpha=alpha)
+            rated = model.user_item_matrix[batch]
+            scores[np.repeat(np.arange(len(batch)), np.diff(rated.indptr)), rated.indices] = -np.inf
+
+            # Top N as predict ranks them (descending argsort)
+            top = np.argsort(scores, axis=1)[:, ::-1][:, :top_n]
+            in_top = np.zeros(scores.shape, dtype=bool)
+            np.put_along_axis(in_top, top, True, axis=1)
+
+            members = known[(inverse >= start) & (inverse < start + len(batch))]
+            local = inverse[(inverse >= start) & (inverse < start + len(batch))] - start
+            hit = in_top[local, items[members]]
+            predictions[members[hit]] = scores[local[hit], items[members[hit]]]
+
+        predicted = ~np.isnan(predictions)
+        if not predicted.any():
+            logger.warning("No predictions made, returning default metrics")
+            return {"rmse": 0.0, "mae": 0.0, "coverage": 0.0, "num_predictions": 0}
+
+        errors = predictions[predicted] - actuals[predicted]
+        return {
+            "rmse": float(np.sqrt(np.mean(errors * errors))),
+            "mae": float(np.mean(np.abs(errors))),
+            "coverage": float(predicted.sum() / len(test_ratings)),
+            "num_predictions": int(predicted.sum()),
+        }
+
     @staticmethod
     def evaluate_recommendation_quality(model, test_users: list, k: int = 10) -> Dict[str, float]:
         """Evaluate recommendation quality using precision@k and recall@k"""
@@ -4,6 +4,8 @@ from sklearn.preprocessing import StandardScaler
 from typing import Dict, Any
 import logging
 
+from feature_store import FeatureStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,24 +13,33 @@ class FeatureEngineer:
     """Create features for ML models"""
 
     @staticmethod
-    def create_user_features(users: pd.DataFrame, ratings: pd.DataFrame) -> pd.DataFrame:
-        """Create user profile features"""
+    def _store_statistics(stats: pd.DataFrame, key: str, entities: pd.DataFrame) -> pd.DataFrame:
+        """Feature store statistics with the key cast back to the entity table's id type"""
+        stats[key] = stats[key].astype(entities[key].dtype)
+        return stats
+
+    @staticmethod
+    def create_user_features(users: pd.DataFrame, ratings: pd.DataFrame, store: FeatureStore = None) -> pd.DataFrame:
+        """Create user profile features (rating statistics from the feature store when given)"""
         logger.info("Creating user features...")
 
         user_features = users.copy()
 
         # Rating statistics per user
-        user_stats = (
-            ratings.groupby("user_id")
-            .agg(
-                {
-                    "rating": ["mean", "std", "count"],
-                }
+        if store is not None:
+            user_stats = FeatureEngineer._store_statistics(store.user_statistics(), "user_id", users)
+        else:
+            user_stats = (
+                ratings.groupby("user_id")
+                .agg(
+                    {
+                        "rating": ["mean", "std", "count"],
+                    }
+                )
+                .reset_index()
             )
-            .reset_index()
-        )
-        user_stats.columns = ["user_id", "avg_rating", "rating_std", "num_ratings"]
-        user_stats["rating_std"] = user_stats["rating_std"].fillna(0)
+            user_stats.columns = ["user_id", "avg_rating", "rating_std", "num_ratings"]
+            user_stats["rating_std"] = user_stats["rating_std"].fillna(0)
 
         user_features = user_features.merge(user_stats, on="user_id", how="left")
 
@@ -41,24 +52,28 @@ class FeatureEngineer:
         return user_features
 
     @staticmethod
-    def create_item_features(items: pd.DataFrame, ratings: pd.DataFrame, coursera_reviews: pd.DataFrame = None) -> pd.DataFrame:
-        """Create item/course features"""
+    def create_item_features(items: pd.DataFrame, ratings: pd.DataFrame, coursera_reviews: pd.DataFrame = None,
+                             store: FeatureStore = None) -> pd.DataFrame:
+        """Create item/course features (rating statistics from the feature store when given)"""
         logger.info("Creating item features...")
 
         item_features = items.copy()
 
         # Rating statistics per item from ITM-Rec
-        item_stats = (
-            ratings.groupby("item_id")
-            .agg(
-                {
-                    "rating": ["mean", "std", "count"],
-                }
+        if store is not None:
+            item_stats = FeatureEngineer._store_statistics(store.item_statistics(), "item_id", items)
+        else:
+            item_stats = (
+                ratings.groupby("item_id")
+                .agg(
+                    {
+                        "rating": ["mean", "std", "count"],
+                    }
+                )
+                .reset_index()
             )
-            .reset_index()
-        )
-        item_stats.columns = ["item_id", "avg_rating", "rating_std", "num_ratings"]
-        item_stats["rating_std"] = item_stats["rating_std"].fillna(0)
+            item_stats.columns = ["item_id", "avg_rating", "rating_std", "num_ratings"]
+            item_stats["rating_std"] = item_stats["rating_std"].fillna(0)
 
         item_features = item_features.merge(item_stats, on="item_id", how="left")
 
@@ -0,0 +1,303 @@
+"""
+Feature Store - Incremental per-user and per-item rating statistics in columnar partitions
+"""
+from pathlib import Path
+from typing import Dict, List
+import json
+import os
+import time
+import zlib
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RatingStatistics:
+    """
+    Running sufficient statistics (count, sum, sum of squares) of the ratings of
+    one kind of entity, one row per key
+
+    Keys are kept as strings (as in HybridRecommender). Arrays grow
+    geometrically, so adding a batch costs O(batch) amortized, and each row is
+    assigned to a partition by a hash of its key so that a save only rewrites
+    the partitions a batch touched.
+    """
+
+    def __init__(self, key: str, n_partitions: int):
+        self.key = key
+        self.n_partitions = n_partitions
+        self.keys = []
+        self._rows = {}
+        self.count = np.zeros(0, dtype=np.int64)
+        self.total = np.zeros(0, dtype=np.float64)
+        self.total_squares = np.zeros(0, dtype=np.float64)
+        self.partition = np.zeros(0, dtype=np.int32)
+        self.dirty = set()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _reserve(self, size: int):
+        if size <= len(self.count):
+            return
+        capacity = max(size, 2 * len(self.count), 64)
+        for name in ("count", "total", "total_squares", "partition"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+
+    def _add_keys(self, keys: List[str]) -> np.ndarray:
+        """Rows for keys not seen before"""
+        start = len(self.keys)
+        self._reserve(start + len(keys))
+        for key in keys:
+            self._rows[key] = len(self.keys)
+            self.keys.append(key)
+        rows = np.arange(start, len(self.keys))
+        self.partition[rows] = [zlib.crc32(key.encode("utf-8")) % self.n_partitions for key in keys]
+        return rows
+
+    def rows(self, keys: List[str]) -> np.ndarray:
+        """Row of each key, adding the new ones"""
+        rows = np.array([self._rows.get(key, -1) for key in keys], dtype=np.int64)
+        new = np.flatnonzero(rows < 0)
+        if len(new):
+            rows[new] = self._add_keys([keys[i] for i in new])
+        return rows
+
+    def update(self, keys: np.ndarray, ratings: np.ndarray):
+        """Fold a batch of (key, rating) pairs into the statistics"""
+        codes, uniques = pd.factorize(np.asarray(keys))
+        rows = self.rows([str(key) for key in uniques])
+        ratings = np.asarray(ratings, dtype=np.float64)
+
+        # Rows are distinct, so plain fancy-index increments are safe
+        self.count[rows] += np.bincount(codes, minlength=len(rows))
+        self.total[rows] += np.bincount(codes, weights=ratings, minlength=len(rows))
+        self.total_squares[rows] += np.bincount(codes, weights=ratings * ratings, minlength=len(rows))
+        self.dirty.update(np.unique(self.partition[rows]).tolist())
+
+    def frame(self) -> pd.DataFrame:
+        """avg_rating, rating_std (sample, 0 below two ratings) and num_ratings per key"""
+        n = len(self.keys)
+        count, total, squares = self.count[:n], self.total[:n], self.total_squares[:n]
+        rated = count > 0
+        safe = np.maximum(count, 1)
+        variance = (squares - total * total / safe) / np.maximum(count - 1, 1)
+        rating_std = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), 0.0)
+        return pd.DataFrame({
+            self.key: np.asarray(self.keys, dtype=object)[rated],
+            "avg_rating": (total / safe)[rated],
+            "rating_std": rating_std[rated],
+            "num_ratings": count[rated],
+        })
+
+    def partition_arrays(self, partition: int) -> Dict[str, np.ndarray]:
+        """Columns of one partition"""
+        rows = np.flatnonzero(self.partition[: len(self.keys)] == partition)
+        return {
+            "key": np.array([self.keys[row] for row in rows], dtype=str) if len(rows) else np.zeros(0, dtype=str),
+            "count": self.count[rows],
+            "total": self.total[rows],
+            "total_squares": self.total_squares[rows],
+        }
+
+    def load_partition(self, arrays: Dict[str, np.ndarray]):
+        """Append the rows of a stored partition"""
+        rows = self._add_keys(arrays["key"].tolist())
+        self.count[rows] = arrays["count"]
+        self.total[rows] = arrays["total"]
+        self.total_squares[rows] = arrays["total_squares"]
+
+
+class FeatureStore:
+    """
+    User and item rating statistics maintained from appended rating batches
+
+    Each update folds a batch into running count/sum/sum-of-squares per user
+    and per item in O(batch), so a daily delta does not regroup the full
+    ratings table. The store is saved as columnar .npz partitions (by key hash)
+    plus a manifest holding the watermark of the last batch applied and the
+    training snapshot folded in (see update_snapshot):
+
+        root/manifest.json
+        root/user/part-00007-g12.npz   (key, count, total, total_squares)
+        root/item/part-00003-g9.npz
+
+    A save writes the partitions touched since the last save under a new
+    generation, then switches the manifest over to them in one rename. A crash
+    therefore leaves the previous consistent state, and replaying a batch at or
+    below the watermark is a no-op.
+    """
+
+    TABLES = {"user": "user_id", "item": "item_id"}
+
+    def __init__(self, root: str, n_partitions: int = 16):
+        self.root = Path(root)
+        self.n_partitions = n_partitions
+        self.tables = {name: RatingStatistics(key, n_partitions) for name, key in self.TABLES.items()}
+        self.watermark = None
+        self.snapshot = None  # {"rows": rating log rows folded in, "digest": of their cleaned ratings}
+        self.ratings_ingested = 0
+        self.generation = 0
+        self._files = {name: {} for name in self.TABLES}
+
+    @classmethod
+    def open(cls, root: str, n_partitions: int = 16) -> "FeatureStore":
+        """Load a saved store, or start an empty one"""
+        store = cls(root, n_partitions)
+        manifest_path = store.root / "manifest.json"
+        if not manifest_path.exists():
+            return store
+
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        store.n_partitions = manifest["n_partitions"]
+        store.watermark = manifest["watermark"]
+        store.snapshot = manifest.get("snapshot")
+        store.ratings_ingested = manifest["ratings_ingested"]
+        store.generation = manifest["generation"]
+        for name, spec in manifest["tables"].items():
+            table = store.tables[name] = RatingStatistics(spec["key"], store.n_partitions)
+            for partition, filename in spec["partitions"].items():
+                with np.load(store.root / name / filename) as arrays:
+                    table.load_partition({column: arrays[column] for column in arrays.files})
+                store._files[name][int(partition)] = filename
+
+        logger.info(
+            f"Feature store {store.root}: {len(store.tables['user'])} users, {len(store.tables['item'])} items, "
+            f"watermark {store.watermark!r}"
+        )
+        return store
+
+    def clear(self):
+        """Drop all statistics, the watermark and the snapshot; the next save rewrites every partition"""
+        self.tables = {name: RatingStatistics(key, self.n_partitions) for name, key in self.TABLES.items()}
+        for table in self.tables.values():
+            table.dirty = set(range(self.n_partitions))
+        self.watermark = None
+        self.snapshot = None
+        self.ratings_ingested = 0
+
+    @staticmethod
+    def _digest(ratings: pd.DataFrame) -> int:
+        """Order-independent digest of (log row, user, item, rating); digests of disjoint rows add up"""
+        hashes = pd.util.hash_pandas_object(ratings[["user_id", "item_id", "rating"]], index=True).to_numpy()
+        return int(hashes.sum(dtype=np.uint64))
+
+    def update_snapshot(self, ratings: pd.DataFrame, log_rows: int) -> str:
+        """
+        Fold a training snapshot of the rating log into the statistics
+
+        `ratings` are the cleaned ratings indexed by their row in the log, which
+        only grows, and `log_rows` its length. If the rows below the previous
+        snapshot's length still clean to the same ratings, only the ratings past
+        it are applied. Otherwise (the log was rewritten, a later rating replaced
+        an older one, or cleaning kept other older rows) the statistics are
+        rebuilt from the snapshot, dropping those of earlier update() batches.
+        The watermark is kept either way, so a batch already applied stays
+        skipped.
+
+        Returns:
+            "incremental" or "rebuilt"
+        """
+        previous = self.snapshot
+        offsets = ratings.index.to_numpy()
+        older = offsets < previous["rows"] if previous is not None else None
+        if (
+            previous is not None
+            and previous["rows"] <= log_rows
+            and self._digest(ratings[older]) == int(previous["digest"], 16)
+        ):
+            mode = "incremental"
+            self.update(ratings[~older])
+            applied = int((~older).sum())
+        else:
+            mode = "rebuilt"
+            watermark = self.watermark
+            self.clear()
+            self.watermark = watermark
+            self.update(ratings)
+            applied = len(ratings)
+
+        self.snapshot = {"rows": int(log_rows), "digest": format(self._digest(ratings), "x")}
+        logger.info(f"Feature store snapshot {mode}: {applied} ratings applied, log at {log_rows} rows")
+        return mode
+
+    def update(self, ratings: pd.DataFrame, watermark=None) -> bool:
+        """
+        Apply a batch of ratings (user_id, item_id, rating columns)
+
+        Args:
+            watermark: Position of the batch in the rating log (e.g. the delta's
+                date or its last row offset). A batch at or below the stored
+                watermark was already applied and is skipped; None applies the
+                batch without moving the watermark.
+
+        Returns:
+            Whether the batch was applied
+        """
+        if watermark is not None and self.watermark is not None and watermark <= self.watermark:
+            logger.info(f"Skipping batch at watermark {watermark!r} (store is at {self.watermark!r})")
+            return False
+
+        values = ratings["rating"].to_numpy(dtype=np.float64)
+        for name, table in self.tables.items():
+            table.update(ratings[table.key].to_numpy(), values)
+        self.ratings_ingested += len(ratings)
+        if watermark is not None:
+            self.watermark = watermark
+        return True
+
+    def user_statistics(self) -> pd.DataFrame:
+        return self.tables["user"].frame()
+
+    def item_statistics(self) -> pd.DataFrame:
+        return self.tables["item"].frame()
+
+    def save(self):
+        """Write the touched partitions under a new generation and commit the manifest"""
+        generation = self.generation + 1
+        files = {name: dict(self._files[name]) for name in self.tables}
+        for name, table in self.tables.items():
+            directory = self.root / name
+            directory.mkdir(parents=True, exist_ok=True)
+            for partition in sorted(table.dirty):
+                filename = f"part-{partition:05d}-g{generation}.npz"
+                np.savez(directory / filename, **table.partition_arrays(partition))
+                files[name][partition] = filename
+
+        manifest = {
+            "n_partitions": self.n_partitions,
+            "watermark": self.watermark,
+            "snapshot": self.snapshot,
+            "ratings_ingested": self.ratings_ingested,
+            "generation": generation,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "tables": {
+                name: {
+                    "key": table.key,
+                    "rows": len(table),
+                    "partitions": {str(partition): filename for partition, filename in sorted(files[name].items())},
+                }
+                for name, table in self.tables.items()
+            },
+        }
+        temporary = self.root / "manifest.json.tmp"
+        with open(temporary, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temporary, self.root / "manifest.json")
+
+        # Only now are the replaced partitions unreferenced
+        for name, table in self.tables.items():
+            live = set(files[name].values())
+            for path in (self.root / name).glob("part-*.npz"):
+                if path.name not in live:
+                    path.unlink()
+            written = len(table.dirty)
+            table.dirty = set()
+            logger.info(f"Feature store {name}: {len(table)} rows, {written} of {self.n_partitions} partitions written")
+        self.generation, self._files = generation, files
@@ -0,0 +1,198 @@
+"""
+Group Recommendation - Team-level recommendations over ITM-Rec groups
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GroupRecommender:
+    """
+    Recommends items to groups by aggregating members' hybrid score vectors:
+    - average: mean of the members' scores
+    - least_misery: score of the least satisfied member
+    - most_pleasure: score of the most satisfied member
+
+    Aggregated group profiles are cached per group id and dropped whenever the
+    group's membership changes, or the ratings of one of its members do (see
+    invalidate_users). Ad-hoc groups (members given per request) are never
+    registered: their id is built from the sorted member ids, so a cached
+    profile always matches its membership.
+    """
+
+    STRATEGIES = ("average", "least_misery", "most_pleasure")
+
+    def __init__(self, model, max_cached_groups: int = 10000):
+        self.model = model
+        self.group_members = {group_id: list(members) for group_id, members in model.group_members.items()}
+        self.max_cached_groups = max_cached_groups
+
+        self._profiles = {}  # group_id -> {(strategy, alpha, context_code): profile}
+        self._versions = {}  # group_id -> membership version
+        self._ratings_version = 0  # bumped by invalidate_users
+        self._lock = threading.Lock()
+
+    def set_members(self, group_id, members: List) -> bool:
+        """Set a group's members; returns True if the membership changed"""
+        group_id = str(group_id)
+        members = [str(member) for member in members]
+
+        with self._lock:
+            if self.group_members.get(group_id) == members:
+                return False
+            self.group_members[group_id] = members
+            self._versions[group_id] = self._versions.get(group_id, 0) + 1
+            self._profiles.pop(group_id, None)
+        return True
+
+    def invalidate_users(self, user_ids: List[str]) -> int:
+        """
+        Drop the cached profiles of every group with one of these users as a
+        member, e.g. after their ratings changed; returns the number of groups
+        """
+        user_ids = {str(user_id) for user_id in user_ids}
+        with self._lock:
+            self._ratings_version += 1
+            stale = [
+                group_id for group_id in self._profiles
+                if not user_ids.isdisjoint(self.group_members.get(group_id) or self._adhoc_members(group_id))
+            ]
+            for group_id in stale:
+                del self._profiles[group_id]
+        return len(stale)
+
+    @staticmethod
+    def _adhoc_members(group_id: str) -> List[str]:
+        """Members encoded in an ad-hoc group id (empty for other ids)"""
+        return group_id[len("adhoc:"):].split(",") if group_id.startswith("adhoc:") else []
+
+    @staticmethod
+    def adhoc_group(members: List) -> Tuple[str, List[str]]:
+        """(group id, sorted member ids) of an ad-hoc group"""
+        members = sorted(str(member) for member in members)
+        return "adhoc:" + ",".join(members), members
+
+    def aggregate(self, group_ids: List[str], strategy: str = "average", alpha: float = 0.7, context=None,
+                  adhoc: Dict[str, List[str]] = None) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Aggregated score profiles for several groups.
+
+        All uncached groups are scored together: their members' rows go through a
+        single HybridRecommender.score_users call and the strategy is applied over
+        a padded (groups, members, items) array. `adhoc` maps ad-hoc group ids
+        (see adhoc_group) to their members.
+
+        Returns:
+            {group_id: profile of length n_items}, None for groups without known members
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {list(self.STRATEGIES)}")
+
+        key = (strategy, float(alpha), self.model.encode_context(context))
+
+        profiles = {}
+        missing = []
+        with self._lock:
+            for group_id in group_ids:
+                profile = self._profiles.get(group_id, {}).get(key)
+                if profile is not None:
+                    profiles[group_id] = profile
+                else:
+                    missing.append(group_id)
+            versions = {group_id: self._versions.get(group_id, 0) for group_id in missing}
+            ratings_version = self._ratings_version
+            members = {group_id: self.members(group_id, adhoc) for group_id in missing}
+
+        if not missing:
+            return profiles
+
+        computed = self._aggregate_batch(missing, members, strategy, key[1], key[2])
+
+        with self._lock:
+            for group_id, profile in computed.items():
+                # Skip caching if the membership or member ratings changed while we were scoring
+                if (profile is None or self._versions.get(group_id, 0) != versions[group_id]
+                        or self._ratings_version != ratings_version):
+                    continue
+                if group_id not in self._profiles and len(self._profiles) >= self.max_cached_groups:
+                    self._profiles.pop(next(iter(self._profiles)))
+                self._profiles.setdefault(group_id, {})[key] = profile
+
+        profiles.update(computed)
+        return profiles
+
+    def members(self, group_id: str, adhoc: Dict[str, List[str]] = None) -> List[str]:
+        """Members of an ad-hoc or registered group (empty if unknown)"""
+        if adhoc and group_id in adhoc:
+            return adhoc[group_id]
+        return self.group_members.get(group_id, [])
+
+    def _aggregate_batch(self, group_ids: List[str], members: Dict[str, List[str]], strategy: str, alpha: float, context_code: int) -> Dict[str, Optional[np.ndarray]]:
+        """Score all member rows once and aggregate them per group"""
+        member_rows = []
+        for group_id in group_ids:
+            rows = self.model.user_indices(members[group_id])
+            member_rows.append(rows[rows >= 0])
+        size = max((len(rows) for rows in member_rows), default=0)
+        if size == 0:
+            return {group_id: None for group_id in group_ids}
+
+        # Padded member index: (groups, max group size), -1 for empty slots
+        index = np.full((len(group_ids), size), -1, dtype=np.int64)
+        for i, rows in enumerate(member_rows):
+            index[i, : len(rows)] = rows
+        mask = index >= 0
+
+        unique_rows, inverse = np.unique(index[mask], return_inverse=True)
+        member_scores = self.model.score_users(unique_rows, alpha=alpha, context=context_code)
+
+        slots = np.zeros(index.shape, dtype=np.int64)
+        slots[mask] = inverse
+        stacked = member_scores[slots]  # (groups, max group size, n_items)
+        valid = mask[:, :, None]
+
+        if strategy == "average":
+            counts = mask.sum(axis=1)[:, None]
+            aggregated = np.where(valid, stacked, 0.0).sum(axis=1) / np.maximum(counts, 1)
+        elif strategy == "least_misery":
+            aggregated = np.where(valid, stacked, np.inf).min(axis=1)
+        else:
+            aggregated = np.where(valid, stacked, -np.inf).max(axis=1)
+
+        has_members = mask.any(axis=1)
+        return {
+            group_id: aggregated[i] if has_members[i] else None
+            for i, group_id in enumerate(group_ids)
+        }
+
+    def recommend(self, group_ids: List[str], strategy: str = "average", top_n: int = 10, alpha: float = 0.7, context=None,
+                  adhoc: Dict[str, List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Generate recommendations for each group
+
+        Items the group already rated are excluded. Groups without any known
+        member fall back to popularity-based recommendations.
+        """
+        profiles = self.aggregate(group_ids, strategy, alpha, context, adhoc)
+        context_code = self.model.encode_context(context)
+
+        results = {}
+        for group_id in group_ids:
+            profile = profiles.get(group_id)
+            if profile is None:
+                results[group_id] = self.model._get_popular_items(top_n, context_code)
+                continue
+
+            scores = profile.copy()
+            rated_items = self.model.group_rated_items.get(group_id)
+            if rated_items is not None:
+                scores[rated_items] = -np.inf
+
+            top_indices = np.argsort(-scores, kind="stable")[:top_n]
+            top_indices = top_indices[np.isfinite(scores[top_indices])]
+            results[group_id] = self.model._format_recommendations(top_indices, scores[top_indices])
+
+        return results
@@ -0,0 +1,212 @@
+"""
+Memory Usage - Memory footprint of loaded models: deep sizes, per-component reports and compaction
+"""
+from typing import Dict
+import mmap
+import sys
+import types
+import numpy as np
+from scipy.sparse import issparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 4096
+
+
+def array_parts(value):
+    """The ndarrays backing a dense array or sparse matrix"""
+    if issparse(value):
+        return [part for part in (getattr(value, name, None) for name in ("data", "indices", "indptr", "row", "col")) if part is not None]
+    if isinstance(value, np.ndarray):
+        return [value]
+    return []
+
+
+def touch_pages(value) -> int:
+    """
+    Read one byte per page of an array (or sparse matrix) so that memory-mapped
+    or freshly loaded data is faulted in before the first request needs it
+
+    Returns:
+        Number of bytes covered
+    """
+    covered = 0
+    for array in array_parts(value):
+        if array.size == 0:
+            continue
+        flat = array.reshape(-1).view(np.uint8) if array.flags.c_contiguous else np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+        int(flat[::PAGE_SIZE].sum())
+        covered += flat.nbytes
+    return covered
+
+
+def _is_mapped(array: np.ndarray) -> bool:
+    """Whether an array's memory comes from a memory-mapped file"""
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def _owner(array: np.ndarray) -> np.ndarray:
+    """The array that owns the memory of a view, so shared buffers are counted once"""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def _walk(stack: list, seen: set, totals: Dict[str, int]):
+    """Add the deep size of everything reachable from stack and not in seen to totals"""
+    skip = (types.FunctionType, types.MethodType, types.BuiltinFunctionType, types.ModuleType, type)
+
+    while stack:
+        value = stack.pop()
+        if value is None or id(value) in seen or isinstance(value, skip):
+            continue
+        seen.add(id(value))
+
+        if isinstance(value, np.ndarray):
+            owner = _owner(value)
+            if owner is not value:
+                stack.append(owner)
+                continue
+            if _is_mapped(value):
+                totals["mapped_bytes"] += value.nbytes
+            else:
+                totals["heap_bytes"] += sys.getsizeof(value) if value.base is None else value.nbytes
+            if value.dtype == object:
+                stack.extend(value.ravel().tolist())
+        elif issparse(value):
+            stack.extend(array_parts(value))
+        elif _is_frame(value):
+            stack.extend(_frame_arrays(value, totals))
+        elif isinstance(value, dict):
+            totals["heap_bytes"] += sys.getsizeof(value)
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            totals["heap_bytes"] += sys.getsizeof(value)
+            stack.extend(value)
+        else:
+            totals["heap_bytes"] += sys.getsizeof(value)
+            attributes = getattr(value, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+
+
+def _is_frame(value) -> bool:
+    """pandas DataFrame (without importing pandas)"""
+    return hasattr(value, "memory_usage") and hasattr(value, "columns")
+
+
+def _frame_arrays(frame, totals: Dict[str, int]) -> list:
+    """
+    NumPy arrays backing a DataFrame's index and columns, so that strings shared
+    with the rest of the model are counted once; columns with other storage
+    (e.g. Arrow) are added to totals as reported by pandas
+    """
+    import pandas as pd
+
+    arrays = []
+    columns = [] if isinstance(frame.index, pd.RangeIndex) else [frame.index]
+    columns.extend(column for _, column in frame.items())
+    for column in columns:
+        array = column.array
+        if isinstance(array, pd.Categorical):
+            parts = [array.codes, getattr(array.categories.array, "_ndarray", None)]
+        else:
+            parts = [getattr(array, "_ndarray", None)]
+        if all(isinstance(part, np.ndarray) for part in parts):
+            arrays.extend(parts)
+        else:
+            totals["heap_bytes"] += int(column.memory_usage(deep=True))
+    return arrays
+
+
+def memory_footprint(obj) -> Dict[str, int]:
+    """
+    Deep memory footprint of a model object graph
+
+    Follows instance attributes, containers, NumPy arrays (each buffer counted
+    once, through its owner), sparse matrices and the arrays backing DataFrame
+    columns. Functions, modules and classes are not followed.
+
+    Returns:
+        {"heap_bytes": ..., "mapped_bytes": ...}, where mapped_bytes is data in
+        memory-mapped files (resident once touched, but reclaimable and shared
+        between processes)
+    """
+    totals = {"heap_bytes": 0, "mapped_bytes": 0}
+    _walk([obj], set(), totals)
+    return totals
+
+
+def memory_report(obj) -> Dict:
+    """
+    memory_footprint broken down by the object's attributes
+
+    Memory shared between attributes is charged to the first one holding it, in
+    attribute order, so the components add up to the total. DataFrame
+    components also list the deep size of each column.
+
+    Returns:
+        {"total": {...}, "components": {attribute: {"heap_bytes", "mapped_bytes"[, "columns"]}}},
+        components largest first
+    """
+    seen = {id(obj), id(getattr(obj, "__dict__", None))}
+    total = {"heap_bytes": sys.getsizeof(obj), "mapped_bytes": 0}
+    components = {}
+    for name, value in vars(obj).items():
+        sizes = {"heap_bytes": 0, "mapped_bytes": 0}
+        _walk([value], seen, sizes)
+        if _is_frame(value):
+            sizes["columns"] = {str(column): int(size) for column, size in value.memory_usage(deep=True, index=False).items()}
+        components[name] = sizes
+        total["heap_bytes"] += sizes["heap_bytes"]
+        total["mapped_bytes"] += sizes["mapped_bytes"]
+
+    ordered = sorted(components.items(), key=lambda item: -(item[1]["heap_bytes"] + item[1]["mapped_bytes"]))
+    return {"total": total, "components": dict(ordered)}
+
+
+def compact_frame(frame, max_level_ratio: float = 0.5):
+    """
+    Copy of a DataFrame with a smaller footprint and the same values:
+    - numeric columns downcast to the smallest dtype that holds every value exactly
+    - string columns with few distinct values (at most max_level_ratio of the
+      rows, e.g. category or difficulty) stored as pandas categoricals, so each
+      distinct string is held once
+    """
+    import pandas as pd
+
+    frame = frame.copy()
+    for column in frame.columns:
+        values = frame[column]
+        kind = values.dtype.kind
+        if kind in "iu":
+            frame[column] = pd.to_numeric(values, downcast="integer" if kind == "i" else "unsigned")
+        elif kind == "f":
+            narrow = values.astype(np.float32)
+            if np.array_equal(narrow.to_numpy(dtype=np.float64), values.to_numpy(), equal_nan=True):
+                frame[column] = narrow
+        elif kind == "O" and len(values) and values.nunique(dropna=False) <= max_level_ratio * len(values):
+            if values.map(lambda value: isinstance(value, str) or value is None or value != value).all():
+                frame[column] = values.astype("category")
+    return frame
+
+
+def process_rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
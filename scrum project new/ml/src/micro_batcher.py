@@ -0,0 +1,174 @@
+"""
+Micro-batching - Coalesce concurrent requests into batched model calls
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests on an asyncio event loop and processes them in batches:
+    - A batch closes after max_wait_ms or once max_batch_size requests are queued
+    - Each batch runs through batch_fn in an executor, off the event loop
+    - Results are fanned back out to the waiting callers
+
+    Callers can be plain threads (submit_sync, e.g. Flask handlers) or coroutines
+    on any event loop (submit).
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 64, max_wait_ms: float = 2.0, workers: int = 2):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-worker")
+        self._loop = asyncio.new_event_loop()
+        self._queue = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+
+        # Metrics
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._size_histogram = {}
+        self._recent = deque(maxlen=100)
+
+    def start(self):
+        """Start the event loop thread"""
+        self._thread.start()
+        self._ready.wait()
+        logger.info(f"Micro-batching enabled (window={self.max_wait * 1000:g}ms, max_batch_size={self.max_batch_size})")
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._loop.create_task(self._collect())
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+        # Cancel the collector and any batches still in flight before closing the loop
+        pending = asyncio.all_tasks(self._loop)
+        for task in pending:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self._loop.close()
+
+    async def _collect(self):
+        """Form batches from the queue and dispatch them"""
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            opened = self._loop.time()
+            deadline = opened + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued without waiting
+                while not self._queue.empty() and len(batch) < self.max_batch_size:
+                    batch.append(self._queue.get_nowait())
+                remaining = deadline - self._loop.time()
+                if len(batch) >= self.max_batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            self._loop.create_task(self._dispatch(batch, self._loop.time() - opened))
+
+    async def _dispatch(self, batch: List, window: float):
+        """Run one batch in the executor and resolve its futures"""
+        batch = [(item, future) for item, future in batch if not future.done()]  # Callers that gave up
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await self._loop.run_in_executor(self._executor, self.batch_fn, items)
+            error = None
+        except Exception as e:
+            logger.error(f"Batch of {len(items)} failed: {e}")
+            results, error = None, e
+        elapsed = time.perf_counter() - started
+
+        self._record(len(items), window, elapsed, error is not None)
+
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def _record(self, size: int, window: float, elapsed: float, failed: bool):
+        with self._lock:
+            self._batches += 1
+            self._requests += size
+            self._errors += int(failed)
+            bucket = 1 << (size - 1).bit_length()
+            self._size_histogram[bucket] = self._size_histogram.get(bucket, 0) + 1
+            self._recent.append({
+                "size": size,
+                "window_ms": round(window * 1000, 3),
+                "compute_ms": round(elapsed * 1000, 3),
+                "failed": failed,
+            })
+        logger.debug(f"Batch of {size} scored in {elapsed * 1000:.2f}ms")
+
+    async def _enqueue(self, item: Any) -> Any:
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def submit(self, item: Any) -> Any:
+        """Submit an item from a coroutine (on any event loop)"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._enqueue(item), self._loop))
+
+    def submit_sync(self, item: Any, timeout: float = None) -> Any:
+        """
+        Submit an item from a regular thread and block until its result is ready
+
+        Raises TimeoutError after `timeout` seconds; the item is then withdrawn,
+        or its result dropped if its batch is already running.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._enqueue(item), self._loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError(f"No result within {timeout:g}s") from None
+
+    def stats(self) -> Dict:
+        """Batching counters, batch size histogram and the most recent batches"""
+        with self._lock:
+            return {
+                "enabled": True,
+                "window_ms": self.max_wait * 1000,
+                "max_batch_size": self.max_batch_size,
+                "batches": self._batches,
+                "requests": self._requests,
+                "errors": self._errors,
+                "timeouts": self._timeouts,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "batch_size_histogram": {str(k): v for k, v in sorted(self._size_histogram.items())},
+                "recent_batches": list(self._recent),
+            }
+
+    def stop(self):
+        """Stop the event loop and executor"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,303 @@
+"""
+Model Registry - Named, versioned models loaded on demand under a memory budget
+"""
+from typing import Callable, Dict, List, Tuple
+import threading
+import time
+import logging
+
+from memory_usage import memory_report, process_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownModel(KeyError):
+    """Raised for a model spec that is not registered"""
+
+
+class ModelEntry:
+    """
+    One registered model: where to load it from and, once loaded, the model
+    object with its memory footprint and usage counters
+    """
+
+    def __init__(self, name: str, version: str, family: str, path: str, pinned: bool = False):
+        self.name = name
+        self.version = version
+        self.family = family
+        self.path = path
+        self.pinned = pinned
+
+        self.model = None
+        self.artifact_version = None
+        self.memory = {"heap_bytes": 0, "mapped_bytes": 0}
+        self.components = {}
+        self.loaded_at = None
+        self.last_used = 0.0
+        self.loads = 0
+        self.hits = 0
+
+        self._lock = threading.Lock()
+        self._attachments = {}
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    @property
+    def tag(self) -> str:
+        """Key plus artifact version, for cache keys and cursors"""
+        return f"{self.key}:{self.artifact_version}"
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes charged against the budget (mapped pages count once they are touched)"""
+        return self.memory["heap_bytes"] + self.memory["mapped_bytes"]
+
+    def attach(self, name: str, factory: Callable):
+        """
+        Object built from the loaded model on first use, dropped with it on
+        eviction or reload (its close() is called then, if it has one)
+        """
+        with self._lock:
+            if name not in self._attachments:
+                self._attachments[name] = factory()
+            return self._attachments[name]
+
+    def attachment(self, name: str):
+        """An attached object if it was built, else None"""
+        return self._attachments.get(name)
+
+    def _drop_attachments(self):
+        attachments, self._attachments = self._attachments, {}
+        for attachment in attachments.values():
+            close = getattr(attachment, "close", None)
+            if callable(close):
+                close()
+
+    def memory_stats(self) -> Dict:
+        """Footprint in MB, total and per model attribute (as measured at load)"""
+        return {
+            "heap_mb": round(self.memory["heap_bytes"] / 1024 / 1024, 2),
+            "mapped_mb": round(self.memory["mapped_bytes"] / 1024 / 1024, 2),
+            "components": {
+                name: round((sizes["heap_bytes"] + sizes["mapped_bytes"]) / 1024 / 1024, 3)
+                for name, sizes in self.components.items()
+            },
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "family": self.family,
+            "path": self.path,
+            "pinned": self.pinned,
+            "loaded": self.loaded,
+            "artifact_version": self.artifact_version,
+            "heap_mb": round(self.memory["heap_bytes"] / 1024 / 1024, 2),
+            "mapped_mb": round(self.memory["mapped_bytes"] / 1024 / 1024, 2),
+            "idle_seconds": round(time.monotonic() - self.last_used, 1) if self.loaded else None,
+            "loads": self.loads,
+            "hits": self.hits,
+        }
+
+
+class ModelRegistry:
+    """
+    Serves several model families and versions from one process:
+    - models are registered by name@version with a family (which loader builds
+      them) and an artifact path, and loaded on first use
+    - a request names a model as "name" (the family default if it has that name,
+      else the last registered version) or "name@version"; no name means the
+      default of the endpoint's family
+    - each loaded model's deep memory footprint is measured after loading, and
+      the least recently used unpinned models are evicted while the total is
+      above memory_budget_bytes (0 = unbounded)
+
+    Requests hold their own reference to the model object, so an eviction never
+    pulls a model out from under a request in flight; its memory is freed once
+    the last such request finishes.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[str], Tuple[object, str]]], memory_budget_bytes: int = 0):
+        """
+        Args:
+            loaders: family -> function(path) returning (model, artifact version)
+            memory_budget_bytes: Budget for the loaded models (0 = unbounded)
+        """
+        self.loaders = loaders
+        self.memory_budget_bytes = memory_budget_bytes
+        self.evictions = 0
+
+        self._entries = {}
+        self._defaults = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, version: str, family: str, path: str,
+                 default: bool = False, pinned: bool = False) -> ModelEntry:
+        """Register (or re-point) a model; it is loaded on first use"""
+        if family not in self.loaders:
+            raise ValueError(f"Unknown model family '{family}', expected one of {sorted(self.loaders)}")
+        if "@" in name or "@" in version:
+            raise ValueError("Model names and versions cannot contain '@'")
+
+        entry = ModelEntry(name, version, family, str(path), pinned=pinned)
+        with self._lock:
+            previous = self._entries.pop(entry.key, None)
+            if previous is not None:
+                self._unload(previous)
+            self._entries[entry.key] = entry
+            if default or family not in self._defaults:
+                self._defaults[family] = entry.key
+        return entry
+
+    def default(self, family: str) -> ModelEntry:
+        """Default entry of a family, or None"""
+        with self._lock:
+            key = self._defaults.get(family)
+            return self._entries.get(key) if key else None
+
+    def resolve(self, spec: str = None, family: str = None) -> ModelEntry:
+        """
+        Registered entry for a spec ("name" or "name@version"), without loading it
+
+        Raises UnknownModel if nothing matches, ValueError if the entry is not
+        of the requested family.
+        """
+        with self._lock:
+            if not spec:
+                entry = self.default(family)
+                if entry is None:
+                    raise UnknownModel(f"No default model for '{family}'")
+                return entry
+
+            name, _, version = str(spec).partition("@")
+            if version:
+                entry = self._entries.get(spec)
+            else:
+                named = [entry for entry in self._entries.values() if entry.name == name]
+                defaults = [entry for entry in named if self._defaults.get(entry.family) == entry.key]
+                entry = (defaults or named or [None])[-1]
+
+        if entry is None:
+            raise UnknownModel(f"Unknown model '{spec}'")
+        if family is not None and entry.family != family:
+            raise ValueError(f"Model '{entry.key}' is a {entry.family} model, this endpoint serves {family} models")
+        return entry
+
+    def get(self, spec: str = None, family: str = None) -> ModelEntry:
+        """Resolve a spec and make sure its model is loaded"""
+        entry = self.resolve(spec, family)
+        if entry.model is None:
+            with entry._lock:
+                if entry.model is None:
+                    self._load(entry)
+            self._enforce_budget(keep=entry)
+        entry.last_used = time.monotonic()
+        entry.hits += 1
+        return entry
+
+    def load(self, spec: str) -> ModelEntry:
+        """(Re)load a model from its artifact; the old model serves until the new one is ready"""
+        entry = self.resolve(spec)
+        with entry._lock:
+            self._load(entry)
+        self._enforce_budget(keep=entry)
+        entry.last_used = time.monotonic()
+        return entry
+
+    def _load(self, entry: ModelEntry):
+        """Build the model and measure it; the caller holds the entry lock"""
+        started = time.perf_counter()
+        model, artifact_version = self.loaders[entry.family](entry.path)
+        report = memory_report(model)
+        memory = report["total"]
+
+        entry.model, entry.artifact_version, entry.memory = model, artifact_version, memory
+        entry.components = report["components"]
+        entry._drop_attachments()
+        entry.loaded_at = time.time()
+        entry.loads += 1
+        logger.info(
+            f"Loaded model {entry.key} ({entry.family}) in {time.perf_counter() - started:.2f}s: "
+            f"{memory['heap_bytes'] / 1024 / 1024:.1f} MB heap, {memory['mapped_bytes'] / 1024 / 1024:.1f} MB mapped"
+        )
+
+    def _unload(self, entry: ModelEntry):
+        entry.model = None
+        entry._drop_attachments()
+        entry.memory = {"heap_bytes": 0, "mapped_bytes": 0}
+        entry.components = {}
+
+    def evict(self, spec: str) -> bool:
+        """Drop a loaded model (it is reloaded on next use); False if it was not loaded"""
+        entry = self.resolve(spec)
+        with entry._lock:
+            if entry.model is None:
+                return False
+            self._unload(entry)
+        logger.info(f"Evicted model {entry.key}")
+        return True
+
+    def evict_unpinned(self) -> List[str]:
+        """Drop every loaded unpinned model"""
+        with self._lock:
+            entries = [entry for entry in self._entries.values() if entry.loaded and not entry.pinned]
+        return [entry.key for entry in entries if self.evict(entry.key)]
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.resident_bytes for entry in self._entries.values() if entry.loaded)
+
+    def _enforce_budget(self, keep: ModelEntry = None):
+        """Evict least recently used unpinned models until the loaded ones fit the budget"""
+        if self.memory_budget_bytes <= 0:
+            return
+
+        with self._lock:
+            total = self.resident_bytes()
+            candidates = sorted(
+                (entry for entry in self._entries.values() if entry.loaded and not entry.pinned and entry is not keep),
+                key=lambda entry: entry.last_used,
+            )
+            for entry in candidates:
+                if total <= self.memory_budget_bytes:
+                    break
+                total -= entry.resident_bytes
+                if self.evict(entry.key):
+                    self.evictions += 1
+
+        if total > self.memory_budget_bytes:
+            logger.warning(
+                f"Loaded models use {total / 1024 / 1024:.1f} MB, over the "
+                f"{self.memory_budget_bytes / 1024 / 1024:.1f} MB budget, with nothing left to evict"
+            )
+
+    def memory_stats(self) -> Dict:
+        """Process RSS and the footprint of every loaded model, broken down by component"""
+        with self._lock:
+            entries = [entry for entry in self._entries.values() if entry.loaded]
+        return {
+            "rss_mb": round(process_rss_bytes() / 1024 / 1024, 2),
+            "models_mb": round(sum(entry.resident_bytes for entry in entries) / 1024 / 1024, 2),
+            "models": {entry.key: entry.memory_stats() for entry in entries},
+        }
+
+    def stats(self) -> Dict:
+        """Registered models with their memory and usage, plus budget totals"""
+        with self._lock:
+            entries = list(self._entries.values())
+            defaults = dict(self._defaults)
+        return {
+            "models": [entry.stats() for entry in entries],
+            "defaults": defaults,
+            "loaded": sum(entry.loaded for entry in entries),
+            "resident_mb": round(sum(entry.resident_bytes for entry in entries if entry.loaded) / 1024 / 1024, 2),
+            "budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 2) if self.memory_budget_bytes > 0 else None,
+            "evictions": self.evictions,
+        }
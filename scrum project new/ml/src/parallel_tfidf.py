@@ -0,0 +1,150 @@
+"""
+Parallel TF-IDF - Chunked, multi-process fitting of the course TF-IDF model
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Integral
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+import os
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+import logging
+
+from tfidf_runtime import TfidfRuntime
+
+logger = logging.getLogger(__name__)
+
+# Per-process state set by the pool initializers
+_worker_runtime = None
+
+
+def _init_worker(settings: Dict, arrays: Dict[str, np.ndarray]):
+    global _worker_runtime
+    _worker_runtime = TfidfRuntime.from_export(settings, arrays)
+
+
+def _count_chunk(docs: List[str]) -> Tuple[int, Dict[str, int], Dict[str, int]]:
+    """Document and term frequencies of every n-gram in a chunk"""
+    df = Counter()
+    tf = Counter()
+    for doc in docs:
+        terms = Counter(_worker_runtime.analyze(doc))
+        tf.update(terms)
+        df.update(terms.keys())
+    return len(docs), dict(df), dict(tf)
+
+
+def _transform_chunk(docs: List[str]) -> csr_matrix:
+    return _worker_runtime.transform(docs)
+
+
+class ParallelTfidfFitter:
+    """
+    Fits the equivalent of TfidfVectorizer(...).fit_transform over a corpus that
+    is streamed in chunks:
+    - pass 1: worker processes count document/term frequencies per chunk and the
+      counts are merged; min_df/max_df and max_features are then applied exactly
+      as scikit-learn does (top term counts over the alphabetically sorted terms)
+    - pass 2: workers transform the chunks into CSR blocks, stacked in order
+
+    Only n_jobs * 2 chunks are in flight at a time, so the raw text never has to
+    be held at once. `chunks` is a callable returning a fresh iterator of lists
+    of documents, since the corpus is read twice.
+    """
+
+    def __init__(self, max_features: int = None, min_df=1, max_df=1.0, stop_words=None,
+                 ngram_range: Tuple[int, int] = (1, 1), token_pattern: str = r"(?u)\b\w\w+\b",
+                 lowercase: bool = True, norm: str = "l2", sublinear_tf: bool = False, n_jobs: int = None):
+        if stop_words == "english":
+            from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+            stop_words = ENGLISH_STOP_WORDS
+
+        self.max_features = max_features
+        self.min_df = min_df
+        self.max_df = max_df
+        self.settings = {
+            "stop_words": sorted(stop_words) if stop_words else [],
+            "ngram_range": list(ngram_range),
+            "token_pattern": token_pattern,
+            "lowercase": lowercase,
+            "norm": norm,
+            "sublinear_tf": sublinear_tf,
+        }
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+
+        self.runtime = None
+        self.n_documents = 0
+
+    def _map(self, fn: Callable, chunks: Iterable[List[str]], arrays: Dict[str, np.ndarray]) -> Iterator:
+        """fn over the chunks in order, in worker processes with bounded read-ahead"""
+        if self.n_jobs == 1:
+            _init_worker(self.settings, arrays)
+            for chunk in chunks:
+                yield fn(chunk)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker, initargs=(self.settings, arrays)) as executor:
+            pending = []
+            for chunk in chunks:
+                pending.append(executor.submit(fn, chunk))
+                if len(pending) >= 2 * self.n_jobs:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    def fit_transform(self, chunks: Callable[[], Iterable[List[str]]]) -> csr_matrix:
+        """Fit the vocabulary and idf, and return the tf-idf matrix of the corpus"""
+        self.fit(chunks)
+        return self.transform(chunks)
+
+    def fit(self, chunks: Callable[[], Iterable[List[str]]]):
+        """Pass 1: merged frequency counts -> vocabulary and idf"""
+        empty = {"vocabulary": np.array([], dtype=str)}
+        n_documents = 0
+        df_total = Counter()
+        tf_total = Counter()
+        for n_docs, df, tf in self._map(_count_chunk, chunks(), empty):
+            n_documents += n_docs
+            df_total.update(df)
+            tf_total.update(tf)
+
+        # Alphabetical term order, as CountVectorizer._sort_features
+        terms = sorted(df_total)
+        dfs = np.array([df_total[term] for term in terms], dtype=np.int64)
+        tfs = np.array([tf_total[term] for term in terms], dtype=np.int64)
+        del df_total, tf_total
+
+        max_doc_count = self.max_df if isinstance(self.max_df, Integral) else self.max_df * n_documents
+        min_doc_count = self.min_df if isinstance(self.min_df, Integral) else self.min_df * n_documents
+        if max_doc_count < min_doc_count:
+            raise ValueError("max_df corresponds to < documents than min_df")
+
+        # Same selection as CountVectorizer._limit_features
+        mask = (dfs <= max_doc_count) & (dfs >= min_doc_count)
+        if self.max_features is not None and mask.sum() > self.max_features:
+            mask_inds = (-tfs[mask]).argsort()[: self.max_features]
+            new_mask = np.zeros(len(dfs), dtype=bool)
+            new_mask[np.where(mask)[0][mask_inds]] = True
+            mask = new_mask
+        kept = np.where(mask)[0]
+        if len(kept) == 0:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+        # Smoothed idf, as TfidfTransformer.fit
+        df = dfs[kept].astype(np.float64) + 1.0
+        idf = np.full_like(df, fill_value=n_documents + 1, dtype=np.float64)
+        idf /= df
+        np.log(idf, out=idf)
+        idf += 1.0
+
+        self.runtime = TfidfRuntime(vocabulary=[terms[i] for i in kept], idf=idf, **self.settings)
+        self.n_documents = n_documents
+        logger.info(f"TF-IDF vocabulary: {len(kept)} of {len(terms)} terms from {n_documents} documents ({self.n_jobs} workers)")
+        return self
+
+    def transform(self, chunks: Callable[[], Iterable[List[str]]]) -> csr_matrix:
+        """Pass 2: CSR blocks per chunk, stacked in corpus order"""
+        blocks = list(self._map(_transform_chunk, chunks(), self.runtime.arrays()))
+        if not blocks:
+            return csr_matrix((0, self.runtime.n_features), dtype=np.float64)
+        return vstack(blocks, format="csr")
@@ -6,14 +6,19 @@ import numpy as np
 from pathlib import Path
 import logging
 
+from near_duplicates import NearDuplicateFinder
+
 logger = logging.getLogger(__name__)
 
 
 class ProfessionalDataLoader:
     """Loads and processes real course data from Coursera reviews"""
 
-    def __init__(self, data_dir="../data"):
+    def __init__(self, data_dir="../data", dedup_threshold: float = 0.8):
         self.data_dir = Path(data_dir)
+        # Jaccard similarity of title + description shingles above which courses
+        # are merged as near duplicates (None disables deduplication)
+        self.dedup_threshold = dedup_threshold
 
     def load_courses_from_reviews(self) -> pd.DataFrame:
         """Extract course catalog from Coursera reviews"""
@@ -281,8 +286,48 @@ class ProfessionalDataLoader:
         # Ensure num_ratings is valid
         df["num_ratings"] = pd.to_numeric(df["num_ratings"], errors="coerce").fillna(0)
 
+        # Collapse near-identical courses
+        if self.dedup_threshold is not None:
+            df = self._merge_near_duplicates(df)
+
         return df
 
+    def _merge_near_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Collapse clusters of near-duplicate courses (MinHash/LSH over title +
+        description) into their most-reviewed member, with the rating averaged
+        over the cluster weighted by num_ratings and the review counts summed
+        """
+        if len(df) < 2:
+            return df
+
+        texts = (df["title"].astype(str) + " " + df["description"].astype(str)).tolist()
+        n_clusters, labels = NearDuplicateFinder(threshold=self.dedup_threshold).clusters(texts)
+        if n_clusters == len(df):
+            return df
+
+        df = df.reset_index(drop=True)
+        ratings = df["rating"].to_numpy(dtype=np.float64)
+        counts = df["num_ratings"].to_numpy(dtype=np.float64)
+
+        # Weighted mean rating per cluster; clusters without reviews use the plain mean
+        total_counts = np.bincount(labels, weights=counts, minlength=n_clusters)
+        weighted = np.bincount(labels, weights=ratings * counts, minlength=n_clusters)
+        plain = np.bincount(labels, weights=ratings, minlength=n_clusters) / np.bincount(labels, minlength=n_clusters)
+        merged_rating = np.divide(weighted, total_counts, out=plain, where=total_counts > 0)
+
+        # Canonical member: most reviews, earliest row on ties
+        order = np.lexsort((np.arange(len(df)), -counts, labels))
+        canonical = np.sort(order[np.r_[True, labels[order][1:] != labels[order][:-1]]])
+
+        merged = df.iloc[canonical].copy()
+        cluster = labels[canonical]
+        merged["rating"] = np.round(merged_rating[cluster], 2)
+        merged["num_ratings"] = total_counts[cluster].astype(df["num_ratings"].dtype)
+
+        logger.info(f"Merged {len(df) - len(merged)} near-duplicate courses into {int((np.bincount(labels) > 1).sum())} canonical courses")
+        return merged.reset_index(drop=True)
+
     def create_user_profiles(self, n_users: int = 1000) -> pd.DataFrame:
         """Create diverse synthetic student profiles"""
         np.random.seed(42)
@@ -0,0 +1,273 @@
+"""
+Rating Ingestor - Online ratings folded into a served HybridRecommender without retraining
+"""
+from typing import Callable, Dict, List, Tuple
+import threading
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+import logging
+
+from recommender_model import HybridRecommender
+from similarity import similarity_rows
+
+logger = logging.getLogger(__name__)
+
+
+def replace_rows(matrix: csr_matrix, rows: np.ndarray, new_rows: csr_matrix,
+                 extra: np.ndarray = None, new_extra: np.ndarray = None) -> Tuple[csr_matrix, np.ndarray]:
+    """
+    Copy of a CSR matrix with some rows replaced, in O(nnz)
+
+    Args:
+        rows: Sorted distinct rows to replace
+        new_rows: (len(rows), n_columns) CSR holding their new contents
+        extra, new_extra: Optional per-entry arrays aligned with matrix.data and
+            new_rows.data (e.g. rating criteria), carried along
+
+    Returns:
+        (new matrix, new extra array or None)
+    """
+    n_rows = matrix.shape[0]
+    old_counts = np.diff(matrix.indptr)
+    counts = old_counts.copy()
+    counts[rows] = np.diff(new_rows.indptr)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    # Kept entries move by the shift of their row start
+    keep = np.ones(n_rows, dtype=bool)
+    keep[rows] = False
+    kept = np.repeat(keep, old_counts)
+    old_positions = np.flatnonzero(kept)
+    old_rows = np.repeat(np.arange(n_rows), old_counts)[kept]
+    targets = old_positions + (indptr[old_rows] - matrix.indptr[old_rows])
+
+    new_counts = np.diff(new_rows.indptr)
+    new_targets = np.arange(new_rows.nnz) + np.repeat(indptr[rows] - new_rows.indptr[:-1], new_counts)
+
+    data = np.empty(indptr[-1], dtype=np.result_type(matrix.data, new_rows.data))
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    data[targets], indices[targets] = matrix.data[old_positions], matrix.indices[old_positions]
+    data[new_targets], indices[new_targets] = new_rows.data, new_rows.indices
+
+    merged_extra = None
+    if extra is not None:
+        merged_extra = np.empty((indptr[-1],) + extra.shape[1:], dtype=extra.dtype)
+        merged_extra[targets] = extra[old_positions]
+        merged_extra[new_targets] = new_extra
+    return csr_matrix((data, indices, indptr), shape=matrix.shape), merged_extra
+
+
+class RatingIngestor:
+    """
+    Online rating ingestion for a served HybridRecommender
+
+    - add() validates a batch of ratings, appends the ones for known users and
+      items to an in-memory COO delta buffer and updates the running item
+      statistics (num_ratings, avg_rating, popularity) right away, in O(batch)
+    - compact(), run by a background thread every compact_interval seconds or
+      as soon as max_delta ratings are pending, merges the delta into the rating
+      rows of the affected users, recomputes those users' neighbor rows and
+      materialized top-N rows, and swaps the new matrices into the model
+
+    Compaction builds new CSR matrices next to the old ones and publishes them
+    by reference assignment, so readers never take a lock and never see a
+    half-merged matrix. After publishing it calls on_compact with the ids of the
+    affected users, so caches built from their old rows (e.g. group profiles,
+    see GroupRecommender.invalidate_users) can be dropped. Ratings from users or
+    items the model was not trained on, and the per-context submatrices, wait
+    for the next training run.
+    """
+
+    def __init__(self, model: HybridRecommender, compact_interval: float = 2.0, max_delta: int = 10000,
+                 alpha: float = 0.7, on_compact: Callable[[List[str]], None] = None):
+        self.model = model
+        self.compact_interval = compact_interval
+        self.max_delta = max_delta
+        self.alpha = alpha
+        self.on_compact = on_compact
+
+        # Writable copies of the statistics updated in place (loaded arrays may be memory-mapped)
+        table = model.item_table
+        table["avg_rating"] = np.array(table["avg_rating"], dtype=np.float64)
+        table["num_ratings"] = np.array(table["num_ratings"], dtype=np.int64)
+        self._popularity = self._initial_popularity()
+
+        # Delta buffer: (row, col) -> (rating, criteria); later ratings of a pair replace earlier ones.
+        # The buffer being compacted stays visible to add() until it is published.
+        self._delta = {}
+        self._compacting = {}
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.accepted = 0
+        self.deferred = 0
+        self.compactions = 0
+        self.last_compaction = {}
+
+    def _initial_popularity(self) -> np.ndarray:
+        """Popularity score (num_ratings x avg_rating, i.e. the rating sum) per item column"""
+        features = self.model.item_features
+        if features is not None and "popularity_score" in features.columns:
+            return np.array(features.reindex(self.model.item_ids)["popularity_score"].fillna(0), dtype=np.float64)
+        matrix = self.model.user_item_matrix
+        return np.bincount(matrix.indices, weights=matrix.data, minlength=matrix.shape[1])
+
+    def start(self) -> "RatingIngestor":
+        self._thread = threading.Thread(target=self._run, name="rating-compactor", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the background compaction (pending ratings are dropped)"""
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.compact_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Rating compaction failed: {e}")
+
+    def _current_rating(self, row: int, col: int) -> float:
+        """Rating of (row, col) in the delta or the compacted matrix, 0 if none"""
+        pending = self._delta.get((row, col)) or self._compacting.get((row, col))
+        if pending is not None:
+            return pending[0]
+        matrix = self.model.user_item_matrix
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        position = start + np.searchsorted(matrix.indices[start:end], col)
+        return float(matrix.data[position]) if position < end and matrix.indices[position] == col else 0.0
+
+    def add(self, ratings: List[Dict]) -> Dict:
+        """
+        Ingest ratings: dicts with user_id, item_id, rating (1-5) and optionally
+        the app/data/ease criteria
+
+        Returns:
+            Counts of accepted ratings, ratings deferred to the next training run
+            (unknown user or item) and ratings pending compaction
+        """
+        values = []
+        for rating in ratings:
+            if not isinstance(rating, dict):
+                raise ValueError("Each rating must be an object")
+            if rating.get("user_id") is None or rating.get("item_id") is None or rating.get("rating") is None:
+                raise ValueError("Each rating needs user_id, item_id and rating")
+            value = float(rating["rating"])
+            if not 1.0 <= value <= 5.0:
+                raise ValueError("Rating must be between 1 and 5")
+            criteria = [int(np.clip(np.rint(float(rating.get(name) or 0)), 0, 5)) for name in HybridRecommender.CRITERIA_COLUMNS]
+            values.append((value, criteria))
+
+        model = self.model
+        rows = model.user_indices([str(rating["user_id"]) for rating in ratings])
+        cols = model.item_indices([str(rating["item_id"]) for rating in ratings])
+        known = (rows >= 0) & (cols >= 0)
+
+        table = model.item_table
+        with self._lock:
+            for i in np.flatnonzero(known):
+                row, col, (value, criteria) = int(rows[i]), int(cols[i]), values[i]
+                # Running item statistics: a new rating adds to the count, a changed one only moves the mean
+                previous = self._current_rating(row, col)
+                count = table["num_ratings"][col]
+                if previous > 0:
+                    table["avg_rating"][col] += (value - previous) / max(count, 1)
+                else:
+                    table["avg_rating"][col] = (table["avg_rating"][col] * count + value) / (count + 1)
+                    table["num_ratings"][col] = count + 1
+                self._popularity[col] += value - previous
+                self._delta[(row, col)] = (value, criteria)
+            pending = len(self._delta)
+
+        accepted, deferred = int(known.sum()), int((~known).sum())
+        self.accepted += accepted
+        self.deferred += deferred
+        if pending >= self.max_delta:
+            self._wake.set()
+        return {"accepted": accepted, "deferred": deferred, "pending": pending}
+
+    def compact(self) -> Dict:
+        """Merge the delta buffer into the model (one compaction at a time)"""
+        with self._compact_lock:
+            with self._lock:
+                delta, self._delta = self._delta, {}
+                self._compacting = delta
+            if not delta:
+                return {}
+
+            started = time.perf_counter()
+            model = self.model
+            matrix = model.user_item_matrix
+            n_items = matrix.shape[1]
+
+            keys = np.array(list(delta.keys()), dtype=np.int64)
+            values = np.array([value for value, _ in delta.values()], dtype=np.float64)
+            criteria = np.array([c for _, c in delta.values()], dtype=np.int8)
+            users = np.unique(keys[:, 0])
+
+            # New rating rows of the affected users: old entries, then the delta (which wins)
+            old = matrix[users]
+            old_positions = np.arange(old.nnz) + np.repeat(matrix.indptr[users] - old.indptr[:-1], np.diff(old.indptr))
+            row = np.concatenate([np.repeat(np.arange(len(users)), np.diff(old.indptr)), np.searchsorted(users, keys[:, 0])])
+            col = np.concatenate([old.indices, keys[:, 1]])
+            data = np.concatenate([old.data, values])
+            order = HybridRecommender._csr_order(row, col, n_items)
+            indptr = np.zeros(len(users) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(row[order], minlength=len(users)), out=indptr[1:])
+            new_rows = csr_matrix((data[order], col[order], indptr), shape=(len(users), n_items))
+
+            all_criteria = None
+            if model.rating_criteria is not None and len(model.rating_criteria) == matrix.nnz:
+                all_criteria = np.concatenate([model.rating_criteria[old_positions], criteria])[order]
+            new_matrix, new_criteria = replace_rows(matrix, users, new_rows, model.rating_criteria if all_criteria is not None else None, all_criteria)
+
+            # Neighbor rows of the affected users against the updated matrix
+            neighbors = similarity_rows(new_matrix, users, top_k=model.N_NEIGHBORS, exclude_self=True)
+            new_similarity, _ = replace_rows(model.user_similarity, users, neighbors)
+
+            # Publish: each assignment swaps a whole object, readers never wait
+            model.user_item_matrix = new_matrix
+            model.context_matrices = {**model.context_matrices, 0: new_matrix}
+            model.user_similarity = new_similarity
+            if new_criteria is not None:
+                model.rating_criteria = new_criteria
+            model.popular_items = np.argsort(-self._popularity, kind="stable").astype(np.int32)
+            with self._lock:
+                self._compacting = {}
+            if model.materialized is not None:
+                model.materialize_rows(users, alpha=self.alpha)
+            if self.on_compact is not None:
+                self.on_compact(model.user_ids[users].tolist())
+
+            self.compactions += 1
+            self.last_compaction = {
+                "ratings": len(delta),
+                "users": len(users),
+                "seconds": round(time.perf_counter() - started, 4),
+                "at": time.time(),
+            }
+            logger.info(f"Compacted {len(delta)} ratings for {len(users)} users in {self.last_compaction['seconds']:.3f}s")
+            return self.last_compaction
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._delta)
+        return {
+            "accepted": self.accepted,
+            "deferred": self.deferred,
+            "pending": pending,
+            "compactions": self.compactions,
+            "last_compaction": self.last_compaction,
+            "compact_interval": self.compact_interval,
+        }
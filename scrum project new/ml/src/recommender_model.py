@@ -1,99 +1,412 @@
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from scipy.sparse import csr_matrix
-from typing import List, Tuple, Dict
-import joblib
+from scipy.sparse import csr_matrix, issparse
+from typing import List, Optional, Tuple, Dict
+from pathlib import Path
+import json
+import shutil
+import time
 import logging
 
+from memory_usage import compact_frame, touch_pages
+from similarity import all_pairs_similarity
+
 logger = logging.getLogger(__name__)
 
 
 class HybridRecommender:
     """Hybrid recommendation model combining collaborative filtering and content-based"""
 
+    # Context variables and rating criteria carried by ITM-Rec ratings
+    CONTEXT_COLUMNS = ["class", "semester", "lockdown"]
+    CRITERIA_COLUMNS = ["app", "data", "ease"]
+
+    # Version of the array-split directory format written by save()
+    FORMAT_VERSION = 1
+
+    # Save profiles: "lean" leaves out the fit-only feature frames (see save)
+    PROFILES = ("full", "lean")
+
+    # Neighbors kept per user for collaborative filtering, and per item for the
+    # content-based scores (as many as the similar-course lists of AdvancedRecommender)
+    N_NEIGHBORS = 50
+    ITEM_NEIGHBORS = 20
+
     def __init__(self):
         self.user_item_matrix = None
         self.user_similarity = None
         self.item_similarity = None
         self.user_features = None
         self.item_features = None
-        self.user_id_map = {}
-        self.item_id_map = {}
-        self.reverse_item_map = {}
-
-    def fit(self, ratings: pd.DataFrame, user_features: pd.DataFrame, item_features: pd.DataFrame):
-        """Train the hybrid recommender"""
+        # Sorted id arrays; row/column i of the matrices belongs to ids[i]
+        self.user_ids = None
+        self.item_ids = None
+
+        # Context-aware indexes (see _build_context_index)
+        self.rating_criteria = None
+        self.context_levels = {}
+        self.context_matrices = {}
+        self.context_item_stats = {}
+
+        # Materialized per-user top-N table and cold-start list (see materialize)
+        self.item_table = {}
+        self.popular_items = None
+        self.materialized = None  # (top_items, top_scores), always replaced as one tuple
+
+        # Group memberships and the items each group already rated (see set_groups)
+        self.group_members = {}
+        self.group_rated_items = {}
+
+    def fit(self, ratings: pd.DataFrame, user_features: pd.DataFrame, item_features: pd.DataFrame,
+            n_jobs: int = None, memory_budget_mb: float = 256):
+        """
+        Train the hybrid recommender
+
+        Args:
+            n_jobs: Threads for the similarity computations (None = all cores)
+            memory_budget_mb: Budget for the dense similarity blocks in flight
+        """
         logger.info("Training hybrid recommender...")
 
         self.user_features = user_features.set_index("user_id")
         self.item_features = item_features.set_index("item_id")
 
-        # Create user-item matrix
-        unique_users = ratings["user_id"].unique()
-        unique_items = ratings["item_id"].unique()
-
-        self.user_id_map = {user_id: idx for idx, user_id in enumerate(unique_users)}
-        self.item_id_map = {item_id: idx for idx, item_id in enumerate(unique_items)}
-        self.reverse_item_map = {idx: item_id for item_id, idx in self.item_id_map.items()}
+        # Create user-item matrix. Rows and columns follow the sorted ids, so the id
+        # arrays double as the id -> index maps (see user_indices / item_indices).
+        self.user_ids, row = np.unique(np.asarray(ratings["user_id"], dtype=str), return_inverse=True)
+        self.item_ids, col = np.unique(np.asarray(ratings["item_id"], dtype=str), return_inverse=True)
+        n_users, n_items = len(self.user_ids), len(self.item_ids)
 
-        # Build sparse matrix
-        row = ratings["user_id"].map(self.user_id_map)
-        col = ratings["item_id"].map(self.item_id_map)
-        data = ratings["rating"].values
+        # Build sparse matrix. Entries are laid out in CSR order up front so that the
+        # per-rating criteria and context codes line up with user_item_matrix.data.
+        order = self._csr_order(row, col, n_items)
+        row, col = row[order], col[order]
+        data = ratings["rating"].values[order].astype(float)
 
+        indptr = np.zeros(n_users + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row, minlength=n_users), out=indptr[1:])
         self.user_item_matrix = csr_matrix(
-            (data, (row, col)), shape=(len(unique_users), len(unique_items))
+            (data, col, indptr), shape=(n_users, n_items)
         )
 
+        self._build_context_index(ratings.iloc[order], row, col, data)
+
         # Compute user similarity (collaborative filtering)
         logger.info("Computing user similarity...")
         logger.info(f"User-item matrix shape: {self.user_item_matrix.shape}")
-        logger.info(f"Computing similarity for {len(unique_users)} users...")
-        # Use sparse matrix for efficiency - compute only upper triangle and mirror
-        self.user_similarity = cosine_similarity(self.user_item_matrix, dense_output=False)
+        logger.info(f"Computing similarity for {n_users} users...")
+        # Only the neighbors collaborative filtering uses are kept
+        self.user_similarity = all_pairs_similarity(
+            self.user_item_matrix, top_k=self.N_NEIGHBORS, exclude_self=True,
+            memory_budget_mb=memory_budget_mb, n_jobs=n_jobs,
+        )
         logger.info("User similarity computation complete")
 
         # Compute item similarity (content-based)
         logger.info("Computing item similarity...")
-        logger.info(f"Computing similarity for {len(unique_items)} items...")
+        logger.info(f"Computing similarity for {n_items} items...")
         # Use item features for content-based similarity
         item_feature_cols = ["avg_rating", "rating_std", "num_ratings", "popularity_score", "combined_rating"]
         available_cols = [col for col in item_feature_cols if col in item_features.columns]
         
-        item_feature_matrix = item_features[available_cols].fillna(0).values
+        # Rows follow the item columns of the user-item matrix
+        item_feature_matrix = self.item_features.reindex(self.item_ids)[available_cols].fillna(0).values
         
-        # Normalize
+        # Normalize (scikit-learn is only needed for training; serving loads precomputed arrays)
         from sklearn.preprocessing import StandardScaler
         scaler = StandardScaler()
         item_feature_matrix_scaled = scaler.fit_transform(item_feature_matrix)
         
-        self.item_similarity = cosine_similarity(item_feature_matrix_scaled)
+        self.item_similarity = all_pairs_similarity(
+            item_feature_matrix_scaled, top_k=self.ITEM_NEIGHBORS,
+            memory_budget_mb=memory_budget_mb, n_jobs=n_jobs,
+        )
         logger.info("Item similarity computation complete")
 
+        self._build_item_table()
+
         logger.info("Training complete")
 
-    def predict(self, user_id: str, top_n: int = 10, alpha: float = 0.7) -> List[Dict]:
-        """Generate recommendations for a user"""
-        
-        if user_id not in self.user_id_map:
-            logger.warning(f"User {user_id} not found, using popularity-based recommendations")
+    def _build_item_table(self):
+        """Static output columns per item code and the popularity-ordered item codes"""
+        features = self.item_features.reindex(self.item_ids)
+
+        def column(name, default, dtype):
+            if name in features.columns:
+                return np.asarray(features[name].fillna(default), dtype=dtype)
+            return np.full(len(features), default, dtype=dtype)
+
+        avg_rating = column("avg_rating", 0.0, np.float64)
+        if "combined_rating" in features.columns:
+            avg_rating = np.where(features["combined_rating"].isna(), avg_rating, features["combined_rating"])
+
+        self.item_table = {
+            "title": column("title", "Unknown", str),
+            "description": column("description", "", str),
+            "url": column("url", "", str),
+            "avg_rating": np.asarray(avg_rating, dtype=np.float64),
+            "num_ratings": column("num_ratings", 0, np.int64),
+        }
+
+        popularity = column("popularity_score", 0.0, np.float64)
+        self.popular_items = np.argsort(-popularity, kind="stable").astype(np.int32)
+
+    def _item_record(self, idx: int) -> Dict:
+        """Static output fields of one item"""
+        table = self.item_table
+        return {
+            "item_id": str(self.item_ids[idx]),
+            "title": str(table["title"][idx]),
+            "description": str(table["description"][idx]),
+            "url": str(table["url"][idx]),
+            "avg_rating": float(table["avg_rating"][idx]),
+            "num_ratings": int(table["num_ratings"][idx]),
+        }
+
+    @staticmethod
+    def _lookup(sorted_ids: np.ndarray, keys) -> np.ndarray:
+        """Positions of keys in a sorted id array, -1 where absent"""
+        keys = np.asarray(keys, dtype=str).reshape(-1)
+        if sorted_ids is None or len(sorted_ids) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(sorted_ids, keys), len(sorted_ids) - 1)
+        return np.where(sorted_ids[positions] == keys, positions, -1)
+
+    def user_indices(self, user_ids) -> np.ndarray:
+        """Matrix rows of user ids (-1 for unknown users)"""
+        return self._lookup(self.user_ids, user_ids)
+
+    def item_indices(self, item_ids) -> np.ndarray:
+        """Matrix columns of item ids (-1 for unknown items)"""
+        return self._lookup(self.item_ids, item_ids)
+
+    def user_index(self, user_id: str) -> int:
+        """Matrix row of a user id, -1 if the user is unknown"""
+        return int(self.user_indices([user_id])[0])
+
+    def materialize(self, top_n: int = 50, alpha: float = 0.7, batch_size: int = 256):
+        """
+        Precompute the top-N recommendations of every known user.
+
+        Users are scored in batches through score_users and the result is kept as
+        a compact table: top_items (int32 item codes, -1 padded) and top_scores
+        (float32), one row per user. recommend_user then serves known users with
+        a row lookup.
+        """
+        n_users, n_items = self.user_item_matrix.shape
+        top_n = min(top_n, n_items)
+        logger.info(f"Materializing top-{top_n} recommendations for {n_users} users...")
+
+        top_items = np.full((n_users, top_n), -1, dtype=np.int32)
+        top_scores = np.full((n_users, top_n), -np.inf, dtype=np.float32)
+
+        for start in range(0, n_users, batch_size):
+            users = np.arange(start, min(start + batch_size, n_users))
+            top_items[users], top_scores[users] = self._top_rows(users, top_n, alpha)
+
+        self.materialized = (top_items, top_scores)
+        logger.info("Materialization complete")
+
+    @property
+    def top_items(self) -> Optional[np.ndarray]:
+        return None if self.materialized is None else self.materialized[0]
+
+    @property
+    def top_scores(self) -> Optional[np.ndarray]:
+        return None if self.materialized is None else self.materialized[1]
+
+    def materialize_rows(self, user_indices: np.ndarray, alpha: float = 0.7):
+        """
+        Recompute the materialized top-N rows of some users (e.g. after their
+        ratings changed)
+
+        The rows are written into copies of the table and both arrays are
+        published with one assignment, so a concurrent recommend_user never
+        pairs new items with old scores.
+        """
+        top_items, top_scores = self.materialized
+        top_items, top_scores = np.array(top_items), np.array(top_scores)
+        top_items[user_indices], top_scores[user_indices] = self._top_rows(user_indices, top_items.shape[1], alpha)
+        self.materialized = (top_items, top_scores)
+
+    def _top_rows(self, user_indices: np.ndarray, top_n: int, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(item codes, -1 padded; scores) of the top-N unrated items of some users, best first"""
+        scores = self.score_users(user_indices, alpha=alpha)
+
+        # Remove already rated items
+        rated = self.user_item_matrix[user_indices]
+        scores[np.repeat(np.arange(len(user_indices)), np.diff(rated.indptr)), rated.indices] = -np.inf
+
+        # Top N per row, best first
+        top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+        top_values = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_values, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_values = np.take_along_axis(top_values, order, axis=1)
+
+        valid = np.isfinite(top_values)
+        return np.where(valid, top, -1), top_values
+
+    def recommend_user(self, user_id: str, top_n: int = 10) -> List[Dict]:
+        """
+        Serve recommendations for a user from the materialized table.
+
+        Unknown users get the precomputed popularity list; requests deeper than
+        the table (or models without one) fall back to online predict.
+        """
+        user_idx = self.user_index(user_id)
+        if user_idx < 0:
             return self._get_popular_items(top_n)
 
-        user_idx = self.user_id_map[user_id]
+        materialized = self.materialized  # one snapshot of both arrays
+        if materialized is None or top_n > materialized[0].shape[1]:
+            return self.predict(user_id, top_n)
+
+        top_items, top_scores = materialized
+        items = top_items[user_idx, :top_n]
+        valid = items >= 0
+        return self._format_recommendations(items[valid], top_scores[user_idx, :top_n][valid])
+
+    @staticmethod
+    def _csr_order(row: np.ndarray, col: np.ndarray, n_cols: int) -> np.ndarray:
+        """Row-major ordering of (row, col) entries, keeping the last duplicate"""
+        key = row.astype(np.int64) * n_cols + col
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        keep = np.ones(len(key), dtype=bool)
+        keep[:-1] = key[1:] != key[:-1]
+        return order[keep]
+
+    def _build_context_index(self, ratings: pd.DataFrame, row: np.ndarray, col: np.ndarray, data: np.ndarray):
+        """
+        Precompute per-context rating submatrices and item statistics.
+
+        Every rating belongs to all contexts obtained by keeping or wildcarding each
+        context variable, so "DB class", "Spring semester" and "DB class, Spring
+        semester" are all served from their own submatrix. Contexts are keyed by a
+        small integer code (see encode_context); code 0 is the unfiltered matrix.
+        """
+        n_users, n_items = self.user_item_matrix.shape
+
+        criteria_cols = [c for c in self.CRITERIA_COLUMNS if c in ratings.columns]
+        criteria = np.zeros((len(ratings), len(self.CRITERIA_COLUMNS)), dtype=np.int8)
+        for i, name in enumerate(self.CRITERIA_COLUMNS):
+            if name in criteria_cols:
+                values = pd.to_numeric(ratings[name], errors="coerce").fillna(0).values
+                criteria[:, i] = np.clip(np.rint(values), 0, 5).astype(np.int8)
+        self.rating_criteria = criteria
+
+        # Level codes per context variable: 0 = any, 1..L = sorted levels
+        self.context_levels = {}
+        level_codes = []
+        for name in self.CONTEXT_COLUMNS:
+            if name not in ratings.columns:
+                continue
+            levels, codes = np.unique(ratings[name].astype(str).values, return_inverse=True)
+            self.context_levels[name] = levels.tolist()
+            level_codes.append(codes + 1)
+
+        # Mixed-radix context code of every (rating, wildcard pattern) pair
+        radices = [len(levels) + 1 for levels in self.context_levels.values()]
+        rating_codes = [np.zeros(len(ratings), dtype=np.int64)]
+        multiplier = 1
+        for codes, radix in zip(level_codes, radices):
+            rating_codes = rating_codes + [c + codes * multiplier for c in rating_codes]
+            multiplier *= radix
+
+        self.context_matrices = {0: self.user_item_matrix}
+        self.context_item_stats = {}
+        for codes in rating_codes:
+            for code in np.unique(codes):
+                mask = codes == code
+                if code != 0:
+                    self.context_matrices[int(code)] = csr_matrix(
+                        (data[mask], (row[mask], col[mask])), shape=(n_users, n_items)
+                    )
+                self.context_item_stats[int(code)] = self._item_stats(col[mask], data[mask], criteria[mask], n_items)
+
+        logger.info(
+            f"Context index built: {len(self.context_matrices)} contexts over "
+            f"{', '.join(self.context_levels) or 'no context columns'}"
+        )
+
+    @staticmethod
+    def _item_stats(col: np.ndarray, data: np.ndarray, criteria: np.ndarray, n_items: int) -> np.ndarray:
+        """Per-item [count, mean rating, mean criterion...] as a float32 array"""
+        counts = np.bincount(col, minlength=n_items).astype(np.float64)
+        safe = np.maximum(counts, 1)
+        columns = [counts, np.bincount(col, weights=data, minlength=n_items) / safe]
+        for i in range(criteria.shape[1]):
+            values = criteria[:, i].astype(np.float64)
+            rated = np.bincount(col, weights=(values > 0).astype(np.float64), minlength=n_items)
+            columns.append(np.bincount(col, weights=values, minlength=n_items) / np.maximum(rated, 1))
+        return np.column_stack(columns).astype(np.float32)
+
+    def set_groups(self, groups: pd.DataFrame, group_ratings: pd.DataFrame = None):
+        """Attach ITM-Rec group memberships (and group ratings) to the model"""
+        self.group_members = {
+            str(group_id): members.astype(str).tolist()
+            for group_id, members in groups.groupby("group_id")["user_id"]
+        }
+        self.group_rated_items = {}
+        if group_ratings is not None and not group_ratings.empty:
+            for group_id, items in group_ratings.groupby("group_id")["item_id"]:
+                item_indices = self.item_indices(np.asarray(items, dtype=str))
+                self.group_rated_items[str(group_id)] = np.unique(item_indices[item_indices >= 0]).astype(np.int32)
+        logger.info(f"Attached {len(self.group_members)} groups")
+
+    def encode_context(self, context) -> int:
+        """
+        Map a context such as {"class": "DB", "semester": "Spring"} to its integer code.
+
+        Variables that are omitted (or None) act as wildcards. Integer codes are
+        passed through unchanged.
+        """
+        if context is None:
+            return 0
+        if isinstance(context, (int, np.integer)):
+            return int(context)
+
+        code = 0
+        multiplier = 1
+        for name, levels in self.context_levels.items():
+            value = context.get(name)
+            if value is not None:
+                if str(value) not in levels:
+                    raise ValueError(f"Unknown {name} '{value}', expected one of {levels}")
+                code += (levels.index(str(value)) + 1) * multiplier
+            multiplier *= len(levels) + 1
+
+        unknown = set(context) - set(self.context_levels)
+        if unknown:
+            raise ValueError(f"Unknown context variables: {sorted(unknown)}")
+        return code
+
+    def predict(self, user_id: str, top_n: int = 10, alpha: float = 0.7, context=None) -> List[Dict]:
+        """
+        Generate recommendations for a user
+
+        Args:
+            user_id: ITM-Rec user id
+            top_n: Number of recommendations
+            alpha: Weight of collaborative filtering vs content-based scores
+            context: Optional context dict (e.g. {"class": "DB", "semester": "Spring"})
+                or a code from encode_context. Neighbors' ratings are then read from
+                the precomputed submatrix for that context.
+        """
+        context_code = self.encode_context(context)
+
+        user_idx = self.user_index(user_id)
+        if user_idx < 0:
+            logger.warning(f"User {user_id} not found, using popularity-based recommendations")
+            return self._get_popular_items(top_n, context_code)
 
         # Get user's rated items
         user_ratings = self.user_item_matrix[user_idx].toarray().flatten()
         rated_items = np.where(user_ratings > 0)[0]
 
-        # Collaborative filtering scores
-        cf_scores = self._collaborative_filtering_scores(user_idx, rated_items)
-
-        # Content-based scores
-        cb_scores = self._content_based_scores(rated_items)
-
         # Hybrid scores
-        final_scores = alpha * cf_scores + (1 - alpha) * cb_scores
+        final_scores = self.score_users([user_idx], alpha=alpha, context=context_code)[0]
 
         # Remove already rated items
         final_scores[rated_items] = -np.inf
@@ -101,85 +414,321 @@ class HybridRecommender:
         # Get top N
         top_indices = np.argsort(final_scores)[::-1][:top_n]
 
-        recommendations = []
-        for idx in top_indices:
-            item_id = self.reverse_item_map[idx]
-            item_info = self.item_features.loc[item_id]
-
-            recommendations.append({
-                "item_id": item_id,
-                "title": item_info.get("title", "Unknown"),
-                "description": item_info.get("description", ""),
-                "url": item_info.get("url", ""),
-                "predicted_rating": float(final_scores[idx]),
-                "avg_rating": float(item_info.get("combined_rating", item_info.get("avg_rating", 0))),
-                "num_ratings": int(item_info.get("num_ratings", 0)),
-                "confidence": float(min(final_scores[idx] / 5.0, 1.0))
-            })
+        return self._format_recommendations(top_indices, final_scores[top_indices])
+
+    def score_users(self, user_indices, alpha: float = 0.7, context=None) -> np.ndarray:
+        """
+        Hybrid scores for a batch of user rows.
+
+        Collaborative filtering and content-based scores are computed for all rows
+        at once with sparse matrix products, so scoring hundreds of users costs a
+        handful of matrix operations instead of one Python loop per user.
+
+        Returns:
+            (len(user_indices), n_items) array of scores; already-rated items are
+            not masked.
+        """
+        user_indices = np.asarray(user_indices, dtype=np.int64)
+        matrix = self.context_matrices.get(self.encode_context(context))
+
+        cf_scores = self._collaborative_filtering_scores(user_indices, matrix)
+        cb_scores = self._content_based_scores(user_indices)
+        return alpha * cf_scores + (1 - alpha) * cb_scores
+
+    def _format_recommendations(self, item_indices: np.ndarray, scores: np.ndarray) -> List[Dict]:
+        """Build recommendation dicts for item rows and their predicted scores"""
+        return [
+            {
+                **self._item_record(idx),
+                "predicted_rating": float(score),
+                "confidence": float(min(score / 5.0, 1.0)),
+            }
+            for idx, score in zip(item_indices, scores)
+        ]
+
+    def _collaborative_filtering_scores(self, user_indices: np.ndarray, matrix: csr_matrix = None) -> np.ndarray:
+        """Compute collaborative filtering scores, optionally from a context submatrix"""
+        n_users, n_items = self.user_item_matrix.shape
+        if matrix is None:
+            # Context never observed at fit time: no neighbor evidence
+            return np.zeros((len(user_indices), n_items))
 
-        return recommendations
+        # Find similar users
+        user_similarities = self.user_similarity[user_indices].toarray()
+        rows = np.arange(len(user_indices))
+        user_similarities[rows, user_indices] = -np.inf  # exclude self
 
-    def _collaborative_filtering_scores(self, user_idx: int, rated_items: np.ndarray) -> np.ndarray:
-        """Compute collaborative filtering scores"""
-        if len(rated_items) == 0:
-            return np.zeros(self.user_item_matrix.shape[1])
+        # Top N_NEIGHBORS similar users per row
+        k = min(self.N_NEIGHBORS, n_users - 1)
+        if k <= 0:
+            return np.zeros((len(user_indices), n_items))
+        similar_users = np.argpartition(-user_similarities, k - 1, axis=1)[:, :k]
+        similarities = user_similarities[rows[:, None], similar_users]
 
-        # Find similar users
-        user_similarities = self.user_similarity[user_idx].toarray().flatten()
-        
         # Weighted average of similar users' ratings
-        similar_users = np.argsort(user_similarities)[::-1][1:51]  # Top 50 similar users (excluding self)
-        
-        scores = np.zeros(self.user_item_matrix.shape[1])
-        for similar_user in similar_users:
-            similarity = user_similarities[similar_user]
-            if similarity > 0:
-                similar_user_ratings = self.user_item_matrix[similar_user].toarray().flatten()
-                scores += similarity * similar_user_ratings
+        weights = csr_matrix(
+            (np.maximum(similarities, 0).ravel(), (np.repeat(rows, k), similar_users.ravel())),
+            shape=(len(user_indices), n_users),
+        )
+        scores = (weights @ matrix).toarray()
 
         # Normalize
-        similarity_sum = user_similarities[similar_users].sum()
-        if similarity_sum > 0:
-            scores /= similarity_sum
+        similarity_sum = similarities.sum(axis=1)
+        np.divide(scores, similarity_sum[:, None], out=scores, where=similarity_sum[:, None] > 0)
 
         return scores
 
-    def _content_based_scores(self, rated_items: np.ndarray) -> np.ndarray:
+    def _content_based_scores(self, user_indices: np.ndarray) -> np.ndarray:
         """Compute content-based scores"""
-        if len(rated_items) == 0:
-            return np.zeros(self.item_similarity.shape[0])
-
-        # Average similarity to rated items
-        scores = self.item_similarity[rated_items].mean(axis=0)
+        # Average similarity to each user's rated items
+        rated = (self.user_item_matrix[user_indices] > 0).astype(np.float64)
+        num_rated = np.asarray(rated.sum(axis=1)).ravel()
+        scores = rated @ self.item_similarity
+        scores = scores.toarray() if issparse(scores) else np.asarray(scores)
+        np.divide(scores, num_rated[:, None], out=scores, where=num_rated[:, None] > 0)
         return scores
 
-    def _get_popular_items(self, top_n: int) -> List[Dict]:
-        """Get most popular items (fallback)"""
-        popular_items = self.item_features.nlargest(top_n, "popularity_score")
+    def _get_popular_items(self, top_n: int, context_code: int = 0) -> List[Dict]:
+        """Get most popular items (fallback), ranked within a context when one is given"""
+        if context_code:
+            stats = self.context_item_stats.get(context_code)
+            if stats is None:
+                return []
+            popularity = stats[:, 0] * stats[:, 1]
+            top = [idx for idx in np.argsort(-popularity, kind="stable")[:top_n] if stats[idx, 0] > 0]
+        else:
+            top = self.popular_items[:top_n]
 
         recommendations = []
-        for item_id, item_info in popular_items.iterrows():
-            recommendations.append({
-                "item_id": item_id,
-                "title": item_info.get("title", "Unknown"),
-                "description": item_info.get("description", ""),
-                "url": item_info.get("url", ""),
-                "predicted_rating": float(item_info.get("combined_rating", item_info.get("avg_rating", 0))),
-                "avg_rating": float(item_info.get("combined_rating", item_info.get("avg_rating", 0))),
-                "num_ratings": int(item_info.get("num_ratings", 0)),
-                "confidence": 0.5
-            })
-
+        for idx in top:
+            record = self._item_record(idx)
+            recommendations.append({**record, "predicted_rating": record["avg_rating"], "confidence": 0.5})
         return recommendations
 
-    def save(self, filepath: str):
-        """Save model to disk"""
-        joblib.dump(self, filepath)
-        logger.info(f"Model saved to {filepath}")
+    def warm_up(self, n_users: int = 50) -> Dict:
+        """
+        Fault in every model array (memory-mapped loads are lazy) and run
+        predictions for a spread of users, with and without context
+        """
+        started = time.perf_counter()
+
+        arrays = [
+            self.user_item_matrix, self.user_similarity, self.item_similarity,
+            self.rating_criteria, self.popular_items, self.top_items, self.top_scores,
+            self.user_ids, self.item_ids,
+        ]
+        arrays += list(self.context_matrices.values()) + list(self.context_item_stats.values())
+        arrays += list(self.item_table.values())
+        touched = sum(touch_pages(array) for array in arrays if array is not None)
+
+        users = self.user_ids[np.linspace(0, len(self.user_ids) - 1, min(n_users, len(self.user_ids))).astype(int)]
+        for user_id in users:
+            self.predict(str(user_id))
+            self.recommend_user(str(user_id))
+        if self.context_levels:
+            name, levels = next(iter(self.context_levels.items()))
+            self.predict(str(users[0]), context={name: levels[0]})
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Warm-up: {len(users)} users in {elapsed:.2f}s")
+        return {"users": len(users), "bytes_touched": touched, "seconds": round(elapsed, 3)}
+
+    def save(self, filepath: str, profile: str = "full"):
+        """
+        Save model to disk as a directory of .npy arrays plus manifest.json
+
+        Each large array is written on its own (sparse matrices as their
+        data/indices/indptr arrays, id maps as sorted string arrays), so load()
+        can memory-map them. The manifest records the format version and the
+        shape and dtype of every array.
+
+        profile="lean" leaves out fit-only state: user_features is dropped and
+        item_features keeps only its numeric columns, downcast where exact
+        (serving reads the item output columns from item_table).
+        """
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {self.PROFILES}")
+        arrays, meta = self._to_arrays(lean=profile == "lean")
+        meta["profile"] = profile
+
+        path = Path(filepath)
+        tmp_path = path.with_name(path.name + ".tmp")
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        tmp_path.mkdir(parents=True)
+
+        manifest = {"format_version": self.FORMAT_VERSION, "meta": meta, "arrays": {}}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            np.save(tmp_path / f"{name}.npy", array, allow_pickle=False)
+            manifest["arrays"][name] = {"shape": list(array.shape), "dtype": array.dtype.str}
+
+        with open(tmp_path / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the finished directory in place
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+        tmp_path.rename(path)
+        logger.info(f"Model saved to {filepath} ({len(arrays)} arrays, {profile} profile)")
 
     @staticmethod
-    def load(filepath: str):
-        """Load model from disk"""
-        model = joblib.load(filepath)
-        logger.info(f"Model loaded from {filepath}")
+    def load(filepath: str, mmap_mode: str = None):
+        """
+        Load model from disk
+
+        Args:
+            filepath: Directory written by save() (or a legacy joblib pickle)
+            mmap_mode: Passed to np.load, e.g. "r" to memory-map every array so
+                startup is near-instant and processes share the page cache
+        """
+        path = Path(filepath)
+        if not path.is_dir():
+            import joblib
+            model = joblib.load(filepath)
+            logger.info(f"Model loaded from {filepath}")
+            return model
+
+        with open(path / "manifest.json") as f:
+            manifest = json.load(f)
+
+        version = manifest.get("format_version")
+        if version != HybridRecommender.FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported model format version {version} "
+                f"(expected {HybridRecommender.FORMAT_VERSION})"
+            )
+
+        arrays = {}
+        for name, spec in manifest["arrays"].items():
+            array = np.load(path / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+            if list(array.shape) != spec["shape"] or array.dtype.str != spec["dtype"]:
+                raise ValueError(
+                    f"Array '{name}' is {array.dtype.str}{list(array.shape)}, "
+                    f"manifest expects {spec['dtype']}{spec['shape']}"
+                )
+            arrays[name] = array
+
+        model = HybridRecommender()
+        model._from_arrays(arrays, manifest["meta"])
+        logger.info(f"Model loaded from {filepath}" + (f" (mmap_mode={mmap_mode})" if mmap_mode else ""))
         return model
+
+    def _to_arrays(self, lean: bool = False) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Flatten the model into named arrays plus JSON metadata (lean: compacted feature frames only)"""
+        arrays = {"user_ids": self.user_ids, "item_ids": self.item_ids}
+        meta = {"matrices": {}, "context_levels": self.context_levels, "frames": {}}
+
+        def put_matrix(name, matrix):
+            if issparse(matrix):
+                matrix = matrix.tocsr()
+                arrays[f"{name}.data"] = matrix.data
+                arrays[f"{name}.indices"] = matrix.indices
+                arrays[f"{name}.indptr"] = matrix.indptr
+                meta["matrices"][name] = {"sparse": True, "shape": list(matrix.shape)}
+            else:
+                arrays[name] = np.asarray(matrix)
+                meta["matrices"][name] = {"sparse": False, "shape": list(np.shape(matrix))}
+
+        put_matrix("user_item_matrix", self.user_item_matrix)
+        put_matrix("user_similarity", self.user_similarity)
+        put_matrix("item_similarity", self.item_similarity)
+
+        # Context index: one submatrix per code, item statistics stacked by code
+        context_codes = np.array(sorted(self.context_item_stats), dtype=np.int64)
+        arrays["context_codes"] = context_codes
+        if len(context_codes):
+            arrays["context_item_stats"] = np.stack([self.context_item_stats[code] for code in context_codes])
+        for code in context_codes:
+            if code != 0:
+                put_matrix(f"context_{code}", self.context_matrices[code])
+        if self.rating_criteria is not None:
+            arrays["rating_criteria"] = self.rating_criteria
+
+        # Item output columns and materialized tables
+        for name, column in self.item_table.items():
+            arrays[f"item_table.{name}"] = column
+        for name in ["popular_items", "top_items", "top_scores"]:
+            if getattr(self, name) is not None:
+                arrays[name] = getattr(self, name)
+
+        # Groups as CSR-style (ids, indptr, values) arrays
+        group_ids = np.array(sorted(self.group_members), dtype=str)
+        arrays["group_ids"] = group_ids
+        members = [self.group_members[group_id] for group_id in group_ids]
+        rated = [self.group_rated_items.get(group_id, np.empty(0, dtype=np.int32)) for group_id in group_ids]
+        arrays["group_members.indptr"] = np.cumsum([0] + [len(m) for m in members]).astype(np.int64)
+        arrays["group_members.values"] = np.array([m for group in members for m in group], dtype=str)
+        arrays["group_rated_items.indptr"] = np.cumsum([0] + [len(r) for r in rated]).astype(np.int64)
+        arrays["group_rated_items.values"] = np.concatenate(rated).astype(np.int32) if rated else np.empty(0, dtype=np.int32)
+
+        # Feature frames, column by column
+        frames = {"user_features": self.user_features, "item_features": self.item_features}
+        if lean:
+            item_features = self.item_features
+            frames = {"item_features": None if item_features is None else compact_frame(item_features.select_dtypes("number"))}
+        for frame_name, frame in frames.items():
+            if frame is None:
+                continue
+            arrays[f"{frame_name}.index"] = np.asarray(frame.index.astype(str), dtype=str)
+            columns = []
+            for i, (col, values) in enumerate(frame.items()):
+                values = np.asarray(values)
+                if values.dtype.kind not in "biuf":
+                    values = values.astype(str)
+                arrays[f"{frame_name}.{i}"] = values
+                columns.append(str(col))
+            meta["frames"][frame_name] = {"index": frame.index.name, "columns": columns}
+
+        return arrays, meta
+
+    def _from_arrays(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        """Restore model state from the arrays written by _to_arrays"""
+
+        def get_matrix(name):
+            spec = meta["matrices"][name]
+            if spec["sparse"]:
+                return csr_matrix(
+                    (arrays[f"{name}.data"], arrays[f"{name}.indices"], arrays[f"{name}.indptr"]),
+                    shape=tuple(spec["shape"]),
+                )
+            return arrays[name]
+
+        self.user_ids = arrays["user_ids"]
+        self.item_ids = arrays["item_ids"]
+        self.user_item_matrix = get_matrix("user_item_matrix")
+        self.user_similarity = get_matrix("user_similarity")
+        self.item_similarity = get_matrix("item_similarity")
+
+        self.context_levels = meta["context_levels"]
+        self.context_matrices = {0: self.user_item_matrix}
+        self.context_item_stats = {}
+        for i, code in enumerate(arrays["context_codes"].tolist()):
+            self.context_item_stats[code] = arrays["context_item_stats"][i]
+            if code != 0:
+                self.context_matrices[code] = get_matrix(f"context_{code}")
+        self.rating_criteria = arrays.get("rating_criteria")
+
+        prefix = "item_table."
+        self.item_table = {name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)}
+        self.popular_items = arrays.get("popular_items")
+        self.materialized = (arrays["top_items"], arrays["top_scores"]) if "top_items" in arrays else None
+
+        group_ids = arrays["group_ids"].tolist()
+        indptr, values = arrays["group_members.indptr"], arrays["group_members.values"]
+        self.group_members = {
+            group_id: values[indptr[i]:indptr[i + 1]].tolist() for i, group_id in enumerate(group_ids)
+        }
+        indptr, values = arrays["group_rated_items.indptr"], arrays["group_rated_items.values"]
+        self.group_rated_items = {
+            group_id: values[indptr[i]:indptr[i + 1]] for i, group_id in enumerate(group_ids)
+        }
+
+        for frame_name, spec in meta["frames"].items():
+            frame = pd.DataFrame(
+                {col: arrays[f"{frame_name}.{i}"] for i, col in enumerate(spec["columns"])},
+                index=pd.Index(arrays[f"{frame_name}.index"], name=spec["index"]),
+            )
+            setattr(self, frame_name, frame)
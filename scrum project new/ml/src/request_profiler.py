@@ -0,0 +1,184 @@
+"""
+Request Profiling - Opt-in per-request profiles written to a rotating directory
+"""
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval (collapsed-stack counts)"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.counts
+
+
+class RequestProfiler:
+    """
+    Runs selected requests under a profiler and stores the result:
+    - mode "cprofile": deterministic profile, saved as a pstats .prof file
+    - mode "sample": statistical stack sampling of the request thread, saved in
+      collapsed-stack format (.folded, readable by flamegraph tools)
+
+    Each profile gets a JSON sidecar with the request tags, duration and (for
+    cProfile) the top functions by cumulative time. Only the newest max_profiles
+    are kept. Work handed to other threads (e.g. the micro-batcher) is not seen.
+    """
+
+    MODES = ("cprofile", "sample")
+
+    def __init__(self, directory: str, sample_rate: float = 0.0, mode: str = "cprofile", max_profiles: int = 50, sample_interval_ms: float = 1.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {list(self.MODES)}")
+
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.max_profiles = max_profiles
+        self.sample_interval = sample_interval_ms / 1000.0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def should_profile(self, forced: bool = False) -> bool:
+        """Profile this request? (explicitly requested, or picked by the sample rate)"""
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def run(self, fn: Callable[[], Any], tags: Dict, mode: str = None) -> Tuple[Any, str]:
+        """
+        Call fn under the profiler and store the profile
+
+        Returns:
+            (fn's result, profile name)
+        """
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {list(self.MODES)}")
+
+        started = time.perf_counter()
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            try:
+                result = profiler.runcall(fn)
+            finally:
+                duration = time.perf_counter() - started
+        else:
+            sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            try:
+                result = fn()
+            finally:
+                duration = time.perf_counter() - started
+                counts = sampler.stop()
+
+        name = self._next_name(tags.get("endpoint", "request"))
+        meta = {
+            "name": name,
+            "mode": mode,
+            "created": datetime.now().isoformat(timespec="milliseconds"),
+            "duration_ms": round(duration * 1000, 3),
+            "tags": tags,
+        }
+
+        try:
+            if mode == "cprofile":
+                profiler.dump_stats(str(self.directory / f"{name}.prof"))
+                meta["file"] = f"{name}.prof"
+                meta["top"] = self._top_functions(profiler)
+            else:
+                with open(self.directory / f"{name}.folded", "w") as f:
+                    for stack, count in counts.most_common():
+                        f.write(f"{stack} {count}\n")
+                meta["file"] = f"{name}.folded"
+                meta["samples"] = sum(counts.values())
+
+            with open(self.directory / f"{name}.json", "w") as f:
+                json.dump(meta, f, indent=2, default=str)
+            self._rotate()
+            logger.info(f"Profile {name} written ({meta['duration_ms']:.1f}ms, {mode})")
+        except OSError as e:
+            logger.error(f"Could not write profile {name}: {e}")
+
+        return result, name
+
+    def _next_name(self, endpoint: str) -> str:
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return f"{stamp}-{os.getpid()}-{counter}-{endpoint}"
+
+    @staticmethod
+    def _top_functions(profiler: cProfile.Profile, limit: int = 15) -> List[Dict]:
+        """Top functions by cumulative time"""
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                "function": f"{function} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            })
+        rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+        return rows[:limit]
+
+    def _rotate(self):
+        """Delete the oldest profiles beyond max_profiles"""
+        sidecars = sorted(self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for sidecar in sidecars[: max(0, len(sidecars) - self.max_profiles)]:
+            for path in self.directory.glob(sidecar.stem + ".*"):
+                path.unlink(missing_ok=True)
+
+    def list_profiles(self) -> List[Dict]:
+        """Stored profiles' metadata, newest first"""
+        profiles = []
+        for sidecar in self.directory.glob("*.json"):
+            try:
+                with open(sidecar) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        profiles.sort(key=lambda meta: meta.get("created", ""), reverse=True)
+        return profiles
+
+    def profile_path(self, name: str) -> Path:
+        """Path of a stored profile file; FileNotFoundError for unknown names"""
+        for meta in self.list_profiles():
+            if meta["name"] == name:
+                return self.directory / meta["file"]
+        raise FileNotFoundError(name)
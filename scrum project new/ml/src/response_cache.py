@@ -0,0 +1,113 @@
+"""
+Response Cache - In-process LRU + TTL cache for serialized API responses
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and entry/byte caps.
+
+    Keys should embed the model version (see make_key) so that entries written
+    by an older model are simply never looked up again after a reload and age
+    out through LRU eviction or TTL.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def make_key(model_version: str, **fields) -> str:
+        """Canonical cache key for a model version and normalized request fields"""
+        return json.dumps([model_version, fields], sort_keys=True, separators=(",", ":"))
+
+    @staticmethod
+    def make_etag(*parts: str) -> str:
+        """Short strong validator derived from the cache key (and anything else in the body)"""
+        return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:20]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: str, value: Any, size: int):
+        """Store value (of approximately `size` bytes), evicting LRU entries as needed"""
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit rate, size and eviction counters"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
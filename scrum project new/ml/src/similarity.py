@@ -0,0 +1,158 @@
+"""
+Similarity - Blockwise all-pairs cosine similarity with top-k / threshold pruning
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+import os
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(X):
+    """L2-normalized float64 copy of X (sparse or dense); all-zero rows stay zero"""
+    if issparse(X):
+        X = csr_matrix(X, dtype=np.float64, copy=True)
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        norms[norms == 0.0] = 1.0
+        X.data /= np.repeat(norms, np.diff(X.indptr))
+        return X
+
+    X = np.array(X, dtype=np.float64)
+    norms = np.sqrt(np.einsum("ij,ij->i", X, X))
+    norms[norms == 0.0] = 1.0
+    X /= norms[:, None]
+    return X
+
+
+def block_rows_for_budget(n_columns: int, memory_budget_mb: float, n_jobs: int) -> int:
+    """
+    Rows per block so that the dense blocks being scored at the same time fit the
+    budget (each block holds its similarities plus the top-k partition indices)
+    """
+    bytes_per_row = max(1, n_columns) * 8 * 2
+    return max(1, int(memory_budget_mb * 1024 * 1024 // (bytes_per_row * n_jobs)))
+
+
+def _prune_block(block: np.ndarray, row_ids: np.ndarray, top_k: int = None, threshold: float = None,
+                 exclude_self: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Entries kept from a dense block of similarities (modified in place)
+
+    Returns:
+        (entries per row, column indices, values), column indices sorted within rows
+    """
+    n_columns = block.shape[1]
+    rows = np.arange(block.shape[0])
+    if exclude_self:
+        block[rows, row_ids] = 0.0
+
+    if threshold is not None:
+        block[block < threshold] = 0.0
+
+    if top_k is not None and top_k < n_columns:
+        # Partition the negated block in place: no full-size temporaries, and
+        # the selected columns are sorted before the values are gathered
+        np.negative(block, out=block)
+        top = np.argpartition(block, top_k - 1, axis=1)[:, :top_k]
+        top.sort(axis=1)
+        values = -np.take_along_axis(block, top, axis=1)
+        keep = values != 0.0
+        return keep.sum(axis=1), top[keep].astype(np.int32), values[keep]
+
+    row_idx, columns = np.nonzero(block)
+    counts = np.bincount(row_idx, minlength=block.shape[0])
+    return counts, columns.astype(np.int32), block[row_idx, columns]
+
+
+def _to_csr(counts, indices, data, shape: Tuple[int, int]) -> csr_matrix:
+    """CSR matrix from per-block (counts, indices, data) lists, in row order"""
+    indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+    if shape[0]:
+        np.cumsum(np.concatenate(counts), out=indptr[1:])
+    return csr_matrix(
+        (np.concatenate(data) if data else np.zeros(0), np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32), indptr),
+        shape=shape,
+    )
+
+
+def all_pairs_similarity(X, top_k: int = None, threshold: float = None, exclude_self: bool = False,
+                         memory_budget_mb: float = 256, n_jobs: int = None) -> csr_matrix:
+    """
+    Cosine similarity between all rows of X, computed block of rows by block of
+    rows in a thread pool. Per row only the top_k largest and/or the entries
+    >= threshold are kept (both None keeps every non-zero entry; zeros are never
+    stored, so a row can hold fewer than top_k entries), and the kept
+    entries of each block are appended to the output CSR as soon as the block is
+    done. Peak memory is the budget for the dense blocks in flight plus the
+    output, instead of a full n x n result.
+
+    Args:
+        X: Rows to compare (scipy sparse or dense array)
+        top_k: Keep at most this many entries per row (ties broken arbitrarily)
+        threshold: Keep only entries >= threshold
+        exclude_self: Drop the diagonal
+        memory_budget_mb: Budget for the dense similarity blocks in flight
+        n_jobs: Worker threads (None = all cores)
+
+    Returns:
+        n x n CSR matrix with sorted column indices
+    """
+    n_rows = X.shape[0]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if top_k is not None and top_k <= 0:
+        return csr_matrix((n_rows, n_rows), dtype=np.float64)
+
+    X = normalize_rows(X)
+    Xt = csr_matrix(X.T) if issparse(X) else np.ascontiguousarray(X.T)
+    block_rows = block_rows_for_budget(n_rows, memory_budget_mb, n_jobs)
+
+    def score_block(start: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        stop = min(start + block_rows, n_rows)
+        block = X[start:stop] @ Xt
+        block = block.toarray() if issparse(block) else np.asarray(block)
+        return _prune_block(block, np.arange(start, stop), top_k, threshold, exclude_self)
+
+    # NumPy/SciPy products release the GIL, so the blocks are scored in parallel.
+    # Each block's kept entries are appended in row order as it completes.
+    counts, indices, data = [], [], []
+    starts = range(0, n_rows, block_rows)
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        for block_counts, block_indices, block_data in executor.map(score_block, starts):
+            counts.append(block_counts)
+            indices.append(block_indices)
+            data.append(block_data)
+
+    similarity = _to_csr(counts, indices, data, (n_rows, n_rows))
+    logger.info(f"Similarity: {n_rows} rows, {similarity.nnz} entries kept ({len(starts)} blocks of {block_rows}, {n_jobs} threads)")
+    return similarity
+
+
+def similarity_rows(X, rows, top_k: int = None, threshold: float = None, exclude_self: bool = False,
+                    memory_budget_mb: float = 256) -> csr_matrix:
+    """
+    The given rows of all_pairs_similarity(X, ...), computed without the others:
+    (len(rows), n) CSR, pruned the same way. Used to refresh the neighbor rows
+    of the few users whose ratings changed.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    n_rows = X.shape[0]
+    if top_k is not None and top_k <= 0:
+        return csr_matrix((len(rows), n_rows), dtype=np.float64)
+
+    X = normalize_rows(X)
+    Xt = csr_matrix(X.T) if issparse(X) else np.ascontiguousarray(X.T)
+    block_rows = block_rows_for_budget(n_rows, memory_budget_mb, 1)
+
+    counts, indices, data = [], [], []
+    for start in range(0, len(rows), block_rows):
+        block_ids = rows[start:start + block_rows]
+        block = X[block_ids] @ Xt
+        block = block.toarray() if issparse(block) else np.asarray(block)
+        block_counts, block_indices, block_data = _prune_block(block, block_ids, top_k, threshold, exclude_self)
+        counts.append(block_counts)
+        indices.append(block_indices)
+        data.append(block_data)
+    return _to_csr(counts, indices, data, (len(rows), n_rows))
@@ -0,0 +1,235 @@
+"""
+Sweep - Parallel hyperparameter search for the hybrid recommender over one shared precomputed model
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+from typing import Dict, List
+import copy
+import json
+import math
+import os
+import random
+import time
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+import logging
+
+from evaluator import ModelEvaluator
+from recommender_model import HybridRecommender
+
+logger = logging.getLogger(__name__)
+
+# Tunable parameters and their current defaults
+PARAMETERS = {
+    "alpha": 0.7,
+    "n_neighbors": HybridRecommender.N_NEIGHBORS,
+    "item_neighbors": HybridRecommender.ITEM_NEIGHBORS,
+}
+
+# Per-process state set by the pool initializer
+_worker_state = None
+
+
+def grid_trials(space: Dict) -> List[Dict]:
+    """Every combination of a grid: parameter -> list of values (or one fixed value)"""
+    _check_space(space)
+    names = sorted(space)
+    values = [space[name] if isinstance(space[name], list) else [space[name]] for name in names]
+    if any(isinstance(value, dict) for options in values for value in options):
+        raise ValueError("Ranges ({'low', 'high'}) need a random search (--trials)")
+    return [dict(zip(names, combination)) for combination in product(*values)]
+
+
+def random_trials(space: Dict, n_trials: int, seed: int = 0) -> List[Dict]:
+    """
+    n_trials distinct random draws from a search space
+
+    Values are a list (uniform choice), a fixed value, or a range
+    {"low", "high", "log": false}: integers if both bounds are, log-uniform
+    with "log": true.
+    """
+    _check_space(space)
+    rng = random.Random(seed)
+
+    def draw(spec):
+        if isinstance(spec, list):
+            return rng.choice(spec)
+        if not isinstance(spec, dict):
+            return spec
+        low, high = spec["low"], spec["high"]
+        if spec.get("log"):
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        if isinstance(low, int) and isinstance(high, int):
+            return min(max(int(round(value)), low), high)
+        return round(value, 4)
+
+    trials, seen = [], set()
+    for _ in range(n_trials * 20):
+        trial = {name: draw(spec) for name, spec in sorted(space.items())}
+        key = json.dumps(trial, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            trials.append(trial)
+            if len(trials) == n_trials:
+                break
+    return trials
+
+
+def _check_space(space: Dict):
+    unknown = set(space) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters {sorted(unknown)}, expected some of {sorted(PARAMETERS)}")
+
+
+def prune_rows(matrix: csr_matrix, top_k: int) -> csr_matrix:
+    """Keep the top_k largest stored entries of each row (column indices stay sorted)"""
+    matrix = csr_matrix(matrix)
+    counts = np.diff(matrix.indptr)
+    if top_k is None or counts.max(initial=0) <= top_k:
+        return matrix
+
+    rows = np.repeat(np.arange(matrix.shape[0]), counts)
+    order = np.lexsort((-matrix.data, rows))
+    rank = np.arange(matrix.nnz) - matrix.indptr[rows[order]]
+    kept = np.sort(order[rank < top_k])
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.minimum(counts, top_k), out=indptr[1:])
+    return csr_matrix((matrix.data[kept], matrix.indices[kept], indptr), shape=matrix.shape)
+
+
+def _init_worker(base_path: str, test_path: str, top_n: int):
+    global _worker_state
+    # Memory-mapped: every worker reads the same page-cache copy of the base model
+    _worker_state = {
+        "model": HybridRecommender.load(base_path, mmap_mode="r"),
+        "test": pd.read_pickle(test_path),
+        "top_n": top_n,
+        "item_graphs": {},
+    }
+
+
+def _run_trial(params: Dict) -> Dict:
+    """Evaluate one parameter set against the shared base model"""
+    started = time.perf_counter()
+    base = _worker_state["model"]
+    params = {**PARAMETERS, **params}
+
+    # A shallow copy shares every array; only the parameters of the trial differ.
+    # The base graph holds the most neighbors any trial asks for, and scoring
+    # takes the top n_neighbors of it: the graph fit() would build, up to which
+    # of several equally similar neighbors is kept.
+    model = copy.copy(base)
+    model.N_NEIGHBORS = int(params["n_neighbors"])
+    item_neighbors = params["item_neighbors"]
+    if item_neighbors is not None:
+        graphs = _worker_state["item_graphs"]
+        if item_neighbors not in graphs:
+            graphs[item_neighbors] = prune_rows(base.item_similarity, int(item_neighbors))
+        model.item_similarity = graphs[item_neighbors]
+
+    metrics = ModelEvaluator.evaluate_model_batch(
+        model, _worker_state["test"], alpha=float(params["alpha"]), top_n=_worker_state["top_n"],
+    )
+    return {**params, **metrics, "seconds": round(time.perf_counter() - started, 3)}
+
+
+class SweepRunner:
+    """
+    Runs hyperparameter trials of the hybrid recommender in a process pool
+
+    The expensive work is done once per sweep: the data is cleaned and split by
+    the caller, and one base model is fitted with the largest neighbor count of
+    the sweep and saved as a directory of .npy arrays. Every worker memory-maps
+    it, so the similarity graphs and matrices are shared through the page cache
+    instead of being copied per process. A trial then only re-scores the test
+    users with its own alpha, neighbor count and pruned item graph.
+    """
+
+    def __init__(self, workdir: str, n_jobs: int = None, top_n: int = 100):
+        """
+        Args:
+            workdir: Directory for the shared base model and test ratings
+            n_jobs: Worker processes (None = all cores)
+            top_n: Recommendation depth a test rating must reach to count, as in evaluate_model
+        """
+        self.workdir = Path(workdir)
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.top_n = top_n
+        self.base_path = self.workdir / "base_model"
+        self.test_path = self.workdir / "test_ratings.pkl"
+        self.prepare_seconds = 0.0
+
+    def prepare(self, train_ratings: pd.DataFrame, test_ratings: pd.DataFrame,
+                user_features: pd.DataFrame, item_features: pd.DataFrame, trials: List[Dict]):
+        """Fit and save the shared base model for a set of trials"""
+        started = time.perf_counter()
+        self.workdir.mkdir(parents=True, exist_ok=True)
+
+        base = HybridRecommender()
+        base.N_NEIGHBORS = max(int(trial.get("n_neighbors", PARAMETERS["n_neighbors"])) for trial in trials)
+        item_neighbors = [trial.get("item_neighbors", PARAMETERS["item_neighbors"]) for trial in trials]
+        base.ITEM_NEIGHBORS = None if None in item_neighbors else max(int(k) for k in item_neighbors)
+        base.fit(train_ratings, user_features, item_features, n_jobs=self.n_jobs)
+        base.save(str(self.base_path))
+        test_ratings.to_pickle(self.test_path)
+
+        self.prepare_seconds = time.perf_counter() - started
+        logger.info(f"Shared base model ({base.N_NEIGHBORS} neighbors) ready in {self.prepare_seconds:.1f}s")
+
+    def run(self, trials: List[Dict]) -> pd.DataFrame:
+        """Evaluate every trial; returns the leaderboard, best first"""
+        started = time.perf_counter()
+        initargs = (str(self.base_path), str(self.test_path), self.top_n)
+        results = []
+
+        if self.n_jobs == 1:
+            _init_worker(*initargs)
+            for trial in trials:
+                results.append(_run_trial(trial))
+                self._log_progress(results, len(trials))
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker, initargs=initargs) as executor:
+                futures = [executor.submit(_run_trial, trial) for trial in trials]
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    self._log_progress(results, len(trials))
+
+        logger.info(f"{len(trials)} trials in {time.perf_counter() - started:.1f}s ({self.n_jobs} workers)")
+        return self.leaderboard(results)
+
+    @staticmethod
+    def _log_progress(results: List[Dict], total: int):
+        if len(results) % max(1, total // 10) == 0 or len(results) == total:
+            best = min(results, key=lambda result: result["rmse"])
+            logger.info(f"Trial {len(results)}/{total}: best RMSE so far {best['rmse']:.4f}")
+
+    @staticmethod
+    def leaderboard(results: List[Dict]) -> pd.DataFrame:
+        """Trials ranked by RMSE, then MAE; trials without predictions go last"""
+        frame = pd.DataFrame(results)
+        for name in ("n_neighbors", "item_neighbors"):
+            frame[name] = frame[name].astype("Int64")  # None stays missing instead of turning ints into floats
+        frame["_unranked"] = frame["num_predictions"] == 0
+        frame = frame.sort_values(["_unranked", "rmse", "mae"], kind="stable").drop(columns="_unranked")
+        frame.insert(0, "rank", np.arange(1, len(frame) + 1))
+        return frame.reset_index(drop=True)
+
+    def write_leaderboard(self, leaderboard: pd.DataFrame, output_dir: str):
+        """leaderboard.csv plus leaderboard.json (trials and the best parameters)"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        leaderboard.to_csv(output_dir / "leaderboard.csv", index=False)
+
+        records = json.loads(leaderboard.to_json(orient="records"))
+        with open(output_dir / "leaderboard.json", "w") as f:
+            json.dump({
+                "best": {name: records[0][name] for name in PARAMETERS} if records else None,
+                "trials": records,
+                "prepare_seconds": round(self.prepare_seconds, 2),
+                "n_jobs": self.n_jobs,
+            }, f, indent=2)
+        logger.info(f"Leaderboard saved to {output_dir}")
@@ -0,0 +1,156 @@
+"""
+TF-IDF Runtime - Inference-only TF-IDF transform with NumPy/SciPy
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing import Dict, List, Tuple
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TfidfRuntime:
+    """
+    Reproduces TfidfVectorizer.transform for word analyzers:
+    - lowercasing, token_pattern tokenization and stop-word removal
+    - word n-grams over the remaining tokens, counted against the fitted vocabulary
+    - optional sublinear tf, idf weighting and l1/l2 row normalization
+
+    Exported once from a fitted vectorizer (from_vectorizer / settings / arrays),
+    it can be rebuilt at serve time without importing scikit-learn.
+    """
+
+    def __init__(self, vocabulary: List[str], idf: np.ndarray, stop_words: List[str] = None,
+                 ngram_range: Tuple[int, int] = (1, 1), token_pattern: str = r"(?u)\b\w\w+\b",
+                 lowercase: bool = True, norm: str = "l2", sublinear_tf: bool = False):
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        self.idf = None if idf is None else np.asarray(idf, dtype=np.float64)
+        self.stop_words = frozenset(stop_words or ())
+        self.ngram_range = tuple(ngram_range)
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+
+        self._tokenize = re.compile(token_pattern).findall
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer) -> "TfidfRuntime":
+        """Runtime equivalent of a fitted word-level TfidfVectorizer"""
+        if vectorizer.analyzer != "word" or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+            raise ValueError("Only the built-in word analyzer can be exported")
+        if vectorizer.strip_accents is not None:
+            raise ValueError("strip_accents is not supported by the runtime")
+        if re.compile(vectorizer.token_pattern).groups > 1:
+            raise ValueError("token_pattern must have at most one capturing group")
+
+        vocabulary = [None] * len(vectorizer.vocabulary_)
+        for term, i in vectorizer.vocabulary_.items():
+            vocabulary[i] = term
+        stop_words = vectorizer.get_stop_words()
+
+        return cls(
+            vocabulary=vocabulary,
+            idf=vectorizer.idf_ if vectorizer.use_idf else None,
+            stop_words=sorted(stop_words) if stop_words else None,
+            ngram_range=vectorizer.ngram_range,
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            norm=vectorizer.norm,
+            sublinear_tf=vectorizer.sublinear_tf,
+        )
+
+    def settings(self) -> Dict:
+        """JSON-serializable tokenizer and weighting settings"""
+        return {
+            "stop_words": sorted(self.stop_words),
+            "ngram_range": list(self.ngram_range),
+            "token_pattern": self.token_pattern,
+            "lowercase": self.lowercase,
+            "norm": self.norm,
+            "sublinear_tf": self.sublinear_tf,
+        }
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Vocabulary (terms in column order) and idf weights"""
+        terms = np.empty(len(self.vocabulary), dtype=object)
+        for term, i in self.vocabulary.items():
+            terms[i] = term
+        arrays = {"vocabulary": np.asarray(terms.tolist(), dtype=str)}
+        if self.idf is not None:
+            arrays["idf"] = self.idf
+        return arrays
+
+    @classmethod
+    def from_export(cls, settings: Dict, arrays: Dict[str, np.ndarray]) -> "TfidfRuntime":
+        """Rebuild from settings() and arrays()"""
+        return cls(vocabulary=arrays["vocabulary"].tolist(), idf=arrays.get("idf"), **settings)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.vocabulary)
+
+    def analyze(self, doc: str) -> List[str]:
+        """Tokens and word n-grams of a document, as the vectorizer's analyzer produces them"""
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = [token for token in self._tokenize(doc) if token not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            terms.extend(" ".join(tokens[i: i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def transform(self, docs: List[str]) -> csr_matrix:
+        """Tf-idf weighted, normalized document-term matrix"""
+        vocabulary = self.vocabulary
+        indices = []
+        data = []
+        indptr = [0]
+        for doc in docs:
+            counts = {}
+            for term in self.analyze(doc):
+                column = vocabulary.get(term)
+                if column is not None:
+                    counts[column] = counts.get(column, 0) + 1
+            columns = sorted(counts)
+            indices.extend(columns)
+            data.extend(counts[column] for column in columns)
+            indptr.append(len(indices))
+
+        X = csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(docs), self.n_features),
+        )
+
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if self.idf is not None:
+            X.data *= self.idf[X.indices]
+        if self.norm is not None:
+            self._normalize(X)
+        return X
+
+    def _normalize(self, X: csr_matrix):
+        """In-place row normalization, accumulating in the same order as scikit-learn"""
+        row_lengths = np.diff(X.indptr)
+        rows = np.repeat(np.arange(X.shape[0]), row_lengths)
+        if self.norm == "l2":
+            values = X.data * X.data
+        elif self.norm == "l1":
+            values = np.abs(X.data)
+        else:
+            raise ValueError(f"Unsupported norm '{self.norm}'")
+
+        norms = np.zeros(X.shape[0])
+        np.add.at(norms, rows, values)
+        if self.norm == "l2":
+            norms = np.sqrt(norms)
+        norms[norms == 0.0] = 1.0
+        X.data /= norms[rows]
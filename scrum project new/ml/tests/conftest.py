@@ -0,0 +1,116 @@
+"""
+Shared fixtures for the ML tests: small synthetic catalogs and ratings, and
+the Flask API serving a model fitted on them
+
+Run from the ml directory with `python -m pytest -q tests`.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ML_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ML_DIR))
+sys.path.insert(0, str(ML_DIR / "src"))
+sys.path.insert(0, str(ML_DIR / "benchmarks"))
+
+from synthetic import generate_catalog, generate_itm_rec, generate_profiles
+
+
+@pytest.fixture(scope="session")
+def ratings() -> pd.DataFrame:
+    """Ratings of users with 1 to 40 ratings each, interleaved as in a rating log"""
+    rng = np.random.default_rng(7)
+    sizes = rng.integers(1, 41, size=400)
+    users = np.repeat(np.arange(len(sizes)), sizes)
+    frame = pd.DataFrame({
+        "user_id": (users + 1000).astype(str),
+        "item_id": rng.integers(1, 200, size=len(users)).astype(str),
+        "rating": rng.integers(1, 6, size=len(users)).astype(float),
+    })
+    return frame.sample(frac=1, random_state=3).reset_index(drop=True)
+
+
+@pytest.fixture(scope="session")
+def itm_rec():
+    """(users, items, ratings) in the ITM-Rec layout"""
+    return generate_itm_rec(300, 120, ratings_per_user=15, seed=5)
+
+
+@pytest.fixture(scope="session")
+def groups(itm_rec) -> pd.DataFrame:
+    """Twenty project groups of three consecutive users"""
+    users, _, _ = itm_rec
+    return pd.DataFrame({
+        "group_id": np.repeat(np.arange(1, 21), 3).astype(str),
+        "user_id": users["user_id"].values[:60],
+    })
+
+
+@pytest.fixture(scope="session")
+def group_ratings() -> pd.DataFrame:
+    return pd.DataFrame({"group_id": ["1", "1", "2"], "item_id": ["1", "2", "3"]})
+
+
+@pytest.fixture(scope="session")
+def catalog() -> pd.DataFrame:
+    return generate_catalog(600, seed=11)
+
+
+@pytest.fixture(scope="session")
+def profiles() -> list:
+    return generate_profiles(40, seed=13).to_dict("records")
+
+
+@pytest.fixture(scope="session")
+def professional_model(catalog, tmp_path_factory) -> Path:
+    """Pickled AdvancedRecommender fitted on the synthetic catalog"""
+    from advanced_recommender import AdvancedRecommender
+
+    path = tmp_path_factory.mktemp("professional") / "professional_recommender.pkl"
+    recommender = AdvancedRecommender()
+    recommender.fit(catalog)
+    recommender.save(str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def hybrid_model(itm_rec, groups, group_ratings, tmp_path_factory) -> Path:
+    """Saved HybridRecommender fitted on itm_rec, with groups and a materialized top-N"""
+    from feature_engineer import FeatureEngineer
+    from recommender_model import HybridRecommender
+
+    users, items, ratings = itm_rec
+    model = HybridRecommender()
+    model.fit(
+        ratings,
+        FeatureEngineer.create_user_features(users, ratings),
+        FeatureEngineer.create_item_features(items, ratings),
+        n_jobs=1,
+    )
+    model.set_groups(groups, group_ratings)
+    model.materialize(top_n=20)
+    path = tmp_path_factory.mktemp("hybrid") / "recommender_model"
+    model.save(str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def api(professional_model, hybrid_model):
+    """The predict_api module, serving professional_model and hybrid_model, and ready"""
+    import predict_api
+
+    predict_api.MODEL_PATH = professional_model
+    predict_api.RUNTIME_MODEL_PATH = professional_model.with_name("professional_runtime")
+    predict_api.HYBRID_MODEL_PATH = hybrid_model
+    assert predict_api.load_model()
+    assert predict_api.load_hybrid_model()
+    predict_api.ready.set()
+    return predict_api
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def admin_token(api, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    return "secret"
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}])
+def test_reload_requires_the_admin_token(api, client, admin_token, headers):
+    loaded, version = api.model, api.model_version
+
+    response = client.post("/admin/reload", headers=headers)
+
+    assert response.status_code == 403
+    assert api.model is loaded and api.model_version == version
+    assert client.get("/ready").status_code == 200
+
+
+def test_reload_is_disabled_without_a_configured_token(api, client):
+    assert not api.ADMIN_TOKEN
+    assert client.post("/admin/reload", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_reload_warms_up_in_the_background(api, client, admin_token, monkeypatch):
+    release, done = threading.Event(), threading.Event()
+
+    def warm_up():
+        release.wait(10)
+        done.set()
+
+    monkeypatch.setattr(api, "warm_up", warm_up)
+
+    response = client.post("/admin/reload", headers={"X-Admin-Token": admin_token})
+
+    assert response.status_code == 202
+    assert response.get_json()["model_version"] == api.model_version
+    assert not done.is_set()
+    release.set()
+    assert done.wait(10)
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+def test_admits_up_to_max_in_flight_without_waiting():
+    controller = AdmissionController(max_in_flight=2, max_queue=0)
+
+    assert controller.acquire(1.0) == 0.0
+    assert controller.acquire(1.0) == 0.0
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire(1.0)
+
+    assert rejected.value.reason == "queue_full"
+    assert controller.stats()["rejected"]["queue_full"] == 1
+
+
+def test_rejects_when_the_estimated_wait_exceeds_the_deadline():
+    controller = AdmissionController(max_in_flight=1, max_queue=4)
+    controller.acquire(1.0)
+    controller.release(0.5)
+    controller.acquire(1.0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire(0.1)
+
+    assert rejected.value.reason == "deadline"
+    assert rejected.value.retry_after == pytest.approx(0.5)
+
+
+def test_gives_up_when_the_deadline_passes_while_queued():
+    controller = AdmissionController(max_in_flight=1, max_queue=4)
+    controller.acquire(1.0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire(0.05)
+
+    assert rejected.value.reason == "timeout"
+    assert controller.stats()["queued"] == 0
+
+
+def test_release_hands_the_slot_to_the_oldest_waiter():
+    controller = AdmissionController(max_in_flight=1, max_queue=4)
+    controller.acquire(1.0)
+    waited = []
+    waiter = threading.Thread(target=lambda: waited.append(controller.acquire(5.0)))
+    waiter.start()
+    while controller.stats()["queued"] == 0:
+        pass
+
+    controller.release(0.01)
+    waiter.join(5.0)
+
+    assert len(waited) == 1
+    assert controller.stats()["in_flight"] == 1
+
+
+def test_shed_requests_get_503_with_retry_after(api, client, monkeypatch):
+    full = AdmissionController(max_in_flight=1, max_queue=0)
+    full.acquire(1.0)
+    monkeypatch.setattr(api, "admission", full)
+
+    response = client.post("/recommend", json={"major": "Computer Science"})
+
+    assert response.status_code == 503
+    assert response.get_json()["reason"] == "queue_full"
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.parametrize("top_n", [0, -3])
+@pytest.mark.parametrize("request_args", [
+    ("post", "/recommend", {"major": "Computer Science"}),
+    ("post", "/recommend", {"major": "Computer Science", "stream": True}),
+    ("get", "/items/popular", {}),
+    ("get", "/search", {"q": "data"}),
+])
+def test_non_positive_top_n_is_rejected(client, request_args, top_n):
+    method, path, args = request_args
+    if method == "post":
+        response = client.post(path, json={**args, "top_n": top_n})
+    else:
+        response = client.get(path, query_string={**args, "top_n": top_n})
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "top_n must be a positive integer"
+
+
+def test_autocomplete_limit_is_validated_and_capped(api, client, monkeypatch):
+    monkeypatch.setattr(api, "MAX_TOP_N", 3)
+    first_letters = [str(title)[0].lower() for title in api.model._columns["title"]]
+    prefix = max(set(first_letters), key=first_letters.count)
+    assert client.get("/search/autocomplete", query_string={"q": prefix, "limit": 0}).status_code == 400
+
+    response = client.get("/search/autocomplete", query_string={"q": prefix, "limit": 1000})
+
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 3
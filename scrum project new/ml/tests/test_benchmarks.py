@@ -0,0 +1,83 @@
+import itertools
+
+import pandas as pd
+
+import run_benchmarks
+from run_benchmarks import best_of, compare, flatten, measure_latency, significant_change
+from synthetic import generate_catalog, generate_itm_rec, generate_profiles
+
+
+def run(results: dict) -> dict:
+    return {"results": results}
+
+
+def test_flatten_keeps_numeric_leaves():
+    assert flatten({"a": {"1000": {"p95_ms": 2.0, "ok": True, "name": "x"}}, "fit_s": 1}) == {
+        "a.1000.p95_ms": 2.0,
+        "fit_s": 1,
+    }
+
+
+def test_significant_change_uses_the_unit_floor():
+    assert not significant_change("recommend.p95_ms", 1.5, 1.0)
+    assert significant_change("recommend.p95_ms", 2.0, 1.0)
+    assert not significant_change("fit_s", 0.3, 0.1)
+    assert significant_change("fit_s", 0.4, 0.1)
+    assert not significant_change("model_mb", 10.5, 10.0)
+
+
+def test_throughput_is_judged_by_its_time_per_call():
+    # 10000 -> 5000 qps is 0.1ms per call: below the 1ms floor
+    assert not significant_change("recommend.throughput_qps", 5000, 10000)
+    # 100 -> 50 qps is 10ms per call
+    assert significant_change("recommend.throughput_qps", 50, 100)
+
+
+def test_compare_flags_only_worse_metrics_above_tolerance_and_floor():
+    baseline = run({"fit_s": 10.0, "p95_ms": 10.0, "throughput_qps": 100.0, "load_s": 0.1, "calls": 100})
+    current = run({"fit_s": 13.0, "p95_ms": 10.5, "throughput_qps": 200.0, "load_s": 0.2, "calls": 1000})
+
+    assert compare(current, baseline, tolerance=0.1) == [
+        {"metric": "fit_s", "baseline": 10.0, "current": 13.0, "change": 0.3},
+    ]
+    assert compare(current, baseline, tolerance=0.5) == []
+
+
+def test_compare_skips_uncompared_metrics():
+    baseline = run({"predict_rss_mb": 1.0, "generate_s": 1.0})
+    current = run({"predict_rss_mb": 100.0, "generate_s": 100.0})
+
+    assert compare(current, baseline, tolerance=0.0) == []
+
+
+def test_best_of_returns_the_first_result_and_the_fastest_time(monkeypatch):
+    calls = itertools.count()
+    timings = iter([(0, 3.0, 5.0), (1, 1.0, 0.0), (2, 2.0, 0.0)])
+    monkeypatch.setattr(run_benchmarks, "timed", lambda fn: next(timings))
+
+    assert best_of(3, lambda: next(calls)) == (0, 1.0, 5.0)
+
+
+def test_measure_latency_reports_percentiles_and_throughput():
+    result = measure_latency(lambda x: x * 2, [(i,) for i in range(50)], warmup=5, rounds=2)
+
+    assert result["calls"] == 50 and result["rounds"] == 2
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert result["throughput_qps"] > 0
+
+
+def test_generators_are_deterministic_per_seed():
+    pd.testing.assert_frame_equal(generate_catalog(50, seed=1), generate_catalog(50, seed=1))
+    pd.testing.assert_frame_equal(generate_profiles(20, seed=1), generate_profiles(20, seed=1))
+    for first, second in zip(generate_itm_rec(30, 20, 5, seed=1), generate_itm_rec(30, 20, 5, seed=1)):
+        pd.testing.assert_frame_equal(first, second)
+    assert not generate_catalog(50, seed=1).equals(generate_catalog(50, seed=2))
+
+
+def test_itm_rec_users_rate_distinct_items():
+    users, items, ratings = generate_itm_rec(40, 25, ratings_per_user=10, seed=3)
+
+    assert len(users) == 40 and len(items) == 25
+    assert len(ratings) == 400
+    assert not ratings.duplicated(["user_id", "item_id"]).any()
+    assert set(ratings["item_id"]) <= set(items["item_id"])
@@ -0,0 +1,135 @@
+import math
+import re
+
+import numpy as np
+import pytest
+
+from catalog_search import CatalogSearchIndex, normalize_title
+
+WORDS = ["data", "database", "deep", "learning", "machine", "marketing", "math", "python", "design", "finance"]
+
+
+def analyze(text: str) -> list:
+    return text.lower().split()
+
+
+@pytest.fixture(scope="module")
+def texts():
+    rng = np.random.default_rng(4)
+    titles = [" ".join(rng.choice(WORDS, size=rng.integers(1, 4))) for _ in range(300)]
+    titles[:3] = ["Data  Science", "data science", "Ünicode Basics"]
+    descriptions = [" ".join(rng.choice(WORDS, size=rng.integers(3, 12))) for _ in range(300)]
+    rank = rng.permutation(300)
+    return titles, descriptions, rank
+
+
+@pytest.fixture(scope="module")
+def index(texts):
+    titles, descriptions, rank = texts
+    vocabulary = {word: i for i, word in enumerate(WORDS)}
+    return CatalogSearchIndex.build(titles, descriptions, vocabulary, analyze, rank, top_k=10, scan_limit=8)
+
+
+def bm25(texts, query: list, k1=1.2, b=0.75, title_boost=2) -> list:
+    """Reference BM25 scores computed document by document"""
+    titles, descriptions, _ = texts
+    tfs = []
+    for title, description in zip(titles, descriptions):
+        tf = {}
+        for term in analyze(title):
+            if term in WORDS:
+                tf[term] = tf.get(term, 0) + title_boost
+        for term in analyze(description):
+            if term in WORDS:
+                tf[term] = tf.get(term, 0) + 1
+        tfs.append(tf)
+    avg_length = sum(sum(tf.values()) for tf in tfs) / len(tfs)
+
+    scores = []
+    for doc, tf in enumerate(tfs):
+        length, score = sum(tf.values()), 0.0
+        for term in set(query):
+            if term in tf:
+                df = sum(term in other for other in tfs)
+                idf = math.log(1 + (len(tfs) - df + 0.5) / (df + 0.5))
+                score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * length / avg_length))
+        if score > 0:
+            scores.append((doc, score))
+    return sorted(scores, key=lambda item: (-item[1], item[0]))
+
+
+@pytest.mark.parametrize("query", [["data"], ["machine", "learning"], ["python", "finance", "python"]])
+def test_search_ranks_by_bm25(index, texts, query):
+    vocabulary = {word: i for i, word in enumerate(WORDS)}
+    expected = bm25(texts, query)[:10]
+
+    results = index.search([vocabulary[term] for term in query], top_n=10)
+
+    # Weights are stored as float32, so only the order of distinct scores is compared
+    reference = dict(bm25(texts, query))
+    assert [score for _, score in results] == pytest.approx([score for _, score in expected], rel=1e-5)
+    assert [score for _, score in results] == pytest.approx([reference[doc] for doc, _ in results], rel=1e-5)
+
+
+def test_search_without_known_terms(index):
+    assert index.search([], 10) == []
+    assert index.search([0], 0) == []
+
+
+def completions(texts, prefix: str, limit: int) -> list:
+    """Reference autocomplete: matching titles by popularity rank"""
+    titles, _, rank = texts
+    key = re.sub(r"\s+", " ", prefix.lower()).lstrip()
+    matching = [i for i, title in enumerate(titles) if normalize_title(title).startswith(key)]
+    return sorted(matching, key=lambda i: rank[i])[:limit]
+
+
+@pytest.mark.parametrize("prefix", ["d", "da", "data", "data ", "database", "m", "ma", "mac", "machine learning",
+                                    "p", "deep", "f", "Data   sc", "ü", "zzz"])
+def test_autocomplete_returns_the_most_popular_matching_titles(index, texts, prefix):
+    assert index.autocomplete(prefix, 10) == completions(texts, prefix, 10)
+    assert index.autocomplete(prefix, 3) == completions(texts, prefix, 3)
+
+
+def test_autocomplete_limits(index):
+    assert index.autocomplete("", 10) == []
+    assert index.autocomplete("d", 0) == []
+    assert len(index.autocomplete("d", 50)) == index.top_k
+
+
+def test_popular_prefixes_are_precomputed(index, texts):
+    titles, _, _ = texts
+    assert sum(normalize_title(title).startswith("d") for title in titles) > index.scan_limit
+    assert b"d" in [index._prefixes[start:end] for start, end in zip(index.prefix_offsets[:-1], index.prefix_offsets[1:])]
+
+
+def test_index_round_trips_through_arrays(index):
+    restored = CatalogSearchIndex.from_arrays(index.settings(), index.arrays())
+
+    assert restored.search([0, 4], 10) == index.search([0, 4], 10)
+    for prefix in ["d", "data s", "ma", "ü"]:
+        assert restored.autocomplete(prefix, 10) == index.autocomplete(prefix, 10)
+
+
+def test_search_endpoint_order(api, client):
+    query = "data analysis"
+    expected = [api.model._columns["course_id"][idx] for idx, _ in api.model.search(query, 5)]
+
+    response = client.get("/search", query_string={"q": query, "top_n": 5}).get_json()
+
+    assert [result["course_id"] for result in response["results"]] == expected
+    scores = [result["score"] for result in response["results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert client.get("/search").status_code == 400
+
+
+def test_autocomplete_endpoint_order(api, client):
+    model = api.model
+    prefix = normalize_title(model._columns["title"][0])[:2]
+
+    suggestions = client.get("/search/autocomplete", query_string={"q": prefix, "limit": 5}).get_json()["suggestions"]
+
+    assert suggestions
+    assert all(normalize_title(s["title"]).startswith(prefix) for s in suggestions)
+    ranks = [model.popular_position(model._course_index[s["course_id"]]) for s in suggestions]
+    assert ranks == sorted(ranks)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random
+from sklearn.preprocessing import normalize
+
+from advanced_recommender import AdvancedRecommender
+from diversity import mmr_select
+
+PROFILE = {"major": "Computer Science", "interests": "machine learning python", "year": 3, "gpa": 3.2}
+
+
+def naive_mmr(vectors: np.ndarray, relevance: np.ndarray, k: int, diversity: float) -> list:
+    """MMR comparing every candidate with every pick at each step"""
+    picks = []
+    candidates = list(range(len(relevance)))
+    for _ in range(min(k, len(relevance))):
+        def score(i):
+            redundancy = max((vectors[i] @ vectors[j] for j in picks), default=0.0)
+            return (1 - diversity) * relevance[i] - diversity * redundancy
+        best = max(candidates, key=score)
+        picks.append(best)
+        candidates.remove(best)
+    return picks
+
+
+@pytest.fixture(scope="module")
+def pool():
+    vectors = normalize(sparse_random(60, 40, density=0.15, random_state=3, format="csr"))
+    relevance = np.random.default_rng(3).random(60)
+    return vectors, relevance
+
+
+@pytest.mark.parametrize("diversity", [0.2, 0.5, 0.9, 1.0])
+def test_mmr_matches_the_naive_greedy_selection(pool, diversity):
+    vectors, relevance = pool
+
+    picks = mmr_select(vectors, relevance, 15, diversity)
+
+    assert picks == naive_mmr(vectors.toarray(), relevance, 15, diversity)
+    assert mmr_select(vectors.toarray(), relevance, 15, diversity) == picks
+
+
+def test_zero_diversity_is_the_relevance_order(pool):
+    vectors, relevance = pool
+    assert mmr_select(vectors, relevance, 10, 0.0) == np.argsort(-relevance)[:10].tolist()
+
+
+def test_pool_size_bounds_the_selection(pool):
+    vectors, relevance = pool
+    assert sorted(mmr_select(vectors, relevance, 100, 0.5)) == list(range(60))
+    assert mmr_select(vectors, relevance, 0, 0.5) == []
+
+
+def test_duplicates_are_pushed_down():
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+    relevance = np.array([1.0, 0.99, 0.5])
+
+    assert mmr_select(vectors, relevance, 2, 0.0) == [0, 1]
+    assert mmr_select(vectors, relevance, 2, 0.5) == [0, 2]
+
+
+@pytest.fixture(scope="module")
+def recommender(professional_model):
+    recommender = AdvancedRecommender()
+    recommender.load(str(professional_model))
+    return recommender
+
+
+def redundancy(recommender, recommendations) -> float:
+    """Mean pairwise cosine similarity of the recommended courses"""
+    indices = [recommender._course_index[item["course_id"]] for item in recommendations]
+    vectors = recommender.course_vectors[indices]
+    similarity = (vectors @ vectors.T).toarray()
+    return similarity[np.triu_indices(len(indices), 1)].mean()
+
+
+def test_recommend_without_diversity_is_unchanged(recommender):
+    assert recommender.recommend(PROFILE, top_n=10, diversity=0.0) == recommender.recommend(PROFILE, top_n=10)
+
+
+def test_diversity_lowers_redundancy(recommender):
+    plain = recommender.recommend(PROFILE, top_n=10)
+    diverse = recommender.recommend(PROFILE, top_n=10, diversity=0.7)
+
+    assert len(diverse) == 10
+    assert diverse[0] == plain[0]
+    assert redundancy(recommender, diverse) < redundancy(recommender, plain)
+
+    pool = {item["course_id"] for item in recommender.recommend(PROFILE, top_n=10 * recommender.DIVERSITY_POOL)}
+    assert {item["course_id"] for item in diverse} <= pool
+
+
+def test_diversity_outside_the_unit_interval_is_rejected(recommender):
+    with pytest.raises(ValueError):
+        recommender._diversify([(0, 0.5, 0.5, 4.0)], 1, 1.5)
+
+
+@pytest.mark.parametrize("body", [{"diversity": 1.5}, {"diversity": -0.1}, {"diversity": 0.5, "stream": True}])
+def test_api_rejects_invalid_diversity(client, body):
+    response = client.post("/recommend", json={"major": "Biology", **body})
+    assert response.status_code == 400
+
+
+def test_api_diversified_recommendations(api, client):
+    response = client.post("/recommend", json={**PROFILE, "top_n": 8, "diversity": 0.6})
+
+    assert response.status_code == 200
+    assert response.get_json()["recommendations"] == api.model.recommend(PROFILE, top_n=8, diversity=0.6)
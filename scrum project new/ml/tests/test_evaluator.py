@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+
+from evaluator import ModelEvaluator
+
+
+def per_user_split(ratings: pd.DataFrame, test_size: float):
+    """The original split: sklearn's train_test_split on each user's ratings"""
+    train_list, test_list = [], []
+    for user_id in ratings["user_id"].unique():
+        user_ratings = ratings[ratings["user_id"] == user_id]
+        if len(user_ratings) == 1:
+            train_list.append(user_ratings)
+        else:
+            user_train, user_test = train_test_split(user_ratings, test_size=test_size, random_state=42)
+            train_list.append(user_train)
+            test_list.append(user_test)
+    return pd.concat(train_list, ignore_index=True), pd.concat(test_list, ignore_index=True)
+
+
+@pytest.mark.parametrize("test_size", [0.1, 0.2, 0.5])
+def test_split_matches_per_user_train_test_split(ratings, test_size):
+    train, test = ModelEvaluator.train_test_split_ratings(ratings, test_size=test_size)
+    expected_train, expected_test = per_user_split(ratings, test_size)
+
+    pd.testing.assert_frame_equal(train, expected_train)
+    pd.testing.assert_frame_equal(test, expected_test)
+
+
+def test_split_keeps_single_rating_users_in_train(ratings):
+    train, test = ModelEvaluator.train_test_split_ratings(ratings, test_size=0.2)
+    counts = ratings["user_id"].value_counts()
+    single = counts[counts == 1].index
+
+    assert len(single) > 0
+    assert train["user_id"].isin(single).sum() == len(single)
+    assert not test["user_id"].isin(single).any()
+    assert set(test["user_id"]) <= set(train["user_id"])
+
+
+@pytest.mark.parametrize("n_folds", [2, 5])
+def test_folds_keep_a_train_rating_for_every_user(ratings, n_folds):
+    folds = ModelEvaluator.fold_assignments(ratings, n_folds=n_folds)
+    counts = ratings["user_id"].map(ratings["user_id"].value_counts()).to_numpy()
+
+    assert ((folds == -1) == (counts == 1)).all()
+    assert folds.max() == n_folds - 1
+    for fold in range(n_folds):
+        test = folds == fold
+        train_users = set(ratings.loc[~test, "user_id"])
+        assert set(ratings.loc[test, "user_id"]) <= train_users
+
+
+@pytest.mark.parametrize("n_folds", [2, 5])
+def test_folds_are_balanced(ratings, n_folds):
+    folds = ModelEvaluator.fold_assignments(ratings, n_folds=n_folds)
+    assigned = folds >= 0
+
+    # Within a user, fold sizes differ by at most one rating
+    per_user = pd.crosstab(ratings.loc[assigned, "user_id"], folds[assigned])
+    per_user = per_user.reindex(columns=range(n_folds), fill_value=0)
+    assert (per_user.max(axis=1) - per_user.min(axis=1)).max() <= 1
+
+    # Overall, no fold is far from an even share
+    sizes = np.bincount(folds[assigned], minlength=n_folds)
+    assert sizes.max() - sizes.min() <= 0.1 * assigned.sum() / n_folds
+
+
+def test_fold_assignments_are_reproducible(ratings):
+    first = ModelEvaluator.fold_assignments(ratings, n_folds=5, random_state=1)
+    second = ModelEvaluator.fold_assignments(ratings, n_folds=5, random_state=1)
+    other = ModelEvaluator.fold_assignments(ratings, n_folds=5, random_state=2)
+
+    assert (first == second).all()
+    assert (first != other).any()
+
+
+def test_fold_assignments_need_two_folds(ratings):
+    with pytest.raises(ValueError):
+        ModelEvaluator.fold_assignments(ratings, n_folds=1)
+
+
+def test_cross_validate_summarizes_every_fold(itm_rec):
+    from feature_engineer import FeatureEngineer
+
+    users, items, ratings = itm_rec
+    user_features = FeatureEngineer.create_user_features(users, ratings)
+    item_features = FeatureEngineer.create_item_features(items, ratings)
+
+    summary = ModelEvaluator.cross_validate(ratings, user_features, item_features, n_folds=3, n_jobs=1)
+
+    assert [fold["fold"] for fold in summary["folds"]] == [0, 1, 2]
+    assert summary["rmse"] == pytest.approx(np.mean([fold["rmse"] for fold in summary["folds"]]))
+    assert all(fold["num_predictions"] > 0 for fold in summary["folds"])
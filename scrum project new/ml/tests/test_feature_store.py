@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_engineer import FeatureEngineer
+from feature_store import FeatureStore
+
+
+def expected_statistics(ratings: pd.DataFrame, key: str) -> pd.DataFrame:
+    stats = ratings.groupby(key)["rating"].agg(["mean", "std", "count"]).reset_index()
+    stats.columns = [key, "avg_rating", "rating_std", "num_ratings"]
+    stats["rating_std"] = stats["rating_std"].fillna(0)
+    return stats
+
+
+def assert_statistics(store: FeatureStore, ratings: pd.DataFrame):
+    for key, actual in (("user_id", store.user_statistics()), ("item_id", store.item_statistics())):
+        actual = actual.sort_values(key).reset_index(drop=True)
+        expected = expected_statistics(ratings, key).sort_values(key).reset_index(drop=True)
+        assert actual[key].tolist() == expected[key].tolist()
+        np.testing.assert_allclose(actual["avg_rating"], expected["avg_rating"])
+        np.testing.assert_allclose(actual["rating_std"], expected["rating_std"], atol=1e-9)
+        np.testing.assert_array_equal(actual["num_ratings"], expected["num_ratings"])
+
+
+def batches(ratings: pd.DataFrame, n: int) -> list:
+    bounds = np.linspace(0, len(ratings), n + 1).astype(int)
+    return [ratings.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def test_batches_add_up_to_the_grouped_statistics(ratings, tmp_path):
+    store = FeatureStore(str(tmp_path))
+    for batch in batches(ratings, 5):
+        store.update(batch)
+
+    assert_statistics(store, ratings)
+    assert store.ratings_ingested == len(ratings)
+
+
+def test_batches_at_or_below_the_watermark_are_skipped(ratings, tmp_path):
+    first, second = batches(ratings, 2)
+    store = FeatureStore(str(tmp_path))
+
+    assert store.update(first, watermark="2024-01-01")
+    assert store.update(second, watermark="2024-01-02")
+    assert not store.update(second, watermark="2024-01-02")
+    assert not store.update(first, watermark="2024-01-01")
+
+    assert_statistics(store, ratings)
+    assert store.watermark == "2024-01-02"
+
+
+def test_save_and_open_round_trip(ratings, tmp_path):
+    store = FeatureStore(str(tmp_path), n_partitions=4)
+    store.update(ratings, watermark=3)
+    store.save()
+
+    reopened = FeatureStore.open(str(tmp_path))
+
+    assert_statistics(reopened, ratings)
+    assert reopened.watermark == 3 and reopened.n_partitions == 4
+    assert reopened.ratings_ingested == len(ratings)
+
+
+def test_a_save_rewrites_only_the_touched_partitions(ratings, tmp_path):
+    store = FeatureStore(str(tmp_path), n_partitions=8)
+    store.update(ratings)
+    store.save()
+
+    delta = ratings.iloc[:1].assign(rating=5.0)
+    store.update(delta)
+    store.save()
+
+    files = sorted(path.name for path in (tmp_path / "user").glob("*.npz"))
+    assert len(files) == 8
+    assert sum(name.endswith("-g2.npz") for name in files) == 1
+    assert_statistics(FeatureStore.open(str(tmp_path)), pd.concat([ratings, delta]))
+
+
+def test_snapshots_apply_only_new_log_rows(ratings, tmp_path):
+    store = FeatureStore(str(tmp_path))
+    half = len(ratings) // 2
+
+    assert store.update_snapshot(ratings.iloc[:half], log_rows=half) == "rebuilt"
+    store.update(ratings.iloc[:0], watermark=7)
+    assert store.update_snapshot(ratings, log_rows=len(ratings)) == "incremental"
+
+    assert_statistics(store, ratings)
+    assert store.ratings_ingested == len(ratings)
+    assert store.watermark == 7
+
+
+def test_rewritten_history_rebuilds_from_the_snapshot(ratings, tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.update_snapshot(ratings, log_rows=len(ratings))
+    store.update(ratings.iloc[:10], watermark=7)
+    store.save()
+
+    rewritten = ratings.drop(index=ratings.index[:5])
+    reopened = FeatureStore.open(str(tmp_path))
+
+    assert reopened.update_snapshot(rewritten, log_rows=len(ratings)) == "rebuilt"
+    assert_statistics(reopened, rewritten)
+    assert reopened.watermark == 7
+    assert not reopened.update(ratings.iloc[:10], watermark=7)
+
+
+def test_feature_engineer_uses_the_store(ratings, tmp_path):
+    users = pd.DataFrame({"user_id": sorted(ratings["user_id"].unique()) + ["unrated"]})
+    store = FeatureStore(str(tmp_path))
+    store.update(ratings)
+
+    from_store = FeatureEngineer.create_user_features(users, ratings, store=store)
+    grouped = FeatureEngineer.create_user_features(users, ratings)
+
+    pd.testing.assert_frame_equal(from_store, grouped, check_dtype=False)
+    assert from_store.set_index("user_id").loc["unrated", "avg_rating"] == 3.0
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from group_recommender import GroupRecommender
+from recommender_model import HybridRecommender
+
+
+@pytest.fixture(scope="module")
+def model(hybrid_model) -> HybridRecommender:
+    return HybridRecommender.load(str(hybrid_model))
+
+
+@pytest.fixture
+def recommender(model) -> GroupRecommender:
+    return GroupRecommender(model)
+
+
+@pytest.mark.parametrize("strategy, reduce", [
+    ("average", np.mean),
+    ("least_misery", np.min),
+    ("most_pleasure", np.max),
+])
+def test_strategies_reduce_the_member_scores(model, recommender, strategy, reduce):
+    group_ids = ["3", "4", "5"]
+
+    profiles = recommender.aggregate(group_ids, strategy=strategy, alpha=0.6)
+
+    for group_id in group_ids:
+        rows = model.user_indices(model.group_members[group_id])
+        expected = reduce(model.score_users(rows, alpha=0.6), axis=0)
+        np.testing.assert_allclose(profiles[group_id], expected, rtol=1e-12)
+
+
+def test_recommendations_skip_items_the_group_rated(model, recommender):
+    recommended = recommender.recommend(["1"], top_n=len(model.item_ids))["1"]
+
+    items = [item["item_id"] for item in recommended]
+    assert "1" not in items and "2" not in items
+    assert len(items) == len(model.item_ids) - 2
+
+
+def test_group_without_known_members_gets_popular_items(model, recommender):
+    group_id, members = GroupRecommender.adhoc_group(["nobody", "else"])
+
+    recommended = recommender.recommend([group_id], top_n=5, adhoc={group_id: members})[group_id]
+
+    assert recommended == model._get_popular_items(5)
+
+
+def test_profiles_are_cached_until_the_membership_changes(model, recommender):
+    first = recommender.aggregate(["6"])["6"]
+    assert recommender.aggregate(["6"])["6"] is first
+
+    assert recommender.set_members("6", model.group_members["7"])
+    changed = recommender.aggregate(["6"])["6"]
+
+    assert changed is not first
+    np.testing.assert_array_equal(changed, recommender.aggregate(["7"])["7"])
+    assert not recommender.set_members("6", model.group_members["7"])
+
+
+def test_adhoc_group_id_is_independent_of_member_order():
+    assert GroupRecommender.adhoc_group([3, "1", "2"]) == GroupRecommender.adhoc_group(["2", 3, "1"])
+
+
+def test_group_endpoint(client):
+    response = client.post("/recommend/group", json={"group_id": "3", "top_n": 4, "strategy": "least_misery"})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["strategy"] == "least_misery"
+    assert body["count"] == 4 and len(body["members"]) == 3
+
+
+def test_group_endpoint_batches_group_ids(client):
+    body = client.post("/recommend/group", json={"group_ids": ["3", "4"], "top_n": 2}).get_json()
+
+    assert [group["group_id"] for group in body["groups"]] == ["3", "4"]
+    assert body["count"] == 2
+
+
+@pytest.mark.parametrize("body, status", [
+    ({"group_id": "no-such-group"}, 404),
+    ({"group_id": "3", "strategy": "loudest"}, 400),
+    ({}, 400),
+])
+def test_group_endpoint_rejects_bad_requests(client, body, status):
+    assert client.post("/recommend/group", json=body).status_code == status
+
+
+def test_adhoc_groups_are_not_registered(api, client):
+    registered = dict(api.group_recommender.group_members)
+
+    body = client.post("/recommend/group", json={"members": ["1001", "1000"]}).get_json()
+
+    assert body["group_id"] == "adhoc:1000,1001"
+    assert body["members"] == ["1000", "1001"]
+    assert api.group_recommender.group_members == registered
+
+
+def test_changing_members_requires_the_admin_token(api, client, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    members = list(api.group_recommender.group_members["20"])
+
+    response = client.post("/recommend/group", json={"group_id": "20", "members": ["1000"]})
+    assert response.status_code == 403
+    assert api.group_recommender.group_members["20"] == members
+
+    response = client.post("/recommend/group", json={"group_id": "20", "members": ["1000"]},
+                           headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.get_json()["members"] == ["1000"]
+    api.group_recommender.set_members("20", members)
@@ -0,0 +1,145 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from advanced_recommender import AdvancedRecommender
+from memory_usage import compact_frame, memory_footprint, memory_report, touch_pages
+from recommender_model import HybridRecommender
+
+PROFILES = [
+    {"major": "Computer Science", "interests": "machine learning", "year": 3, "gpa": 3.2},
+    {"major": "Biology", "interests": "", "year": 1, "gpa": 3.0},
+    {"major": "Business", "interests": "marketing analytics", "year": 4, "gpa": 3.9},
+]
+
+
+class Holder:
+    pass
+
+
+def test_shared_buffers_are_counted_once():
+    array = np.zeros(100_000)
+    holder = Holder()
+    holder.array, holder.view, holder.items = array, array[10:], [array, array[::2]]
+
+    footprint = memory_footprint(holder)
+
+    assert array.nbytes <= footprint["heap_bytes"] < 2 * array.nbytes
+    assert footprint["mapped_bytes"] == 0
+
+
+def test_memory_mapped_arrays_are_reported_separately(tmp_path):
+    path = tmp_path / "a.npy"
+    np.save(path, np.ones(50_000))
+    holder = Holder()
+    holder.mapped = np.load(path, mmap_mode="r")
+
+    footprint = memory_footprint(holder)
+
+    assert footprint["mapped_bytes"] == 400_000
+    assert footprint["heap_bytes"] < 10_000
+
+
+def test_report_components_add_up_to_the_total():
+    holder = Holder()
+    holder.small = np.zeros(10)
+    holder.frame = pd.DataFrame({"a": np.arange(1000), "b": ["x"] * 1000})
+    holder.big = np.zeros(100_000)
+    holder.alias = holder.big
+
+    report = memory_report(holder)
+
+    assert list(report["components"])[0] == "big"
+    assert report["components"]["alias"]["heap_bytes"] == 0
+    assert sum(sizes["heap_bytes"] for sizes in report["components"].values()) < report["total"]["heap_bytes"]
+    assert set(report["components"]["frame"]["columns"]) == {"a", "b"}
+
+
+def test_compact_frame_keeps_the_values():
+    frame = pd.DataFrame({
+        "count": np.arange(100, dtype=np.int64),
+        "rating": np.tile([4.5, 3.25], 50),
+        "precise": np.linspace(0, 1, 100),
+        "category": np.array(["Data", "Art"] * 50, dtype=object),
+        "title": np.array([f"course {i}" for i in range(100)], dtype=object),
+    })
+
+    compacted = compact_frame(frame)
+
+    assert compacted["count"].dtype == np.int8
+    assert compacted["rating"].dtype == np.float32
+    assert compacted["precise"].dtype == np.float64
+    assert isinstance(compacted["category"].dtype, pd.CategoricalDtype)
+    assert not isinstance(compacted["title"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(compacted, frame, check_dtype=False, check_categorical=False)
+    assert memory_footprint(compacted)["heap_bytes"] < memory_footprint(frame)["heap_bytes"]
+
+
+def test_touch_pages_covers_every_byte():
+    assert touch_pages(np.zeros((100, 100))) == 80_000
+    assert touch_pages(np.zeros((100, 100))[:, ::2]) == 40_000
+    assert touch_pages(None) == 0
+
+
+@pytest.fixture(scope="module")
+def professional(professional_model, tmp_path_factory):
+    """(full, lean) AdvancedRecommender loaded from each save profile, and the lean file"""
+    full = AdvancedRecommender()
+    full.load(str(professional_model))
+    path = tmp_path_factory.mktemp("lean") / "lean.pkl"
+    full.save(str(path), profile="lean")
+    lean = AdvancedRecommender()
+    lean.load(str(path))
+    return full, lean, path
+
+
+def test_lean_professional_model_serves_the_same_results(professional):
+    full, lean, _ = professional
+    course_id = full._columns["course_id"][3]
+    title = full._columns["title"][3]
+
+    assert lean.vectorizer is None
+    for profile in PROFILES:
+        assert lean.recommend(profile, top_n=10) == full.recommend(profile, top_n=10)
+        assert lean.recommend_json(profile, top_n=10, diversity=0.5) == full.recommend_json(profile, top_n=10, diversity=0.5)
+    assert lean.similar_courses(course_id) == full.similar_courses(course_id)
+    assert lean.search("data analysis") == full.search("data analysis")
+    assert lean.autocomplete(title[:3]) == full.autocomplete(title[:3])
+    assert lean.get_popular_courses(top_n=20) == full.get_popular_courses(top_n=20)
+
+
+def test_lean_professional_model_is_smaller(professional, professional_model):
+    full, lean, path = professional
+
+    assert os.path.getsize(path) < os.path.getsize(professional_model)
+    assert memory_report(lean)["components"]["_courses_df"]["heap_bytes"] < memory_report(full)["components"]["_courses_df"]["heap_bytes"]
+
+
+@pytest.fixture(scope="module")
+def hybrid(hybrid_model, tmp_path_factory):
+    full = HybridRecommender.load(str(hybrid_model))
+    path = tmp_path_factory.mktemp("lean") / "hybrid"
+    full.save(str(path), profile="lean")
+    return full, HybridRecommender.load(str(path))
+
+
+def test_lean_hybrid_model_serves_the_same_results(hybrid):
+    full, lean = hybrid
+
+    assert lean.user_features is None
+    for user_id in [str(user) for user in full.user_ids[:20]] + ["unknown"]:
+        assert lean.predict(user_id, top_n=10) == full.predict(user_id, top_n=10)
+        assert lean.recommend_user(user_id, top_n=10) == full.recommend_user(user_id, top_n=10)
+    name, levels = next(iter(full.context_levels.items()))
+    context = {name: levels[0]}
+    assert lean.predict(str(full.user_ids[0]), context=context) == full.predict(str(full.user_ids[0]), context=context)
+    assert memory_footprint(lean)["heap_bytes"] < memory_footprint(full)["heap_bytes"]
+
+
+def test_unknown_save_profiles_are_rejected(hybrid, professional, tmp_path):
+    with pytest.raises(ValueError):
+        hybrid[0].save(str(tmp_path / "hybrid"), profile="tiny")
+    with pytest.raises(ValueError):
+        professional[0].save(str(tmp_path / "professional.pkl"), profile="tiny")
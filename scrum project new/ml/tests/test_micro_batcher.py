@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+@pytest.fixture
+def batches():
+    return []
+
+
+@pytest.fixture
+def batcher(batches):
+    def double(items):
+        batches.append(list(items))
+        time.sleep(0.01)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=20, workers=1).start()
+    yield batcher
+    batcher.stop()
+
+
+def submit_concurrently(batcher, items):
+    results = {}
+    threads = [threading.Thread(target=lambda item=item: results.setdefault(item, batcher.submit_sync(item, timeout=5)))
+               for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_are_coalesced(batcher, batches):
+    results = submit_concurrently(batcher, range(20))
+
+    assert results == {item: item * 2 for item in range(20)}
+    assert sorted(item for batch in batches for item in batch) == list(range(20))
+    assert max(len(batch) for batch in batches) <= 8
+    assert len(batches) < 20
+    assert batcher.stats()["requests"] == 20
+
+
+def test_coroutines_can_submit(batcher):
+    async def main():
+        return await asyncio.gather(*(batcher.submit(item) for item in range(5)))
+
+    assert asyncio.run(main()) == [0, 2, 4, 6, 8]
+
+
+def test_a_failed_batch_fails_every_caller():
+    def fail(items):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(fail, max_wait_ms=1).start()
+    try:
+        with pytest.raises(RuntimeError, match="model exploded"):
+            batcher.submit_sync(1, timeout=5)
+        assert batcher.stats()["errors"] == 1
+    finally:
+        batcher.stop()
+
+
+def test_submit_sync_times_out():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait(5) and items, max_wait_ms=1, workers=1).start()
+    try:
+        with pytest.raises(TimeoutError):
+            batcher.submit_sync("slow", timeout=0.05)
+        assert batcher.stats()["timeouts"] == 1
+    finally:
+        release.set()
+        batcher.stop()
+
+
+def test_recommend_through_the_batcher_matches_direct_scoring(api, client, monkeypatch):
+    profile = {"major": "Computer Science", "interests": "batched scoring", "year": 2, "gpa": 3.1, "top_n": 7}
+    expected = client.post("/recommend", json=profile).get_json()
+    api.response_cache.clear()
+
+    batcher = MicroBatcher(api.score_batch, max_wait_ms=1).start()
+    monkeypatch.setattr(api, "batcher", batcher)
+    try:
+        assert client.post("/recommend", json=profile).get_json() == expected
+        assert batcher.stats()["requests"] == 1
+    finally:
+        batcher.stop()
+
+
+def test_recommend_returns_503_when_the_batch_misses_the_deadline(api, client, monkeypatch):
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait(5) and api.score_batch(items), max_wait_ms=1).start()
+    monkeypatch.setattr(api, "batcher", batcher)
+    try:
+        response = client.post("/recommend", json={"major": "Biology", "interests": "too slow"},
+                               headers={"X-Deadline-Ms": "50"})
+        assert response.status_code == 503
+        assert response.get_json()["reason"] == "deadline"
+    finally:
+        release.set()
+        batcher.stop()
@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pytest
+
+from feature_engineer import FeatureEngineer
+from recommender_model import HybridRecommender
+
+
+@pytest.fixture(scope="module")
+def fitted(itm_rec, groups, group_ratings) -> HybridRecommender:
+    users, items, ratings = itm_rec
+    model = HybridRecommender()
+    model.fit(
+        ratings,
+        FeatureEngineer.create_user_features(users, ratings),
+        FeatureEngineer.create_item_features(items, ratings),
+        n_jobs=1,
+    )
+    model.set_groups(groups, group_ratings)
+    model.materialize(top_n=15)
+    return model
+
+
+@pytest.fixture(scope="module")
+def saved(fitted, tmp_path_factory):
+    path = tmp_path_factory.mktemp("persistence") / "model"
+    fitted.save(str(path))
+    return path
+
+
+@pytest.mark.parametrize("mmap_mode", [None, "r"])
+def test_round_trip_serves_the_same_recommendations(fitted, saved, mmap_mode):
+    loaded = HybridRecommender.load(str(saved), mmap_mode=mmap_mode)
+
+    for user_id in fitted.user_ids[::25]:
+        user_id = str(user_id)
+        assert loaded.recommend_user(user_id, 10) == fitted.recommend_user(user_id, 10)
+        assert loaded.predict(user_id, 5, context={"class": "DB"}) == fitted.predict(user_id, 5, context={"class": "DB"})
+    assert loaded.group_members == fitted.group_members
+    none = np.empty(0, dtype=np.int32)
+    for group_id in fitted.group_members:
+        assert np.array_equal(loaded.group_rated_items.get(group_id, none), fitted.group_rated_items.get(group_id, none))
+    assert (loaded.user_similarity != fitted.user_similarity).nnz == 0
+    assert (loaded.context_matrices[fitted.encode_context({"semester": "Fall"})]
+            != fitted.context_matrices[fitted.encode_context({"semester": "Fall"})]).nnz == 0
+
+
+def mapped(array: np.ndarray) -> bool:
+    """Whether an array is, or is a view of, a memory-mapped file"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base if isinstance(array, np.ndarray) else None
+    return False
+
+
+def test_memory_mapped_load_maps_the_arrays(saved):
+    loaded = HybridRecommender.load(str(saved), mmap_mode="r")
+
+    assert mapped(loaded.user_item_matrix.data)
+    assert mapped(loaded.item_similarity.indices)
+    assert mapped(loaded.top_items) and mapped(loaded.top_scores)
+    assert mapped(loaded.context_item_stats[0])
+    assert not loaded.top_scores.flags.writeable
+    assert not mapped(HybridRecommender.load(str(saved)).top_items)
+
+
+def test_load_rejects_arrays_that_do_not_match_the_manifest(saved, tmp_path):
+    manifest = json.loads((saved / "manifest.json").read_text())
+    broken = tmp_path / "model"
+    broken.mkdir()
+    for name in manifest["arrays"]:
+        (broken / f"{name}.npy").write_bytes((saved / f"{name}.npy").read_bytes())
+    np.save(broken / "top_scores.npy", np.zeros((2, 2), dtype=np.float32))
+    (broken / "manifest.json").write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError, match="top_scores"):
+        HybridRecommender.load(str(broken))
+
+    manifest["format_version"] = HybridRecommender.FORMAT_VERSION + 1
+    (broken / "manifest.json").write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="format version"):
+        HybridRecommender.load(str(broken))
+
+
+def test_save_replaces_an_existing_directory(fitted, tmp_path):
+    path = tmp_path / "model"
+    path.mkdir()
+    (path / "stale.npy").write_bytes(b"")
+
+    fitted.save(str(path))
+
+    assert not (path / "stale.npy").exists()
+    assert not (tmp_path / "model.tmp").exists()
+    assert HybridRecommender.load(str(path)).recommend_user(str(fitted.user_ids[0]), 5) == fitted.recommend_user(str(fitted.user_ids[0]), 5)
@@ -0,0 +1,163 @@
+import json
+
+import numpy as np
+import pytest
+
+from model_registry import ModelRegistry, UnknownModel
+
+MB = 1024 * 1024
+
+
+class Blob:
+    """A fake model holding the given number of megabytes"""
+
+    def __init__(self, megabytes: int):
+        self.data = np.ones(megabytes * MB, dtype=np.uint8)
+
+
+class Closing:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def registry():
+    registry = ModelRegistry({"blob": lambda path: (Blob(int(path)), f"v{path}"), "other": lambda path: (object(), "x")},
+                             memory_budget_bytes=int(2.5 * MB))
+    for name in "abc":
+        registry.register(name, "1", "blob", "1")
+    return registry
+
+
+def test_specs_resolve_by_name_and_version(registry):
+    registry.register("a", "2", "blob", "1")
+
+    assert registry.resolve(family="blob").key == "a@1"
+    assert registry.resolve("a@2").key == "a@2"
+    assert registry.resolve("a").key == "a@1"
+    assert registry.resolve("b").key == "b@1"
+
+    registry.register("a", "3", "blob", "1", default=True)
+    assert registry.resolve("a").key == "a@3"
+    assert registry.resolve(family="blob").key == "a@3"
+
+
+def test_unknown_and_mismatched_specs(registry):
+    with pytest.raises(UnknownModel):
+        registry.resolve("missing")
+    with pytest.raises(UnknownModel):
+        registry.resolve("a@9")
+    with pytest.raises(UnknownModel):
+        registry.resolve(family="other")
+    with pytest.raises(ValueError):
+        registry.resolve("a", family="other")
+    with pytest.raises(ValueError):
+        registry.register("x", "1", "unknown", "1")
+    with pytest.raises(ValueError):
+        registry.register("x@y", "1", "blob", "1")
+
+
+def test_models_load_on_first_use(registry):
+    entry = registry.resolve("a")
+    assert not entry.loaded
+
+    assert registry.get("a") is entry and registry.get("a") is entry
+    assert entry.loaded and entry.loads == 1 and entry.hits == 2
+    assert entry.artifact_version == "v1"
+    assert entry.memory["heap_bytes"] >= MB
+    assert registry.memory_stats()["models"]["a@1"]["components"]["data"] >= 1.0
+
+
+def test_least_recently_used_models_are_evicted_over_budget(registry):
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+
+    loaded = {entry["name"] for entry in registry.stats()["models"] if entry["loaded"]}
+    assert loaded == {"a", "c"}
+    assert registry.evictions == 1
+    assert registry.resident_bytes() <= registry.memory_budget_bytes
+
+
+def test_pinned_models_are_never_evicted(registry):
+    registry.register("a", "1", "blob", "1", pinned=True)
+    registry.register("big", "1", "blob", "3")
+
+    registry.get("a")
+    registry.get("b")
+    registry.get("big")
+
+    assert registry.resolve("a").loaded and registry.resolve("big").loaded
+    assert not registry.resolve("b").loaded
+    assert registry.evict_unpinned() == ["big@1"]
+    assert registry.resolve("a").loaded
+
+
+def test_requests_keep_an_evicted_model_alive(registry):
+    model = registry.get("a").model
+    registry.evict("a")
+
+    assert model.data.sum() == MB
+    assert registry.get("a").model is not model
+    assert not registry.evict("b")
+
+
+def test_reload_drops_attachments(registry):
+    entry = registry.get("a")
+    attachment = entry.attach("index", Closing)
+    assert entry.attach("index", Closing) is attachment
+
+    registry.load("a")
+
+    assert attachment.closed
+    assert entry.attachment("index") is None
+    assert entry.loads == 2
+
+
+@pytest.fixture
+def canary(api):
+    """A second, non-default version of the professional model"""
+    entry = api.registry.register("professional", "canary", "professional", str(api.MODEL_PATH))
+    yield entry
+    api.registry._entries.pop(entry.key)
+
+
+def test_requests_can_name_a_model_version(api, client, canary):
+    profile = {"major": "Physics", "interests": "registry", "top_n": 3}
+
+    default = client.post("/recommend", json=profile)
+    named = client.post("/recommend", json={**profile, "model": "professional@canary"})
+
+    assert default.headers["X-Model"] == "professional@current"
+    assert named.headers["X-Model"] == "professional@canary"
+    assert named.get_json()["recommendations"] == default.get_json()["recommendations"]
+    assert client.get("/search", query_string={"q": "data", "model": "professional@canary"}).status_code == 200
+
+    models = {entry["version"]: entry for entry in client.get("/models").get_json()["models"] if entry["name"] == "professional"}
+    assert models["canary"]["loaded"] and models["current"]["pinned"]
+
+
+def test_unknown_models_return_404(client):
+    response = client.post("/recommend", json={"major": "Physics", "model": "professional@nope"})
+    assert response.status_code == 404
+    assert "professional@nope" in response.get_json()["error"]
+    assert client.get("/items/popular", query_string={"model": "ghost"}).status_code == 404
+
+
+def test_a_model_of_another_family_is_rejected(client):
+    response = client.post("/recommend", json={"major": "Physics", "model": "hybrid"})
+    assert response.status_code == 400
+
+
+def test_registry_config_registers_models_lazily(api, tmp_path, canary):
+    config = tmp_path / "models.json"
+    config.write_text(json.dumps({"models": [
+        {"name": "professional", "version": "canary", "family": "professional", "path": str(api.MODEL_PATH)},
+    ]}))
+
+    assert api.load_registry_config(str(config)) == 1
+    assert not api.registry.resolve("professional@canary").loaded
+    assert api.registry.default("professional").key == "professional@current"
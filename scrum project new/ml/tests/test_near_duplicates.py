@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from near_duplicates import NearDuplicateFinder
+from professional_data_loader import ProfessionalDataLoader
+
+BASE = ("Machine Learning Foundations: an introduction to supervised learning, linear models, "
+        "gradient descent, regularization and model evaluation with hands-on Python exercises")
+
+
+def shingles(text: str, k: int = 5) -> set:
+    text = " ".join(text.lower().split())
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def jaccard(a: str, b: str) -> float:
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def test_signatures_estimate_jaccard_similarity():
+    finder = NearDuplicateFinder(num_perm=512, bands=32)
+    other = BASE.replace("gradient descent", "stochastic optimization").replace("Python", "R")
+
+    signatures = finder.signatures([BASE, other])
+
+    assert (signatures[0] == signatures[1]).mean() == pytest.approx(jaccard(BASE, other), abs=0.08)
+
+
+def test_signatures_do_not_depend_on_chunking():
+    finder = NearDuplicateFinder()
+    texts = [BASE[:n] for n in range(1, 120, 7)] + ["", "ünïcode text"]
+
+    np.testing.assert_array_equal(finder.signatures(texts, chunk_bytes=16), finder.signatures(texts))
+
+
+def test_case_and_whitespace_do_not_matter():
+    signatures = NearDuplicateFinder().signatures([BASE, "  " + BASE.upper().replace(" ", "\n  ")])
+    np.testing.assert_array_equal(signatures[0], signatures[1])
+
+
+def test_clusters_join_near_duplicates_only():
+    texts = [
+        BASE,
+        "Data Visualization with Tableau: dashboards, storytelling and chart design for analysts",
+        BASE + " (2nd edition)",
+        "Organic Chemistry I: structure, bonding, reaction mechanisms and stereochemistry",
+        BASE.replace("Python", "python 3"),
+    ]
+
+    n_clusters, labels = NearDuplicateFinder(threshold=0.8).clusters(texts)
+
+    assert n_clusters == 3
+    assert labels[0] == labels[2] == labels[4]
+    assert len({labels[0], labels[1], labels[3]}) == 3
+
+
+def test_clusters_of_nothing():
+    n_clusters, labels = NearDuplicateFinder().clusters([])
+    assert n_clusters == 0 and len(labels) == 0
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        NearDuplicateFinder(num_perm=100, bands=16)
+    with pytest.raises(ValueError):
+        NearDuplicateFinder(shingle_size=9)
+
+
+def courses() -> pd.DataFrame:
+    return pd.DataFrame({
+        "course_id": ["a", "b", "c", "d"],
+        "title": ["Machine Learning", "Organic Chemistry", "Machine Learning", "Machine Learning"],
+        "description": [BASE, "Structure, bonding and reaction mechanisms of carbon compounds", BASE + ".", BASE],
+        "rating": [4.0, 4.5, 5.0, 3.0],
+        "num_ratings": [10, 7, 30, 0],
+    })
+
+
+def test_loader_merges_each_cluster_into_its_most_reviewed_course():
+    merged = ProfessionalDataLoader(dedup_threshold=0.8)._merge_near_duplicates(courses())
+
+    assert merged["course_id"].tolist() == ["b", "c"]
+    canonical = merged.set_index("course_id").loc["c"]
+    assert canonical["num_ratings"] == 40
+    assert canonical["rating"] == round((4.0 * 10 + 5.0 * 30 + 3.0 * 0) / 40, 2)
+    assert merged.set_index("course_id").loc["b", "rating"] == 4.5
+
+
+def test_unreviewed_clusters_average_their_ratings():
+    df = courses().assign(num_ratings=0)
+
+    merged = ProfessionalDataLoader()._merge_near_duplicates(df)
+
+    assert merged["course_id"].tolist() == ["a", "b"]
+    assert merged.set_index("course_id").loc["a", "rating"] == 4.0
+
+
+def test_deduplication_can_be_disabled():
+    df = courses()
+    cleaned = ProfessionalDataLoader(dedup_threshold=None)._clean_courses(df.copy())
+    assert cleaned["course_id"].tolist() == df["course_id"].tolist()
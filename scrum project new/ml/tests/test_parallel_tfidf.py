@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from advanced_recommender import AdvancedRecommender
+from parallel_tfidf import ParallelTfidfFitter
+
+
+def chunked(docs: list, size: int):
+    return lambda: (docs[start:start + size] for start in range(0, len(docs), size))
+
+
+@pytest.fixture(scope="module")
+def documents(catalog) -> list:
+    return AdvancedRecommender._full_text(catalog).tolist()
+
+
+@pytest.mark.parametrize("params", [
+    dict(max_features=2000, stop_words="english", ngram_range=(1, 3), min_df=2),
+    dict(max_features=150, ngram_range=(1, 2), min_df=3, max_df=0.5),
+    dict(sublinear_tf=True, min_df=1),
+])
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_parallel_fit_matches_tfidf_vectorizer(documents, params, n_jobs):
+    vectorizer = TfidfVectorizer(**params)
+    expected = vectorizer.fit_transform(documents)
+
+    fitter = ParallelTfidfFitter(n_jobs=n_jobs, **params)
+    vectors = fitter.fit_transform(chunked(documents, 97))
+
+    assert fitter.runtime.vocabulary == vectorizer.vocabulary_
+    assert np.array_equal(fitter.runtime.idf, vectorizer.idf_)
+    assert vectors.shape == expected.shape
+    # scikit-learn normalizes rows before sorting their indices: equal up to rounding
+    assert abs(vectors - expected).max() < 1e-12
+
+
+def test_parallel_fitted_recommender_ranks_like_the_vectorizer(catalog, profiles):
+    serial = AdvancedRecommender()
+    serial.fit(catalog, n_jobs=1)
+    parallel = AdvancedRecommender()
+    parallel.fit(catalog, n_jobs=2, chunk_size=128)
+
+    assert parallel.vectorizer is None
+    for profile in profiles:
+        expected = [course["course_id"] for course in serial.recommend(profile, top_n=20)]
+        assert [course["course_id"] for course in parallel.recommend(profile, top_n=20)] == expected
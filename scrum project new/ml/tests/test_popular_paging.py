@@ -0,0 +1,38 @@
+import base64
+import json
+
+import pytest
+
+
+def cursor_token(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def test_cursor_pages_equal_the_popular_listing(client):
+    expected = client.get("/items/popular", query_string={"top_n": 25}).get_json()["items"]
+
+    first = client.get("/items/popular", query_string={"top_n": 10, "cursor": "", "stream": 1})
+    *items, trailer = [json.loads(line) for line in first.data.decode().splitlines()]
+    second = client.get("/items/popular", query_string={"top_n": 15, "cursor": trailer["next_cursor"]}).get_json()
+
+    assert items + second["items"] == expected
+
+
+@pytest.mark.parametrize("state", [{}, {"p": "3"}, {"p": -1}, {"p": 10 ** 9}, {"p": None}])
+def test_malformed_cursor_position_is_rejected(client, state):
+    first = client.get("/items/popular", query_string={"top_n": 5, "stream": 1})
+    cursor = json.loads(base64.urlsafe_b64decode(json.loads(first.data.decode().splitlines()[-1])["next_cursor"]))
+
+    response = client.get("/items/popular", query_string={"cursor": cursor_token({"v": cursor["v"], "q": cursor["q"], **state})})
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid cursor"
+
+
+def test_cursor_of_another_query_is_rejected(client):
+    first = client.get("/items/popular", query_string={"top_n": 5, "stream": 1})
+    cursor = json.loads(first.data.decode().splitlines()[-1])["next_cursor"]
+
+    response = client.get("/items/popular", query_string={"category": "data", "cursor": cursor})
+
+    assert response.status_code == 400
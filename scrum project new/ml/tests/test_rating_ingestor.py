@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, random as sparse_random
+
+from feature_engineer import FeatureEngineer
+from group_recommender import GroupRecommender
+from rating_ingestor import RatingIngestor, replace_rows
+from recommender_model import HybridRecommender
+from similarity import all_pairs_similarity, similarity_rows
+
+
+@pytest.fixture()
+def model(itm_rec):
+    users, items, ratings = itm_rec
+    model = HybridRecommender()
+    model.fit(
+        ratings,
+        FeatureEngineer.create_user_features(users, ratings),
+        FeatureEngineer.create_item_features(items, ratings),
+        n_jobs=1,
+    )
+    model.materialize(top_n=20)
+    return model
+
+
+def unrated_items(model, user_row: int, count: int) -> list:
+    rated = set(model.user_item_matrix[user_row].indices)
+    return [str(model.item_ids[col]) for col in range(len(model.item_ids)) if col not in rated][:count]
+
+
+def test_replace_rows_matches_dense_rebuild():
+    matrix = csr_matrix(sparse_random(60, 25, density=0.2, random_state=1))
+    rows = np.array([0, 13, 59])
+    new_rows = csr_matrix(sparse_random(3, 25, density=0.4, random_state=2))
+
+    replaced, _ = replace_rows(matrix, rows, new_rows)
+
+    expected = matrix.toarray()
+    expected[rows] = new_rows.toarray()
+    assert (replaced.toarray() == expected).all()
+    assert replaced.has_sorted_indices
+
+
+@pytest.mark.parametrize("top_k", [None, 5])
+def test_similarity_rows_match_all_pairs(top_k):
+    X = csr_matrix(sparse_random(80, 30, density=0.3, random_state=4))
+    rows = np.array([2, 40, 79])
+
+    full = all_pairs_similarity(X, top_k=top_k, exclude_self=True, n_jobs=1)
+    partial = similarity_rows(X, rows, top_k=top_k, exclude_self=True)
+
+    assert abs(full[rows] - partial).max() == 0.0
+    assert (full[rows] != 0).nnz == (partial != 0).nnz
+
+
+def test_compaction_equals_full_recompute_for_affected_users(model):
+    ingestor = RatingIngestor(model)
+    users = [3, 17, 250]
+    ratings = [
+        {"user_id": str(model.user_ids[row]), "item_id": item, "rating": 5, "app": 4}
+        for row in users for item in unrated_items(model, row, 2)
+    ]
+    # A re-rating of an existing pair replaces it
+    existing = model.user_item_matrix[users[0]].indices[0]
+    ratings.append({"user_id": str(model.user_ids[users[0]]), "item_id": str(model.item_ids[existing]), "rating": 1})
+
+    result = ingestor.add(ratings)
+    assert result == {"accepted": len(ratings), "deferred": 0, "pending": len(ratings)}
+    before = model.user_item_matrix.nnz
+    ingestor.compact()
+
+    matrix = model.user_item_matrix
+    assert matrix.nnz == before + 6
+    assert matrix[users[0], existing] == 1
+    assert len(model.rating_criteria) == matrix.nnz
+
+    # Neighbor rows of the affected users equal a full recompute on the new matrix
+    expected = all_pairs_similarity(matrix, top_k=model.N_NEIGHBORS, exclude_self=True, n_jobs=1)
+    assert abs(model.user_similarity[users] - expected[users]).max() < 1e-12
+
+    # Their materialized rows equal a fresh materialize of the updated model
+    top_items, top_scores = model.materialized
+    model.materialize(top_n=top_items.shape[1])
+    assert (model.top_items[users] == top_items[users]).all()
+    assert np.array_equal(model.top_scores[users], top_scores[users])
+
+
+def test_compaction_publishes_new_tables_without_touching_the_old(model):
+    ingestor = RatingIngestor(model)
+    row = 5
+    published = model.materialized
+    snapshot = (published[0].copy(), published[1].copy())
+    items = unrated_items(model, row, 3)
+
+    ingestor.add([{"user_id": str(model.user_ids[row]), "item_id": item, "rating": 5} for item in items])
+    ingestor.compact()
+
+    # Readers holding the previous tuple keep a consistent (unchanged) table
+    assert model.materialized is not published
+    assert (published[0] == snapshot[0]).all()
+    assert np.array_equal(published[1], snapshot[1])
+
+    recommended = {rec["item_id"] for rec in model.recommend_user(str(model.user_ids[row]), top_n=20)}
+    assert not recommended & set(items)
+
+
+def test_compaction_drops_cached_profiles_of_affected_groups(model):
+    model.group_members = {
+        "affected": [str(user_id) for user_id in model.user_ids[[5, 6, 7]]],
+        "unaffected": [str(user_id) for user_id in model.user_ids[[40, 41]]],
+    }
+    groups = GroupRecommender(model)
+    ingestor = RatingIngestor(model, on_compact=groups.invalidate_users)
+    adhoc_id, adhoc_members = GroupRecommender.adhoc_group(model.user_ids[[6, 90]])
+    adhoc = {adhoc_id: adhoc_members}
+    before = groups.aggregate(["affected", "unaffected", adhoc_id], adhoc=adhoc)
+
+    row = 6
+    ingestor.add([{"user_id": str(model.user_ids[row]), "item_id": item, "rating": 5} for item in unrated_items(model, row, 5)])
+    ingestor.compact()
+
+    after = groups.aggregate(["affected", "unaffected", adhoc_id], adhoc=adhoc)
+    fresh = GroupRecommender(model).aggregate(["affected", adhoc_id], adhoc=adhoc)
+    assert after["unaffected"] is before["unaffected"]
+    for group_id in ["affected", adhoc_id]:
+        assert after[group_id] is not before[group_id]
+        assert np.array_equal(after[group_id], fresh[group_id])
+        assert not np.array_equal(after[group_id], before[group_id])
+
+
+def test_profiles_scored_during_a_compaction_are_not_cached(model):
+    model.group_members = {"group": [str(model.user_ids[5])]}
+    groups = GroupRecommender(model)
+    score_users = model.score_users
+
+    def score_then_invalidate(*args, **kwargs):
+        scores = score_users(*args, **kwargs)
+        groups.invalidate_users([str(model.user_ids[5])])
+        return scores
+
+    model.score_users = score_then_invalidate
+    first = groups.aggregate(["group"])["group"]
+    del model.score_users
+
+    assert groups.aggregate(["group"])["group"] is not first
+
+
+def test_unknown_users_are_deferred(model):
+    ingestor = RatingIngestor(model)
+    result = ingestor.add([{"user_id": "nobody", "item_id": str(model.item_ids[0]), "rating": 3}])
+
+    assert result["accepted"] == 0 and result["deferred"] == 1
+    with pytest.raises(ValueError):
+        ingestor.add([{"user_id": "nobody", "item_id": "1", "rating": 9}])
@@ -0,0 +1,106 @@
+import base64
+import json
+
+import pytest
+
+PROFILES = [
+    {"major": "Computer Science", "interests": "machine learning", "year": 3, "gpa": 3.2},
+    {"major": "Biology", "interests": "", "year": 1, "gpa": 3.0},
+    {"major": "Business", "interests": "marketing analytics", "year": 4, "gpa": 3.9},
+    {"major": "Data Science", "interests": "statistics python", "year": 2, "gpa": 2.8},
+]
+
+
+def reference_rank(recommender, user_profile: dict, top_n: int) -> list:
+    """/recommend's ranking: top_n filtered courses of the best 3 x top_n by similarity, by displayed confidence"""
+    similarities = recommender._similarities([user_profile])[0]
+    year, gpa = user_profile["year"], user_profile["gpa"]
+    ranked = []
+    for idx in similarities.argsort()[-top_n * 3:][::-1]:
+        difficulty = recommender._difficulty[idx]
+        if (year <= 1 and difficulty == "Advanced") or (year >= 4 and difficulty == "Beginner" and gpa > 3.5):
+            continue
+        ranked.append((int(idx), round(float(similarities[idx]) * 0.7 + recommender._ratings[idx] / 5.0 * 0.3, 2)))
+        if len(ranked) >= top_n:
+            break
+    ranked.sort(key=lambda candidate: candidate[1], reverse=True)
+    return [recommender._columns["course_id"][idx] for idx, _ in ranked]
+
+
+def ndjson(response) -> list:
+    return [json.loads(line) for line in response.data.decode().splitlines()]
+
+
+def course_ids(items: list) -> list:
+    return [item["course_id"] for item in items]
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.parametrize("top_n", [1, 5, 10, 30])
+def test_recommend_keeps_its_ranking(api, client, profile, top_n):
+    response = client.post("/recommend", json={**profile, "top_n": top_n})
+
+    assert response.status_code == 200
+    assert course_ids(response.get_json()["recommendations"]) == reference_rank(api.model, profile, top_n)
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.parametrize("top_n", [5, 10, 30])
+def test_first_page_equals_recommend(client, profile, top_n):
+    expected = client.post("/recommend", json={**profile, "top_n": top_n}).get_json()["recommendations"]
+
+    *streamed, trailer = ndjson(client.post("/recommend", json={**profile, "top_n": top_n, "stream": True}))
+
+    assert streamed == expected
+    assert trailer["count"] == len(expected)
+    assert trailer["next_cursor"]
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_cursor_walk_continues_the_ranking(api, client, profile):
+    pages = list(api.model.iter_recommendations(profile, page_size=10))
+    walked, cursor = [], None
+    while True:
+        body = {**profile, "top_n": 10}
+        if cursor:
+            body["cursor"] = cursor
+        else:
+            body["stream"] = True
+        response = client.post("/recommend", json=body)
+        if cursor:
+            page = response.get_json()
+            items, cursor = page["recommendations"], page["next_cursor"]
+        else:
+            *items, trailer = ndjson(response)
+            cursor = trailer["next_cursor"]
+        walked.append(course_ids(items))
+        if cursor is None:
+            break
+
+    assert len(walked) == len(pages)
+    assert walked == [[api.model._columns["course_id"][idx] for idx, *_ in page] for page, _ in pages]
+    flat = [course_id for page in walked for course_id in page]
+    assert len(flat) == len(set(flat))
+
+
+def test_stream_without_top_n_walks_every_page(api, client):
+    profile = PROFILES[0]
+    *streamed, trailer = ndjson(client.post("/recommend", json={**profile, "stream": True}))
+
+    pages = api.model.iter_recommendations(profile, page_size=api.STREAM_PAGE_SIZE)
+    assert course_ids(streamed) == [api.model._columns["course_id"][idx] for page, _ in pages for idx, *_ in page]
+    assert trailer["next_cursor"] is None
+    assert len(streamed) == api.model.n_courses
+
+
+@pytest.mark.parametrize("state", [{}, {"o": -1}, {"o": "3"}, {"s": 0.5, "i": 3}])
+def test_malformed_cursor_position_is_rejected(api, client, state):
+    profile = PROFILES[0]
+    first = client.post("/recommend", json={**profile, "top_n": 5, "stream": True})
+    cursor = json.loads(base64.urlsafe_b64decode(ndjson(first)[-1]["next_cursor"]))
+    token = base64.urlsafe_b64encode(json.dumps({"v": cursor["v"], "q": cursor["q"], **state}).encode()).decode()
+
+    response = client.post("/recommend", json={**profile, "top_n": 5, "cursor": token})
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid cursor"
@@ -0,0 +1,160 @@
+import numpy as np
+import pytest
+
+from feature_engineer import FeatureEngineer
+from recommender_model import HybridRecommender
+
+
+def fit(itm_rec, item_neighbors) -> HybridRecommender:
+    users, items, ratings = itm_rec
+    model = HybridRecommender()
+    model.ITEM_NEIGHBORS = item_neighbors
+    model.fit(
+        ratings,
+        FeatureEngineer.create_user_features(users, ratings),
+        FeatureEngineer.create_item_features(items, ratings),
+        n_jobs=1,
+    )
+    return model
+
+
+@pytest.fixture(scope="module")
+def fitted(itm_rec) -> HybridRecommender:
+    return fit(itm_rec, HybridRecommender.ITEM_NEIGHBORS)
+
+
+def test_item_similarity_keeps_at_most_item_neighbors_per_row(fitted):
+    n_items = len(fitted.item_ids)
+    top_k = HybridRecommender.ITEM_NEIGHBORS
+
+    assert top_k is not None and top_k < n_items
+    assert fitted.item_similarity.shape == (n_items, n_items)
+    assert fitted.item_similarity.nnz <= n_items * top_k
+    assert np.diff(fitted.item_similarity.indptr).max() <= top_k
+
+
+def test_item_similarity_keeps_the_largest_entries(fitted, itm_rec):
+    full = fit(itm_rec, None).item_similarity.toarray()
+    pruned = fitted.item_similarity
+
+    for row in range(pruned.shape[0]):
+        kept = np.sort(pruned.data[pruned.indptr[row]:pruned.indptr[row + 1]])[::-1]
+        expected = np.sort(full[row][full[row] != 0])[::-1][:HybridRecommender.ITEM_NEIGHBORS]
+        np.testing.assert_allclose(kept, expected, rtol=0, atol=1e-12)
+
+
+def test_saved_item_similarity_stays_pruned(fitted, tmp_path):
+    fitted.save(str(tmp_path / "model"))
+    loaded = HybridRecommender.load(str(tmp_path / "model"), mmap_mode="r")
+
+    assert loaded.item_similarity.nnz == fitted.item_similarity.nnz
+    assert abs(loaded.item_similarity - fitted.item_similarity).max() == 0.0
+
+
+def context_ratings(itm_rec, context: dict):
+    _, _, ratings = itm_rec
+    mask = np.ones(len(ratings), dtype=bool)
+    for name, value in context.items():
+        mask &= ratings[name].values == value
+    return ratings[mask]
+
+
+@pytest.mark.parametrize("context", [
+    {"class": "DB"},
+    {"semester": "Spring", "lockdown": "DUR"},
+    {"class": "ML", "semester": "Fall", "lockdown": "POST"},
+])
+def test_context_submatrix_holds_the_ratings_of_its_context(fitted, itm_rec, context):
+    subset = context_ratings(itm_rec, context)
+    code = fitted.encode_context(context)
+
+    expected = np.zeros(fitted.user_item_matrix.shape)
+    expected[fitted.user_indices(subset["user_id"]), fitted.item_indices(subset["item_id"])] = subset["rating"]
+    assert code != 0
+    assert np.array_equal(fitted.context_matrices[code].toarray(), expected)
+
+    stats = fitted.context_item_stats[code]
+    grouped = subset.groupby("item_id")["rating"].agg(["count", "mean"])
+    columns = fitted.item_indices(grouped.index.astype(str))
+    assert np.array_equal(stats[columns, 0], grouped["count"].values)
+    np.testing.assert_allclose(stats[columns, 1], grouped["mean"].values, rtol=1e-6)
+    assert stats[:, 0].sum() == len(subset)
+
+
+def test_context_popularity_ranks_within_the_context(fitted, itm_rec):
+    subset = context_ratings(itm_rec, {"class": "DA", "semester": "Fall"})
+    popularity = subset.groupby("item_id")["rating"].sum().sort_values(ascending=False, kind="stable")
+
+    popular = fitted._get_popular_items(5, fitted.encode_context({"class": "DA", "semester": "Fall"}))
+
+    expected = popularity.values[:5]
+    assert [popularity[item["item_id"]] for item in popular] == pytest.approx(expected, rel=1e-5)
+
+
+def test_encode_context(fitted):
+    assert fitted.encode_context(None) == 0
+    assert fitted.encode_context({}) == 0
+    assert fitted.encode_context({"class": None}) == 0
+    assert fitted.encode_context(7) == 7
+    assert fitted.encode_context({"class": "DB"}) != fitted.encode_context({"semester": "Fall"})
+    with pytest.raises(ValueError, match="Unknown class"):
+        fitted.encode_context({"class": "Physics"})
+    with pytest.raises(ValueError, match="Unknown context variables"):
+        fitted.encode_context({"room": "A"})
+
+
+def test_context_scores_read_neighbor_ratings_from_the_submatrix(fitted):
+    users = np.arange(10)
+    context = {"lockdown": "PRE"}
+    submatrix = fitted.context_matrices[fitted.encode_context(context)]
+
+    scores = fitted.score_users(users, alpha=1.0, context=context)
+
+    np.testing.assert_allclose(scores, fitted._collaborative_filtering_scores(users, submatrix))
+    assert not np.allclose(scores, fitted.score_users(users, alpha=1.0))
+
+
+def test_materialized_rows_equal_online_predictions(fitted):
+    fitted.materialize(top_n=10, batch_size=64)
+
+    for user_id in fitted.user_ids[::7]:
+        online = fitted.predict(str(user_id), top_n=10)
+        served = fitted.recommend_user(str(user_id), top_n=10)
+        assert [item["predicted_rating"] for item in served] == pytest.approx(
+            [item["predicted_rating"] for item in online], rel=1e-6)
+        assert {item["item_id"] for item in served} == {item["item_id"] for item in online}
+
+
+def test_materialized_rows_skip_rated_items_and_pad(fitted):
+    n_items = len(fitted.item_ids)
+    fitted.materialize(top_n=n_items)
+    top_items, top_scores = fitted.materialized
+
+    assert top_items.shape == (len(fitted.user_ids), n_items)
+    for row in range(0, len(fitted.user_ids), 13):
+        rated = set(fitted.user_item_matrix[row].indices)
+        items = top_items[row]
+        assert not rated & set(items[items >= 0])
+        assert (items >= 0).sum() == n_items - len(rated)
+        assert np.isneginf(top_scores[row][items < 0]).all()
+        assert (np.diff(top_scores[row][items >= 0]) <= 0).all()
+
+
+def test_recommend_user_falls_back_outside_the_table(fitted):
+    fitted.materialize(top_n=5)
+    user_id = str(fitted.user_ids[0])
+
+    assert fitted.recommend_user("nobody", top_n=3) == fitted._get_popular_items(3)
+    assert fitted.recommend_user(user_id, top_n=8) == fitted.predict(user_id, top_n=8)
+
+
+def test_user_endpoint_serves_the_materialized_table(api, client):
+    user_id = str(api.hybrid_model.user_ids[4])
+
+    known = client.get(f"/recommend/user/{user_id}", query_string={"top_n": 5}).get_json()
+    unknown = client.get("/recommend/user/nobody", query_string={"top_n": 5}).get_json()
+
+    assert known["known_user"] and known["count"] == 5
+    assert known["recommendations"] == api.hybrid_model.recommend_user(user_id, 5)
+    assert not unknown["known_user"]
+    assert unknown["recommendations"] == api.hybrid_model._get_popular_items(5)
@@ -0,0 +1,96 @@
+import pstats
+
+import pytest
+
+from request_profiler import RequestProfiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def work():
+    return sum(i * i for i in range(20000))
+
+
+def test_cprofile_run_stores_a_profile_and_its_sidecar(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+
+    result, name = profiler.run(work, {"endpoint": "recommend"})
+
+    assert result == work()
+    [meta] = profiler.list_profiles()
+    assert meta["name"] == name and meta["mode"] == "cprofile"
+    assert meta["tags"] == {"endpoint": "recommend"}
+    assert meta["top"] and meta["top"][0]["cumulative_ms"] >= meta["top"][-1]["cumulative_ms"]
+    pstats.Stats(str(profiler.profile_path(name)))
+
+
+def test_sample_mode_writes_collapsed_stacks(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_interval_ms=0.1)
+
+    _, name = profiler.run(lambda: [work() for _ in range(20)], {}, mode="sample")
+
+    path = profiler.profile_path(name)
+    assert path.suffix == ".folded"
+    lines = path.read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_only_the_newest_profiles_are_kept(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), max_profiles=2)
+    names = [profiler.run(work, {})[1] for _ in range(4)]
+
+    assert sorted(meta["name"] for meta in profiler.list_profiles()) == sorted(names[2:])
+    assert len(list(tmp_path.iterdir())) == 4
+    with pytest.raises(FileNotFoundError):
+        profiler.profile_path(names[0])
+
+
+def test_sampling_and_modes(tmp_path):
+    assert not RequestProfiler(str(tmp_path)).should_profile()
+    assert RequestProfiler(str(tmp_path)).should_profile(forced=True)
+    assert RequestProfiler(str(tmp_path), sample_rate=1.0).should_profile()
+    with pytest.raises(ValueError):
+        RequestProfiler(str(tmp_path), mode="perf")
+
+
+@pytest.fixture
+def profiled(api, tmp_path, monkeypatch):
+    """The API with the admin token set and /health wrapped by the profiler"""
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(api, "profiler", RequestProfiler(str(tmp_path)))
+    monkeypatch.setitem(api.app.view_functions, "health", api.profiled_view("health", api.app.view_functions["health"]))
+    return api
+
+
+def test_x_profile_needs_the_admin_token(profiled, client):
+    response = client.get("/health", headers={"X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert profiled.profiler.list_profiles() == []
+
+
+def test_admin_can_profile_a_request_and_download_it(profiled, client):
+    response = client.get("/health", headers={"X-Profile": "1", "X-Profile-Mode": "sample", **ADMIN})
+    name = response.headers["X-Profile-Id"]
+
+    listing = client.get("/admin/profiles", headers=ADMIN).get_json()
+    assert [meta["name"] for meta in listing["profiles"]] == [name]
+    assert listing["profiles"][0]["mode"] == "sample"
+    assert listing["profiles"][0]["tags"]["endpoint"] == "health"
+
+    download = client.get(f"/admin/profiles/{name}", headers=ADMIN)
+    assert download.status_code == 200
+    assert client.get("/admin/profiles/unknown", headers=ADMIN).status_code == 404
+
+
+def test_profile_endpoints_require_the_admin_token(profiled, client):
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles/anything", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_profile_endpoints_report_disabled_profiling(api, client, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+
+    assert api.profiler is None
+    assert client.get("/admin/profiles", headers=ADMIN).status_code == 404
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    cache = ResponseCache(ttl_seconds=10)
+    now = time.monotonic()
+    cache.put("k", b"v", size=1)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1, size=1)
+    cache.put("b", 2, size=1)
+    cache.get("a")
+    cache.put("c", 3, size=1)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_cap_bounds_the_cache():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", 1, size=6)
+    cache.put("b", 2, size=6)
+    cache.put("huge", 3, size=11)
+
+    assert cache.get("a") is None and cache.get("b") == 2 and cache.get("huge") is None
+    assert cache.stats()["bytes"] == 6
+
+
+def test_keys_embed_the_model_version():
+    fields = {"major": "biology", "top_n": 10}
+    assert ResponseCache.make_key("v1", **fields) == ResponseCache.make_key("v1", **dict(reversed(fields.items())))
+    assert ResponseCache.make_key("v1", **fields) != ResponseCache.make_key("v2", **fields)
+
+
+@pytest.fixture
+def profile():
+    return {"major": "Mathematics", "interests": "response cache", "year": 3, "gpa": 3.4, "top_n": 5}
+
+
+def test_repeated_requests_hit_the_cache_and_share_an_etag(api, client, profile):
+    first = client.post("/recommend", json=profile)
+    hits = api.response_cache.stats()["hits"]
+    second = client.post("/recommend", json=profile)
+
+    assert second.get_json() == first.get_json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert api.response_cache.stats()["hits"] == hits + 1
+
+
+def test_matching_if_none_match_returns_304(client, profile):
+    etag = client.post("/recommend", json=profile).headers["ETag"]
+
+    response = client.post("/recommend", json=profile, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert client.post("/recommend", json=profile, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_user_id_changes_the_etag_but_not_the_cached_ranking(client, profile):
+    first = client.post("/recommend", json={**profile, "user_id": "a"})
+    second = client.post("/recommend", json={**profile, "user_id": "b"})
+
+    assert first.headers["ETag"] != second.headers["ETag"]
+    assert first.get_json()["recommendations"] == second.get_json()["recommendations"]
+
+
+def test_a_new_model_version_misses_the_old_entries(api, client, profile, monkeypatch):
+    first = client.post("/recommend", json=profile)
+    monkeypatch.setattr(api.registry.default("professional"), "artifact_version", "reloaded")
+    misses = api.response_cache.stats()["misses"]
+
+    second = client.post("/recommend", json=profile, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert api.response_cache.stats()["misses"] == misses + 1
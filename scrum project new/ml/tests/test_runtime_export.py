@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from advanced_recommender import AdvancedRecommender
+
+
+@pytest.fixture(scope="module")
+def fitted(catalog) -> AdvancedRecommender:
+    recommender = AdvancedRecommender()
+    recommender.fit(catalog)
+    return recommender
+
+
+@pytest.fixture(scope="module")
+def pickled(fitted, tmp_path_factory) -> AdvancedRecommender:
+    path = tmp_path_factory.mktemp("pickle") / "model.pkl"
+    fitted.save(str(path))
+    recommender = AdvancedRecommender()
+    recommender.load(str(path))
+    return recommender
+
+
+def load_exported(fitted, tmp_path, profile: str) -> AdvancedRecommender:
+    fitted.export_runtime(str(tmp_path / "runtime"), profile=profile)
+    recommender = AdvancedRecommender()
+    recommender.load_runtime(str(tmp_path / "runtime"))
+    return recommender
+
+
+@pytest.mark.parametrize("profile", ["full", "lean"])
+def test_runtime_export_serves_like_the_pickle(fitted, pickled, profiles, tmp_path, profile):
+    runtime = load_exported(fitted, tmp_path, profile)
+
+    top_ns = [10, 25] * (len(profiles) // 2)
+    for expected, actual in zip(pickled.recommend_batch_json(profiles, top_ns),
+                                runtime.recommend_batch_json(profiles, top_ns)):
+        assert json.loads(actual[0]) == json.loads(expected[0])
+        assert actual[1] == expected[1]
+
+    for profile_ in profiles[:5]:
+        expected = list(pickled.iter_recommendations(profile_, page_size=25))
+        assert list(runtime.iter_recommendations(profile_, page_size=25)) == expected
+
+    for category in [None] + pickled.categories:
+        assert runtime.get_popular_courses(category, 20) == pickled.get_popular_courses(category, 20)
+
+    for course_id in pickled.courses_df["course_id"].iloc[::50]:
+        assert runtime.similar_courses(course_id, 10) == pickled.similar_courses(course_id, 10)
+
+    for query in ["machine learning", "data analysis python", "intro"]:
+        assert runtime.search(query, 10) == pickled.search(query, 10)
+
+
+def test_runtime_export_rejects_mismatched_arrays(fitted, tmp_path):
+    fitted.export_runtime(str(tmp_path / "runtime"))
+    manifest_path = tmp_path / "runtime" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["arrays"]["neighbors.scores"]["shape"][0] += 1
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError, match="neighbors.scores"):
+        AdvancedRecommender().load_runtime(str(tmp_path / "runtime"))
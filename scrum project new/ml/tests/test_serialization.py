@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from advanced_recommender import AdvancedRecommender, encode_json
+
+PROFILES = [
+    {"major": "Computer Science", "interests": "machine learning", "year": 3, "gpa": 3.2},
+    {"major": "Biology", "interests": "", "year": 1, "gpa": 3.0},
+    {"major": "Business", "interests": "marketing analytics", "year": 4, "gpa": 3.9},
+]
+
+
+def load(path, fast_json: bool) -> AdvancedRecommender:
+    recommender = AdvancedRecommender()
+    recommender.load(str(path))
+    recommender.fast_json = fast_json
+    recommender._build_serving_index()
+    return recommender
+
+
+@pytest.fixture(scope="module", params=[True, False], ids=["orjson", "json"])
+def recommender(request, professional_model):
+    return load(professional_model, request.param)
+
+
+@pytest.fixture(scope="module")
+def plain(professional_model):
+    return load(professional_model, False)
+
+
+def test_encode_json_is_compact():
+    assert encode_json({"a": [1, 2.5, "x"]}, fast=False) == b'{"a":[1,2.5,"x"]}'
+    assert json.loads(encode_json({"a": [1, 2.5, "x"]})) == {"a": [1, 2.5, "x"]}
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.parametrize("diversity", [0.0, 0.5])
+def test_recommend_json_matches_recommend(recommender, profile, diversity):
+    body, count = recommender.recommend_json(profile, top_n=8, diversity=diversity)
+
+    assert json.loads(body) == recommender.recommend(profile, top_n=8, diversity=diversity)
+    assert count == len(json.loads(body))
+
+
+def test_batch_json_matches_single_requests(recommender):
+    assert recommender.recommend_batch_json(PROFILES, [5, 10, 3]) == [
+        recommender.recommend_json(profile, top_n) for profile, top_n in zip(PROFILES, [5, 10, 3])
+    ]
+
+
+def test_similar_and_search_json_match_the_records(recommender):
+    course_id = recommender._columns["course_id"][0]
+    body, count = recommender.similar_courses_json(course_id, top_n=5)
+    assert json.loads(body) == recommender.similar_courses(course_id, top_n=5) and count == 5
+
+    body, _ = recommender.search_json("data analysis", top_n=5)
+    assert [item["score"] for item in json.loads(body)] == [round(score, 4) for _, score in recommender.search("data analysis", 5)]
+
+
+def test_popular_fragments_match_the_records(recommender):
+    popular = recommender.get_popular_courses(top_n=5)
+    assert [json.loads(recommender.encode_popular(idx)) for idx in list(recommender.iter_popular())[:5]] == popular
+
+
+def test_fast_and_plain_encoders_produce_the_same_documents(recommender, plain):
+    for profile in PROFILES:
+        assert json.loads(recommender.recommend_json(profile)[0]) == json.loads(plain.recommend_json(profile)[0])
+
+
+def test_api_body_is_the_serialized_recommendations(api, client):
+    profile = {**PROFILES[0], "interests": "serialized fragments"}
+
+    response = client.post("/recommend", json={**profile, "top_n": 6, "user_id": "u1"})
+
+    assert response.get_json() == {
+        "user_id": "u1",
+        "recommendations": api.model.recommend(profile, top_n=6),
+        "count": 6,
+    }
@@ -0,0 +1,37 @@
+import pytest
+
+# Fields declared by CourseRecord in lib/ml-client.ts
+COURSE_FIELDS = {
+    "item_id", "course_id", "title", "description", "category", "difficulty",
+    "rating", "source", "url", "num_ratings", "avg_rating",
+}
+
+
+@pytest.fixture(scope="module")
+def course_id(api) -> str:
+    return str(api.model._columns["course_id"][0])
+
+
+def test_similar_items_return_the_precomputed_neighbors(api, client, course_id):
+    response = client.get(f"/items/{course_id}/similar", query_string={"top_n": 6})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["course_id"] == course_id
+    assert body["items"] == api.model.similar_courses(course_id, 6)
+    assert course_id not in [item["course_id"] for item in body["items"]]
+    similarities = [item["similarity"] for item in body["items"]]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_similar_items_and_search_results_carry_the_client_fields(client, course_id):
+    similar = client.get(f"/items/{course_id}/similar").get_json()["items"]
+    results = client.get("/search", query_string={"q": "data"}).get_json()["results"]
+
+    assert similar and results
+    assert all(set(item) == COURSE_FIELDS | {"similarity"} for item in similar)
+    assert all(set(result) == COURSE_FIELDS | {"score"} for result in results)
+
+
+def test_unknown_course_is_404(client):
+    assert client.get("/items/no-such-course/similar").status_code == 404
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, diags, random as sparse_random
+from sklearn.metrics.pairwise import cosine_similarity
+
+from similarity import all_pairs_similarity, block_rows_for_budget, normalize_rows
+
+
+@pytest.fixture(scope="module")
+def X():
+    X = sparse_random(150, 60, density=0.1, random_state=2, format="csr")
+    keep = np.ones(150)
+    keep[7] = 0.0  # An all-zero row
+    X = csr_matrix(diags(keep) @ X)
+    X.eliminate_zeros()
+    return X
+
+
+def test_unpruned_similarity_equals_cosine_similarity(X):
+    similarity = all_pairs_similarity(X, n_jobs=1)
+
+    np.testing.assert_allclose(similarity.toarray(), cosine_similarity(X), atol=1e-12)
+    assert similarity.has_sorted_indices
+    assert similarity[7].nnz == 0
+
+
+def test_blocks_and_threads_do_not_change_the_result(X):
+    whole = all_pairs_similarity(X, top_k=5, exclude_self=True, n_jobs=1)
+    assert block_rows_for_budget(150, 0.01, 3) < 150
+
+    blocked = all_pairs_similarity(X, top_k=5, exclude_self=True, memory_budget_mb=0.01, n_jobs=3)
+
+    assert (blocked != whole).nnz == 0
+
+
+def test_dense_input_matches_sparse_input(X):
+    dense = all_pairs_similarity(X.toarray(), top_k=4, n_jobs=1)
+    sparse = all_pairs_similarity(X, top_k=4, n_jobs=1)
+    np.testing.assert_allclose(np.sort(dense.data), np.sort(sparse.data))
+    np.testing.assert_array_equal(np.diff(dense.indptr), np.diff(sparse.indptr))
+
+
+@pytest.mark.parametrize("top_k", [1, 5, 20])
+def test_top_k_bounds_the_entries_per_row(X, top_k):
+    similarity = all_pairs_similarity(X, top_k=top_k, exclude_self=True, n_jobs=1)
+    reference = cosine_similarity(X)
+    np.fill_diagonal(reference, 0.0)
+
+    assert np.diff(similarity.indptr).max() <= top_k
+    assert similarity.nnz <= top_k * X.shape[0]
+    assert similarity.diagonal().sum() == 0
+    for row in range(X.shape[0]):
+        expected = np.sort(reference[row][reference[row] > 0])[::-1][:top_k]
+        np.testing.assert_allclose(np.sort(similarity[row].data)[::-1], expected, atol=1e-12)
+
+
+def test_threshold_drops_small_entries(X):
+    similarity = all_pairs_similarity(X, threshold=0.3, n_jobs=1)
+    reference = cosine_similarity(X)
+
+    assert similarity.data.min() >= 0.3
+    assert similarity.nnz == int((reference >= 0.3).sum())
+
+
+def test_no_neighbors_requested():
+    assert all_pairs_similarity(np.eye(4), top_k=0).nnz == 0
+
+
+def test_normalize_rows_keeps_zero_rows():
+    X = csr_matrix(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    np.testing.assert_allclose(normalize_rows(X).toarray(), [[0.6, 0.8], [0.0, 0.0]])
+    np.testing.assert_allclose(normalize_rows(X.toarray()), [[0.6, 0.8], [0.0, 0.0]])
@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random
+
+from evaluator import ModelEvaluator
+from feature_engineer import FeatureEngineer
+from recommender_model import HybridRecommender
+from sweep import PARAMETERS, SweepRunner, grid_trials, prune_rows, random_trials
+
+
+def test_grid_trials_cover_every_combination():
+    trials = grid_trials({"alpha": [0.5, 0.7], "n_neighbors": [10, 20, 30], "item_neighbors": 20})
+
+    assert len(trials) == 6
+    assert {(trial["alpha"], trial["n_neighbors"]) for trial in trials} == {(a, k) for a in (0.5, 0.7) for k in (10, 20, 30)}
+    assert all(trial["item_neighbors"] == 20 for trial in trials)
+
+
+def test_grid_trials_reject_ranges_and_unknown_parameters():
+    with pytest.raises(ValueError):
+        grid_trials({"alpha": [{"low": 0.1, "high": 0.9}]})
+    with pytest.raises(ValueError):
+        grid_trials({"learning_rate": [0.1]})
+
+
+def test_random_trials_are_distinct_and_reproducible():
+    space = {"alpha": {"low": 0.1, "high": 0.9}, "n_neighbors": {"low": 5, "high": 200, "log": True}, "item_neighbors": [10, None]}
+
+    trials = random_trials(space, 25, seed=3)
+
+    assert trials == random_trials(space, 25, seed=3)
+    assert trials != random_trials(space, 25, seed=4)
+    assert len({json.dumps(trial, sort_keys=True) for trial in trials}) == 25
+    assert all(0.1 <= trial["alpha"] <= 0.9 for trial in trials)
+    assert all(isinstance(trial["n_neighbors"], int) and 5 <= trial["n_neighbors"] <= 200 for trial in trials)
+    assert {trial["item_neighbors"] for trial in trials} == {10, None}
+
+
+def test_random_trials_stop_when_the_space_is_exhausted():
+    assert len(random_trials({"alpha": [0.5, 0.7]}, 10)) == 2
+
+
+@pytest.mark.parametrize("top_k", [1, 3, 8])
+def test_prune_rows_keeps_the_largest_entries_of_each_row(top_k):
+    matrix = sparse_random(30, 40, density=0.2, random_state=top_k, format="csr")
+
+    pruned = prune_rows(matrix, top_k)
+
+    assert np.diff(pruned.indptr).max() <= top_k
+    for row in range(30):
+        values = matrix.getrow(row).data
+        kept = pruned.getrow(row)
+        np.testing.assert_array_equal(np.sort(kept.data), np.sort(values)[::-1][:top_k][::-1])
+        assert list(kept.indices) == sorted(kept.indices)
+    assert (pruned - matrix.multiply(pruned.astype(bool))).nnz == 0
+
+
+def test_prune_rows_without_a_limit_keeps_everything():
+    matrix = sparse_random(5, 5, density=0.5, random_state=0, format="csr")
+    assert (prune_rows(matrix, None) != matrix).nnz == 0
+    assert (prune_rows(matrix, 5) != matrix).nnz == 0
+
+
+@pytest.fixture(scope="module")
+def split(itm_rec):
+    users, items, ratings = itm_rec
+    train, test = ModelEvaluator.train_test_split_ratings(ratings, test_size=0.2)
+    return train, test, FeatureEngineer.create_user_features(users, train), FeatureEngineer.create_item_features(items, train)
+
+
+@pytest.fixture(scope="module")
+def leaderboard(split, tmp_path_factory):
+    trials = grid_trials({"alpha": [0.3, 0.9], "n_neighbors": [10, 40], "item_neighbors": [5, 20]})
+    runner = SweepRunner(str(tmp_path_factory.mktemp("sweep")), n_jobs=1, top_n=100)
+    runner.prepare(*split, trials)
+    return runner, runner.run(trials)
+
+
+def test_leaderboard_ranks_every_trial_by_rmse(leaderboard):
+    _, board = leaderboard
+
+    assert len(board) == 8
+    assert board["rank"].tolist() == list(range(1, 9))
+    assert board["rmse"].is_monotonic_increasing
+    assert (board["num_predictions"] > 0).all()
+    assert set(PARAMETERS) <= set(board.columns)
+
+
+def test_a_trial_scores_like_a_model_fitted_with_its_parameters(leaderboard, split):
+    _, board = leaderboard
+    train, test, user_features, item_features = split
+    trial = board[(board["alpha"] == 0.9) & (board["n_neighbors"] == 40) & (board["item_neighbors"] == 20)].iloc[0]
+
+    model = HybridRecommender()
+    model.N_NEIGHBORS, model.ITEM_NEIGHBORS = 40, 20
+    model.fit(train, user_features, item_features, n_jobs=1)
+    expected = ModelEvaluator.evaluate_model_batch(model, test, alpha=0.9, top_n=100)
+
+    for metric in ("rmse", "mae", "coverage", "num_predictions"):
+        assert trial[metric] == pytest.approx(expected[metric])
+
+
+def test_write_leaderboard(leaderboard, tmp_path):
+    runner, board = leaderboard
+
+    runner.write_leaderboard(board, str(tmp_path))
+
+    saved = json.loads((tmp_path / "leaderboard.json").read_text())
+    assert saved["best"] == {name: board.iloc[0][name] for name in PARAMETERS}
+    assert len(saved["trials"]) == 8 and saved["n_jobs"] == 1
+    assert (tmp_path / "leaderboard.csv").exists()
@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.fixture
+def warming(api):
+    """The API as it is before warm-up; ready again afterwards"""
+    api.ready.clear()
+    yield api
+    api.ready.set()
+
+
+def test_ready_fails_until_warm_up_is_done(warming, client):
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.get_json() == {"ready": False, "status": "warming_up"}
+    assert client.get("/health").get_json()["ready"] is False
+
+    warming.warm_up()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    stats = response.get_json()["warm_up"]
+    assert stats["professional"]["bytes_touched"] > 0
+    assert stats["hybrid"]["users"] > 0
+    assert stats["groups"] == 20
+    assert "error" not in stats
+
+
+def test_ready_reports_a_missing_model(warming, client, monkeypatch):
+    monkeypatch.setattr(warming, "model", None)
+
+    assert client.get("/ready").get_json()["status"] == "model_not_loaded"
+    warming.warm_up()
+    assert client.get("/ready").status_code == 503
+
+
+def test_warm_up_caches_each_majors_default_response(warming, client):
+    warming.response_cache.clear()
+    warming.warm_up()
+    assert warming.response_cache.stats()["entries"] == len(warming.model.major_keywords)
+
+    major = next(iter(warming.model.major_keywords))
+    hits = warming.response_cache.stats()["hits"]
+    response = client.post("/recommend", json={"major": major})
+
+    assert warming.response_cache.stats()["hits"] == hits + 1
+    assert response.get_json()["recommendations"] == warming.model.recommend(
+        {"major": major, "interests": "", "year": 2, "gpa": 3.0}, top_n=10
+    )
+
+
+def test_a_failed_warm_up_still_marks_the_worker_ready(warming, client, monkeypatch):
+    def fail():
+        raise RuntimeError("page fault storm")
+
+    monkeypatch.setattr(warming.model, "warm_up", fail)
+    warming.warm_up()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.get_json()["warm_up"]["error"] == "page fault storm"
+
+
+def test_warm_up_can_be_disabled(warming, monkeypatch):
+    monkeypatch.setattr(warming, "WARMUP", False)
+    warming.response_cache.clear()
+
+    warming.warm_up()
+
+    assert warming.ready.is_set()
+    assert warming.response_cache.stats()["entries"] == 0
+    assert set(warming.warmup_stats) == {"seconds"}
@@ -3,6 +3,7 @@
 Train the course recommendation model using ITM-Rec and Coursera datasets
 """
 
+import argparse
 import sys
 from pathlib import Path
 import logging
@@ -18,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from data_loader import DataLoader
 from data_cleaner import DataCleaner
 from feature_engineer import FeatureEngineer
+from feature_store import FeatureStore
 from recommender_model import HybridRecommender
 from evaluator import ModelEvaluator
 
@@ -30,6 +32,13 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main training pipeline"""
+    parser = argparse.ArgumentParser(description="Train the hybrid course recommender")
+    parser.add_argument("--cv", type=int, default=0, help="Also run k-fold cross-validation with this many folds")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes for cross-validation (0 = all cores)")
+    parser.add_argument("--profile", choices=HybridRecommender.PROFILES, default="full",
+                        help="Save profile: lean leaves out the fit-only feature frames")
+    args = parser.parse_args()
+
     logger.info("=" * 60)
     logger.info("COURSE RECOMMENDATION MODEL TRAINING")
     logger.info("=" * 60)
@@ -58,10 +67,15 @@ def main():
         users_clean, items_clean, ratings_clean, min_ratings=2
     )
 
-    # 5. Feature Engineering
+    # 5. Feature Engineering: rating statistics come from the feature store, kept
+    # across runs. Only the ratings appended to the log since the last run are
+    # folded in (a changed log rebuilds it); deltas applied by update_features.py
+    # and their watermark are kept
+    feature_store = FeatureStore.open(output_dir / "feature_store")
+    feature_store.update_snapshot(ratings_clean, log_rows=len(ratings))
     engineer = FeatureEngineer()
-    user_features = engineer.create_user_features(users_clean, ratings_clean)
-    item_features = engineer.create_item_features(items_clean, ratings_clean, coursera_clean)
+    user_features = engineer.create_user_features(users_clean, ratings_clean, store=feature_store)
+    item_features = engineer.create_item_features(items_clean, ratings_clean, coursera_clean, store=feature_store)
 
     logger.info("=" * 60)
     logger.info("DATA SUMMARY")
@@ -74,8 +88,20 @@ def main():
         logger.info(f"Coursera reviews: {len(coursera_clean)}")
     logger.info("=" * 60)
 
-    # 6. Train/Test Split
     evaluator = ModelEvaluator()
+    if args.cv:
+        logger.info("=" * 60)
+        logger.info("CROSS-VALIDATION")
+        logger.info("=" * 60)
+        cv_metrics = evaluator.cross_validate(
+            ratings_clean, user_features, item_features, n_folds=args.cv, n_jobs=args.jobs or None
+        )
+        cv_path = output_dir / "cv_metrics.json"
+        with open(cv_path, "w") as f:
+            json.dump(cv_metrics, f, indent=2)
+        logger.info(f"Cross-validation metrics saved to {cv_path}")
+
+    # 6. Train/Test Split
     train_ratings, test_ratings = evaluator.train_test_split_ratings(ratings_clean, test_size=0.2)
 
     # 7. Train Model
@@ -93,6 +119,13 @@ def main():
 
     metrics = evaluator.evaluate_model(model, test_ratings, user_features)
 
+    # Attach project groups for group recommendations
+    groups, _, group_ratings = loader.load_itm_rec_groups()
+    model.set_groups(groups, group_ratings)
+
+    # Precompute every known user's top-N for serving
+    model.materialize(top_n=50)
+
     # Save metrics
     metrics_path = output_dir / "metrics.json"
     with open(metrics_path, "w") as f:
@@ -100,12 +133,11 @@ def main():
     logger.info(f"Metrics saved to {metrics_path}")
 
     # 9. Save Model
-    model_path = output_dir / "recommender_model.pkl"
-    model.save(str(model_path))
+    model_path = output_dir / "recommender_model"
+    model.save(str(model_path), profile=args.profile)
 
-    # Save feature data
-    user_features.to_pickle(output_dir / "user_features.pkl")
-    item_features.to_pickle(output_dir / "item_features.pkl")
+    # Save feature statistics (the full feature frames are stored with the model)
+    feature_store.save()
     logger.info("Feature data saved")
 
     logger.info("=" * 60)
@@ -5,6 +5,7 @@ import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 
 from src.professional_data_loader import ProfessionalDataLoader
 from src.advanced_recommender import AdvancedRecommender
@@ -35,7 +36,9 @@ def train_professional_model():
     # Step 2: Train model
     print("\n[2/3] Training advanced recommendation model...")
     model = AdvancedRecommender()
-    model.fit(courses)
+    # TFIDF_JOBS > 1 (or 0 for all cores) fits the TF-IDF model in chunks across worker processes
+    tfidf_jobs = int(os.environ.get("TFIDF_JOBS", "1"))
+    model.fit(courses, n_jobs=tfidf_jobs or None)
     
     # Step 3: Test with diverse students
     print("\n[3/3] Testing with diverse student profiles...")
@@ -57,7 +60,12 @@ def train_professional_model():
     # Step 4: Save model
     print("\n[4/4] Saving trained model...")
     os.makedirs('results', exist_ok=True)
-    model.save('results/professional_recommender.pkl')
+    # MODEL_PROFILE=lean drops fit-only state and compacts the catalog for memory-bound hosts
+    profile = os.environ.get("MODEL_PROFILE", "full")
+    model.save('results/professional_recommender.pkl', profile=profile)
+
+    # Inference-only export served by predict_api.py without scikit-learn
+    model.export_runtime('results/professional_runtime', profile=profile)
     
     # Save course catalog
     courses.to_csv('results/course_catalog.csv', index=False)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter sweep of the hybrid recommender: grid or random search, trials run in parallel
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+import logging
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from data_loader import DataLoader
+from data_cleaner import DataCleaner
+from feature_engineer import FeatureEngineer
+from evaluator import ModelEvaluator
+from sweep import PARAMETERS, SweepRunner, grid_trials, random_trials
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Used when no --space file is given
+DEFAULT_SPACE = {
+    "alpha": [0.3, 0.5, 0.7, 0.8, 0.9, 1.0],
+    "n_neighbors": [10, 25, 50, 100],
+    "item_neighbors": [None, 5, 10, 20],
+}
+
+
+def load_split(test_size: float = 0.2):
+    """Cleaned ITM-Rec data, features and the train/test split, as train_model.py builds them"""
+    loader = DataLoader(data_dir="../data")
+    users, items, ratings = loader.load_itm_rec()
+    coursera_reviews = loader.load_coursera_reviews()
+    if not loader.validate_datasets(users, items, ratings):
+        logger.error("Dataset validation failed!")
+        sys.exit(1)
+
+    cleaner = DataCleaner()
+    users_clean, items_clean, ratings_clean = cleaner.clean_itm_rec(users, items, ratings)
+    coursera_clean = cleaner.clean_coursera_reviews(coursera_reviews)
+    users_clean, items_clean, ratings_clean = cleaner.remove_cold_start_issues(
+        users_clean, items_clean, ratings_clean, min_ratings=2
+    )
+
+    engineer = FeatureEngineer()
+    user_features = engineer.create_user_features(users_clean, ratings_clean)
+    item_features = engineer.create_item_features(items_clean, ratings_clean, coursera_clean)
+    train_ratings, test_ratings = ModelEvaluator.train_test_split_ratings(ratings_clean, test_size=test_size)
+    return train_ratings, test_ratings, user_features, item_features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the hybrid recommender's hyperparameters")
+    parser.add_argument("--space", help="JSON search space: parameter -> list of values, or "
+                                        "{\"low\", \"high\", \"log\"} ranges for random search. "
+                                        f"Parameters: {', '.join(sorted(PARAMETERS))}")
+    parser.add_argument("--trials", type=int, help="Random search with this many trials (default: full grid)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes (0 = all cores)")
+    parser.add_argument("--output", default="results/sweep")
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    try:
+        trials = random_trials(space, args.trials, seed=args.seed) if args.trials else grid_trials(space)
+    except ValueError as e:
+        parser.error(str(e))
+    logger.info(f"{len(trials)} trials over {', '.join(sorted(space))}")
+
+    started = time.perf_counter()
+    runner = SweepRunner(Path(args.output) / "shared", n_jobs=args.jobs or None)
+    runner.prepare(*load_split(), trials=trials)
+    leaderboard = runner.run(trials)
+    runner.write_leaderboard(leaderboard, args.output)
+
+    logger.info("=" * 60)
+    logger.info(f"TOP TRIALS ({time.perf_counter() - started:.1f}s total)")
+    logger.info("=" * 60)
+    for _, trial in leaderboard.head(5).iterrows():
+        params = ", ".join(f"{name}={trial[name] if pd.notna(trial[name]) else None}" for name in sorted(PARAMETERS))
+        logger.info(f"#{trial['rank']}: RMSE={trial['rmse']:.4f}, MAE={trial['mae']:.4f}, "
+                    f"Coverage={trial['coverage']:.2%} ({params})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Apply a batch of new ratings to the feature store without recomputing the features
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+import logging
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from data_loader import DataLoader
+from feature_store import FeatureStore
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def load_delta(path: str) -> pd.DataFrame:
+    """Ratings CSV in the ITM-Rec layout (UserID, Item, Rating) or with normalized names"""
+    ratings = pd.read_csv(path)
+    ratings = ratings.rename(columns={"UserID": "user_id", "Item": "item_id", "Rating": "rating"})
+    ratings = ratings.rename(columns=DataLoader.CONTEXT_COLUMN_MAP)
+
+    # Same rules as DataCleaner.clean_itm_rec
+    ratings = ratings[ratings["rating"].notna() & (ratings["rating"] > 0)].copy()
+    ratings["rating"] = ratings["rating"].clip(1, 5)
+    ratings["user_id"] = ratings["user_id"].astype(str)
+    ratings["item_id"] = ratings["item_id"].astype(str)
+    return ratings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold a ratings delta into the feature store")
+    parser.add_argument("delta", help="CSV of new ratings")
+    parser.add_argument("--watermark", help="Position of this delta in the rating log, e.g. its date; "
+                                            "deltas at or below the stored watermark are skipped")
+    parser.add_argument("--store", default="models/feature_store")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = FeatureStore.open(args.store)
+    delta = load_delta(args.delta)
+    if not store.update(delta, watermark=args.watermark):
+        return
+    store.save()
+    logger.info(
+        f"Applied {len(delta)} ratings in {time.perf_counter() - started:.2f}s: "
+        f"{len(store.tables['user'])} users, {len(store.tables['item'])} items, watermark {store.watermark!r}"
+    )
+
+
+if __name__ == "__main__":
+    main()